@@ -32,8 +32,10 @@ from config.settings import (
     COLUMNAS_CLIENTES,
     COLUMNAS_USUARIOS,
     WORKSHEET_NOTIFICACIONES,
+    WORKSHEET_NOTIFICACIONES_LEIDAS,
     NOTIFICATION_TYPES,
     COLUMNAS_NOTIFICACIONES,
+    COLUMNAS_NOTIFICACIONES_LEIDAS,
     SECTORES_DISPONIBLES,
     TIPOS_RECLAMO,
     TECNICOS_DISPONIBLES,
@@ -49,10 +51,11 @@ from components.clientes.gestion import render_gestion_clientes
 from components.reclamos.impresion import render_impresion_reclamos
 from components.reclamos.planificacion import render_planificacion_grupos
 from components.reclamos.cierre import render_cierre_reclamos
+from components.reclamos.importacion import render_importacion_reclamos
 from components.resumen_jornada import render_resumen_jornada
 from components.notifications import init_notification_manager
 from components.notification_bell import render_notification_bell
-from components.auth import has_permission, check_authentication, render_login, init_auth_session, render_user_info
+from components.auth import has_permission, check_authentication, render_login, init_auth_session, render_user_info, renovar_sesion
 from components.navigation import render_sidebar_navigation  # <- SOLO navegación
 from components.metrics_dashboard import render_metrics_dashboard, metric_card
 from components.ui import breadcrumb, metric_card, card, badge, loading_indicator
@@ -63,8 +66,10 @@ from utils.styles import get_main_styles_v2, get_loading_spinner, loading_indica
 from utils.data_manager import safe_get_sheet_data, safe_normalize, update_sheet_data, batch_update_sheet
 from utils.api_manager import api_manager, init_api_session_state
 from utils.pdf_utils import agregar_pie_pdf
-from utils.date_utils import parse_fecha, es_fecha_valida, format_fecha, ahora_argentina
+from utils.date_utils import parse_fechas_series, es_fecha_valida, format_fecha, ahora_argentina
 from utils.permissions import has_permission
+from utils.indices import marcar_version_snapshot
+from utils.ids import generar_id
 
 # CONFIGURACIÓN DE PÁGINA
 st.set_page_config(
@@ -81,11 +86,6 @@ st.set_page_config(
 # FUNCIONES AUXILIARES OPTIMIZADAS
 # --------------------------
 
-def generar_id_unico():
-    """Genera un ID único para reclamos"""
-    import uuid
-    return str(uuid.uuid4())[:8].upper()
-
 def is_system_dark_mode():
     """Intenta detectar si el sistema está en modo oscuro"""
     try:
@@ -185,12 +185,14 @@ def migrar_uuids_existentes(sheet_reclamos, sheet_clientes):
             (st.session_state.df_reclamos['ID Reclamo'] == '')
         ]
         
+        ids_reclamos = set(st.session_state.df_reclamos['ID Reclamo'].astype(str).str.strip())
+
         if not reclamos_sin_uuid.empty:
             with st.status("Generando UUIDs para reclamos...", expanded=True) as status:
                 st.write(f"📋 {len(reclamos_sin_uuid)} reclamos sin UUID encontrados")
                 
                 for _, row in reclamos_sin_uuid.iterrows():
-                    nuevo_uuid = generar_id_unico()
+                    nuevo_uuid = generar_id(ids_reclamos)
                     updates_reclamos.append({
                         "range": f"P{row.name + 2}",  # Usando row.name para precisión
                         "values": [[nuevo_uuid]]
@@ -226,12 +228,14 @@ def migrar_uuids_existentes(sheet_reclamos, sheet_clientes):
             (st.session_state.df_clientes['ID Cliente'] == '')
         ]
         
+        ids_clientes = set(st.session_state.df_clientes['ID Cliente'].astype(str).str.strip())
+
         if not clientes_sin_uuid.empty:
             with st.status("Generando UUIDs para clientes...", expanded=True) as status:
                 st.write(f"👥 {len(clientes_sin_uuid)} clientes sin UUID encontrados")
                 
                 for _, row in clientes_sin_uuid.iterrows():
-                    nuevo_uuid = generar_id_unico()
+                    nuevo_uuid = generar_id(ids_clientes)
                     updates_clientes.append({
                         "range": f"G{row.name + 2}",  # Usando row.name para precisión
                         "values": [[nuevo_uuid]]
@@ -276,6 +280,15 @@ def migrar_uuids_existentes(sheet_reclamos, sheet_clientes):
 # --------------------------
 # CONEXIÓN CON GOOGLE SHEETS
 # --------------------------
+def _abrir_o_crear_hoja(spreadsheet, titulo, columnas):
+    """Abre una hoja auxiliar y la crea con su encabezado si todavía no existe"""
+    try:
+        return spreadsheet.worksheet(titulo)
+    except gspread.exceptions.WorksheetNotFound:
+        hoja = spreadsheet.add_worksheet(title=titulo, rows=100, cols=len(columnas))
+        hoja.append_row(columnas)
+        return hoja
+
 @st.cache_resource(ttl=3600)
 def init_google_sheets():
     """Conexión optimizada a Google Sheets con retry automático"""
@@ -292,13 +305,13 @@ def init_google_sheets():
             scopes=["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
         )
         client = gspread.authorize(creds)
-        sheet_notifications = client.open_by_key(SHEET_ID).worksheet(WORKSHEET_NOTIFICACIONES)
-        init_notification_manager(sheet_notifications)
+        spreadsheet = client.open_by_key(SHEET_ID)
         return (
-            client.open_by_key(SHEET_ID).worksheet(WORKSHEET_RECLAMOS),
-            client.open_by_key(SHEET_ID).worksheet(WORKSHEET_CLIENTES),
-            client.open_by_key(SHEET_ID).worksheet(WORKSHEET_USUARIOS),
-            sheet_notifications
+            spreadsheet.worksheet(WORKSHEET_RECLAMOS),
+            spreadsheet.worksheet(WORKSHEET_CLIENTES),
+            spreadsheet.worksheet(WORKSHEET_USUARIOS),
+            spreadsheet.worksheet(WORKSHEET_NOTIFICACIONES),
+            _abrir_o_crear_hoja(spreadsheet, WORKSHEET_NOTIFICACIONES_LEIDAS, COLUMNAS_NOTIFICACIONES_LEIDAS)
         )
     try:
         return _connect()
@@ -315,14 +328,19 @@ def precache_all_data(sheet_reclamos, sheet_clientes, sheet_usuarios, sheet_noti
 loading_placeholder = st.empty()
 loading_placeholder.markdown(get_loading_spinner(), unsafe_allow_html=True)
 try:
-    sheet_reclamos, sheet_clientes, sheet_usuarios, sheet_notifications = init_google_sheets()
+    (sheet_reclamos, sheet_clientes, sheet_usuarios,
+     sheet_notifications, sheet_notificaciones_leidas) = init_google_sheets()
     if not all([sheet_reclamos, sheet_clientes, sheet_usuarios, sheet_notifications]):
         st.stop()
 finally:
     loading_placeholder.empty()
 
+# Fuera del recurso cacheado para que cada sesión reciba el gestor
+init_notification_manager(sheet_notifications, sheet_notificaciones_leidas)
+
 # ✅ INICIALIZAR ESTADO DE AUTENTICACIÓN (AGREGAR ESTO)
 init_auth_session()
+renovar_sesion()  # una sola renovación por rerun
 
 if not check_authentication():
     render_login(sheet_usuarios)
@@ -332,7 +350,9 @@ if not check_authentication():
 user_info = st.session_state.auth.get('user_info', {})
 user_role = user_info.get('rol', '')
 
-precache_all_data(sheet_reclamos, sheet_clientes, sheet_usuarios, sheet_notifications)
+# Una sesión reanudada desde su token ya tiene los datos en cache
+if not st.session_state.auth.get('reanudada'):
+    precache_all_data(sheet_reclamos, sheet_clientes, sheet_usuarios, sheet_notifications)
 
 df_reclamos, df_clientes, df_usuarios = safe_get_sheet_data(sheet_reclamos, COLUMNAS_RECLAMOS), safe_get_sheet_data(sheet_clientes, COLUMNAS_CLIENTES), safe_get_sheet_data(sheet_usuarios, COLUMNAS_USUARIOS)
 st.session_state.df_reclamos = df_reclamos
@@ -516,32 +536,20 @@ def cargar_datos():
             if col in df_reclamos.columns:
                 df_reclamos[col] = df_reclamos[col].astype(str).str.strip()
 
-        # Parseo seguro: Fecha y hora (ingreso)
-        if "Fecha y hora" in df_reclamos.columns:
-            df_reclamos["Fecha y hora"] = df_reclamos["Fecha y hora"].apply(
-                lambda x: parse_fecha(x) if not pd.isna(x) else pd.NaT
-            )
-
-        # Parseo robusto: Fecha_formateada (cierre)
-        import numpy as np
-        if "Fecha_formateada" in df_reclamos.columns:
-            raw = df_reclamos["Fecha_formateada"].copy()
-            # Limpieza inicial
-            df_reclamos["Fecha_formateada"] = (
-                raw.astype(str)
-                .str.replace(r"\s+", " ", regex=True)
-                .str.strip()
-                .replace({"": np.nan, "nan": np.nan, "NaN": np.nan})
-            )
-            # Intentar parseo con pandas
-            df_reclamos["Fecha_formateada"] = pd.to_datetime(
-                df_reclamos["Fecha_formateada"],
-                errors="coerce",
-                dayfirst=True,
-                infer_datetime_format=True
-            )
-        else:
-            df_reclamos["Fecha_formateada"] = pd.NaT
+        # Fechas de ingreso y cierre: se parsean una sola vez, acá, a
+        # datetime64[ns, America/Argentina/Buenos_Aires]. El resto de la app
+        # usa estas columnas directamente, sin volver a parsear.
+        for col in ("Fecha y hora", "Fecha_formateada"):
+            if col in df_reclamos.columns:
+                df_reclamos[col] = parse_fechas_series(
+                    df_reclamos[col].astype(str).str.replace(r"\s+", " ", regex=True)
+                )
+            else:
+                df_reclamos[col] = parse_fechas_series(pd.Series(pd.NaT, index=df_reclamos.index))
+
+        # Versión de cada snapshot para reutilizar los índices compartidos
+        marcar_version_snapshot(df_reclamos)
+        marcar_version_snapshot(df_clientes)
 
         return df_reclamos, df_clientes, df_usuarios
 
@@ -657,6 +665,7 @@ COMPONENTES = {
         "permiso": "seguimiento_tecnico",
         "params": {
             "df_reclamos": df_reclamos,
+            "df_clientes": df_clientes,
             "sheet_reclamos": sheet_reclamos,
             "user": user_info
         }
@@ -671,6 +680,17 @@ COMPONENTES = {
             "sheet_clientes": sheet_clientes,
             "user": user_info
         }
+    },
+    "Importar reclamos": {
+        "render": render_importacion_reclamos,
+        "permiso": "importar_reclamos",
+        "params": {
+            "df_reclamos": df_reclamos,
+            "df_clientes": df_clientes,
+            "sheet_reclamos": sheet_reclamos,
+            "sheet_clientes": sheet_clientes,
+            "user": user_info
+        }
     }
 }
 
@@ -0,0 +1,61 @@
+"""
+Benchmark del parseo de fechas: parse_fecha fila por fila vs parse_fechas_series
+Uso: python benchmarks/benchmark_fechas.py [cantidad_de_filas]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.date_utils import parse_fecha, parse_fechas_series
+
+def generar_fechas(n, semilla=42):
+    """Columna parecida a 'Fecha y hora' de la hoja: un formato dominante, variantes y vacíos"""
+    rng = np.random.default_rng(semilla)
+    base = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit="s")
+    fechas = pd.Series(base.strftime("%d/%m/%Y %H:%M:%S"))
+
+    tipo = rng.random(n)
+    variantes = {
+        (0.90, 0.95): base.strftime("%d/%m/%Y %H:%M"),
+        (0.95, 0.98): base.strftime("%Y-%m-%d %H:%M:%S"),
+        (0.98, 0.99): base.strftime("%d/%m/%Y"),
+    }
+    for (desde, hasta), valores in variantes.items():
+        mascara = (tipo >= desde) & (tipo < hasta)
+        fechas[mascara] = np.asarray(valores)[mascara]
+    fechas[tipo >= 0.99] = ""
+    return fechas
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo de varias corridas (segundos) y el último resultado"""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def main(n=100_000):
+    fechas = generar_fechas(n)
+
+    t_fila, por_fila = medir(lambda: fechas.apply(lambda x: parse_fecha(x) if not pd.isna(x) else pd.NaT), 1)
+    t_vector, vectorizado = medir(lambda: parse_fechas_series(fechas))
+
+    esperado = pd.to_datetime(por_fila, utc=True)
+    obtenido = vectorizado.dt.tz_convert("UTC")
+    iguales = ((esperado == obtenido) | (esperado.isna() & obtenido.isna())).all()
+
+    print(f"Filas: {n:,}")
+    print(f"parse_fecha (apply):  {t_fila:8.3f} s")
+    print(f"parse_fechas_series:  {t_vector:8.3f} s")
+    print(f"Aceleración:          {t_fila / t_vector:8.1f}x")
+    print(f"Resultados idénticos: {'sí' if iguales else 'NO'}")
+    return 0 if iguales else 1
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -3,11 +3,14 @@ Componente de autenticación profesional estilo CRM
 Versión 3.0 - Optimizado para Render con mejoras de seguridad
 """
 import streamlit as st
-from utils.data_manager import safe_get_sheet_data
+from utils.user_directory import get_user_directory
+from utils.session_store import get_session_store
+from components.notifications import get_notification_bus, get_current_session_id
+from utils.permissions import has_permission as _has_permission, mascara_de_rol
 from config.settings import (
     WORKSHEET_USUARIOS,
-    COLUMNAS_USUARIOS,
     PERMISOS_POR_ROL,
+    SESSION_QUERY_PARAM,
     IS_RENDER,
     DEFAULT_VALUES
 )
@@ -15,6 +18,35 @@ import time
 from utils.styles import get_loading_spinner
 from utils.helpers import cloud_log, is_cloud_environment
 
+def _token_en_url():
+    """Token de sesión firmado presente en la URL, si lo hay"""
+    return st.query_params.get(SESSION_QUERY_PARAM)
+
+def _guardar_token_en_url(token):
+    """Escribe (o quita) el token de sesión en la URL conservando el resto de parámetros"""
+    if token:
+        st.query_params[SESSION_QUERY_PARAM] = token
+    else:
+        st.query_params.pop(SESSION_QUERY_PARAM, None)
+
+def _reanudar_sesion():
+    """Restaura la sesión desde el token de la URL tras un refresh o reconexión"""
+    token = _token_en_url()
+    if not token:
+        return
+
+    user_info = get_session_store().reanudar(token)
+    if user_info:
+        st.session_state.auth.update({
+            'logged_in': True,
+            'user_info': user_info,
+            'token': token,
+            'reanudada': True
+        })
+        cloud_log(f"Sesión reanudada para {user_info.get('username', 'unknown')}", "info")
+    else:
+        _guardar_token_en_url(None)
+
 def init_auth_session():
     """Inicializa las variables de sesión de forma segura"""
     if 'auth' not in st.session_state:
@@ -22,13 +54,22 @@ def init_auth_session():
             'logged_in': False,
             'user_info': None,
             'login_attempts': 0,
-            'last_login_attempt': 0
+            'last_login_attempt': 0,
+            'token': None
         }
+        _reanudar_sesion()
 
-def logout():
-    """Cierra la sesión del usuario de forma segura"""
-    user_info = st.session_state.auth.get('user_info', {})
-    cloud_log(f"Usuario {user_info.get('username', 'unknown')} cerró sesión", "info")
+def _cerrar_sesion():
+    """Revoca el token y reinicia el estado de autenticación de esta sesión"""
+    token = st.session_state.auth.get('token')
+    if token:
+        get_session_store().revocar(token)
+        _guardar_token_en_url(None)
+
+    # La sesión deja de recibir notificaciones en memoria
+    session_id = get_current_session_id()
+    if session_id:
+        get_notification_bus().unsubscribe(session_id)
     
     st.session_state.auth = {
         'logged_in': False, 
@@ -36,6 +77,12 @@ def logout():
         'login_attempts': 0,
         'last_login_attempt': 0
     }
+
+def logout():
+    """Cierra la sesión del usuario de forma segura"""
+    user_info = st.session_state.auth.get('user_info') or {}
+    cloud_log(f"Usuario {user_info.get('username', 'unknown')} cerró sesión", "info")
+    _cerrar_sesion()
     st.cache_data.clear()
 
 def verify_credentials(username, password, sheet_usuarios):
@@ -49,44 +96,20 @@ def verify_credentials(username, password, sheet_usuarios):
                 cloud_log(f"Intento de login bloqueado para {username} - Demasiados intentos", "warning")
                 return None
         
-        df_usuarios = safe_get_sheet_data(sheet_usuarios, COLUMNAS_USUARIOS)
+        # Búsqueda O(1) en el directorio en memoria: el login no lee la hoja
+        user_data = get_user_directory(sheet_usuarios).autenticar(username, password)
         
-        if df_usuarios.empty:
-            cloud_log("No se encontraron usuarios en la base de datos", "error")
-            return None
-        
-        # Normalización robusta de datos
-        df_usuarios["username"] = df_usuarios["username"].astype(str).str.strip().str.lower()
-        df_usuarios["password"] = df_usuarios["password"].astype(str).str.strip()
-        
-        # Manejo flexible de campo 'activo'
-        df_usuarios["activo"] = df_usuarios["activo"].astype(str).str.upper().isin([
-            "SI", "TRUE", "1", "SÍ", "VERDADERO", "YES", "Y", "ACTIVO"
-        ])
-        
-        usuario = df_usuarios[
-            (df_usuarios["username"] == username.strip().lower()) & 
-            (df_usuarios["password"] == password.strip()) &
-            (df_usuarios["activo"])
-        ]
-        
-        if not usuario.empty:
-            user_data = usuario.iloc[0]
+        if user_data:
             cloud_log(f"Login exitoso para {username}", "info")
             
             # Reiniciar contador de intentos
             st.session_state.auth['login_attempts'] = 0
             
+            rol = user_data["rol"] if user_data["rol"] in PERMISOS_POR_ROL else DEFAULT_VALUES['rol_usuario']
             return {
-                "username": user_data["username"],
-                "nombre": user_data.get("nombre", user_data["username"]),
-                "rol": user_data.get("rol", DEFAULT_VALUES['rol_usuario']).lower(),
-                "email": user_data.get("email", ""),
-                "telefono": user_data.get("telefono", ""),
-                "permisos": PERMISOS_POR_ROL.get(
-                    user_data.get("rol", "").lower(), 
-                    PERMISOS_POR_ROL.get(DEFAULT_VALUES['rol_usuario'], {})
-                ).get('permisos', [])
+                **user_data,
+                "permisos": PERMISOS_POR_ROL.get(rol, {}).get('permisos', []),
+                "mascara_permisos": mascara_de_rol(rol)
             }
         else:
             # Incrementar contador de intentos fallidos
@@ -247,11 +270,14 @@ def render_login(sheet_usuarios):
                     user_info = verify_credentials(username, password, sheet_usuarios)
                     
                     if user_info:
+                        token = get_session_store().crear(user_info)
                         st.session_state.auth.update({
                             'logged_in': True,
                             'user_info': user_info,
-                            'login_attempts': 0
+                            'login_attempts': 0,
+                            'token': token
                         })
+                        _guardar_token_en_url(token)
                         st.success(f"✅ Bienvenido, {user_info['nombre']}!")
                         time.sleep(1)
                         st.rerun()
@@ -268,6 +294,19 @@ def render_login(sheet_usuarios):
     </div>
     """, unsafe_allow_html=True)
 
+def renovar_sesion():
+    """
+    Renueva la sesión persistida; se llama una vez por rerun desde app.py.
+    Si venció por inactividad (SESSION_TIMEOUT) se cierra.
+    """
+    init_auth_session()
+    auth = st.session_state.auth
+    token = auth.get('token')
+    if auth['logged_in'] and token and get_session_store().reanudar(token) is None:
+        cloud_log("Sesión vencida por inactividad", "info")
+        # Sin st.cache_data.clear(): el vencimiento de una sesión no invalida los datos de las demás
+        _cerrar_sesion()
+
 def check_authentication():
     """Verifica si el usuario está autenticado de forma segura"""
     init_auth_session()
@@ -277,16 +316,7 @@ def has_permission(required_permission):
     """Verifica permisos del usuario con seguridad mejorada"""
     if not check_authentication():
         return False
-        
-    user_info = st.session_state.auth.get('user_info')
-    if not user_info:
-        return False
-        
-    # Admin tiene acceso completo
-    if user_info.get('rol') == 'admin':
-        return True
-        
-    return required_permission in user_info.get('permisos', [])
+    return _has_permission(required_permission)
 
 def render_user_info():
     """Renderiza información del usuario con diseño CRM profesional"""
@@ -0,0 +1,38 @@
+# components/buscador_clientes.py
+
+import streamlit as st
+from utils.busqueda import buscar_clientes, RESULTADOS_POR_DEFECTO
+
+def _etiqueta_cliente(registro):
+    """Texto de cada resultado en el selector"""
+    partes = [f"N° {registro.get('Nº Cliente', '')}", registro.get('Nombre', '')]
+    if registro.get('Dirección'):
+        partes.append(registro['Dirección'])
+    return " - ".join(p for p in partes if p)
+
+def render_buscador_clientes(df_clientes, key, label="🔍 Buscar cliente", k=RESULTADOS_POR_DEFECTO):
+    """
+    Búsqueda por nombre, dirección, teléfono o N° de cliente. Solo se envían al
+    navegador los k mejores resultados. Devuelve el N° de cliente elegido o None.
+    """
+    consulta = st.text_input(
+        label,
+        placeholder="Nombre, dirección, teléfono o N° de cliente",
+        key=f"{key}_consulta"
+    ).strip()
+
+    if not consulta:
+        return None
+
+    resultados = buscar_clientes(df_clientes, consulta, k)
+    if not resultados:
+        st.info("No se encontraron clientes para esa búsqueda")
+        return None
+
+    opciones = {_etiqueta_cliente(registro): registro.get('Nº Cliente', '') for _, registro, _ in resultados}
+    seleccion = st.selectbox(
+        f"Resultados ({len(opciones)})",
+        list(opciones),
+        key=f"{key}_resultado"
+    )
+    return str(opciones.get(seleccion, '')).strip() or None
@@ -2,10 +2,13 @@
 
 import streamlit as st
 import pandas as pd
-import uuid
-from utils.date_utils import ahora_argentina, format_fecha, parse_fecha
+from utils.date_utils import ahora_argentina, format_fecha
 from utils.api_manager import api_manager, batch_update_sheet
 from utils.helpers import cloud_log, format_phone_number, show_success, show_error, show_warning, show_info
+from utils.indices import get_client_index, get_claims_index
+from utils.ids import generar_id
+from components.exportador import render_exportador
+from components.buscador_clientes import render_buscador_clientes
 from config.settings import SECTORES_DISPONIBLES, IS_RENDER, DEBUG_MODE
 
 # --- ESTILOS CSS PARA GESTIÓN DE CLIENTES ---
@@ -185,6 +188,8 @@ def render_gestion_clientes(df_clientes, df_reclamos, sheet_clientes, user_role)
 
     cambios = False
 
+    render_exportador(df_clientes, "clientes", key="exportar_clientes")
+
     if user_role == 'admin':
         cambios = _mostrar_edicion_cliente(df_clientes, df_reclamos, sheet_clientes) or cambios
         st.markdown("---")
@@ -210,37 +215,26 @@ def _mostrar_edicion_cliente(df_clientes, df_reclamos, sheet_clientes):
     """Muestra el formulario para editar un cliente existente con estilo CRM"""
     cambios = False
 
-    # Filtrar solo clientes con número válido
-    clientes_validos = df_clientes[
-        df_clientes["Nº Cliente"].astype(str).str.strip() != ""
-    ]
-    
-    if clientes_validos.empty:
+    if df_clientes.empty:
         show_info("📝 No hay clientes registrados para editar")
         return cambios
 
-    clientes_lista = clientes_validos["Nº Cliente"].astype(str).tolist()
-    
-    cliente_seleccionado = st.selectbox(
-        "🔍 Seleccionar cliente para editar", 
-        clientes_lista,
-        help="Elegí el cliente que querés editar",
-        key="cliente_selector"
+    # Búsqueda indexada: solo los mejores resultados llegan al selector
+    cliente_seleccionado = render_buscador_clientes(
+        df_clientes,
+        key="cliente_selector",
+        label="🔍 Buscar cliente para editar"
     )
 
     if not cliente_seleccionado:
         return cambios
 
-    # Búsqueda robusta del cliente
-    cliente_actual = df_clientes[
-        df_clientes["Nº Cliente"].astype(str).str.strip() == str(cliente_seleccionado).strip()
-    ]
-    
-    if cliente_actual.empty:
+    fila = get_client_index(df_clientes).fila(cliente_seleccionado)
+    if fila is None:
         show_error(f"❌ No se encontró el cliente {cliente_seleccionado}")
         return cambios
 
-    cliente_actual = cliente_actual.iloc[0]
+    cliente_actual = df_clientes.loc[fila]
     datos_actuales = _formatear_datos_cliente(cliente_actual)
     
     st.markdown(f"""
@@ -393,9 +387,7 @@ def _mostrar_edicion_cliente(df_clientes, df_reclamos, sheet_clientes):
 
 def _mostrar_reclamos_cliente(nro_cliente, df_reclamos):
     """Muestra los últimos reclamos del cliente con estilo CRM"""
-    df_reclamos_cliente = df_reclamos[
-        df_reclamos["Nº Cliente"].astype(str).str.strip() == str(nro_cliente).strip()
-    ].copy()
+    df_reclamos_cliente = df_reclamos.loc[get_claims_index(df_reclamos).reclamos(nro_cliente)].copy()
     
     if df_reclamos_cliente.empty:
         st.markdown("""
@@ -406,7 +398,6 @@ def _mostrar_reclamos_cliente(nro_cliente, df_reclamos):
         return
     
     try:
-        df_reclamos_cliente["Fecha y hora"] = df_reclamos_cliente["Fecha y hora"].apply(parse_fecha)
         df_reclamos_cliente = df_reclamos_cliente.sort_values("Fecha y hora", ascending=False).head(3)
         
         with st.expander("📄 Historial de Reclamos Recientes", expanded=False):
@@ -466,12 +457,12 @@ def _actualizar_cliente(cliente_actual, sheet_clientes, nuevo_sector, nuevo_nomb
             show_success("✅ Cliente actualizado correctamente")
             
             # NOTIFICACIÓN MEJORADA
-            if 'notification_manager' in st.session_state:
+            if 'notification_service' in st.session_state:
                 num_cliente = str(cliente_actual['Nº Cliente'])
                 nombre_cliente = str(nuevo_nombre).upper()
                 mensaje = f"✏️ Cliente N° {num_cliente} - {nombre_cliente} actualizado"
                 
-                st.session_state.notification_manager.add(
+                st.session_state.notification_service.emit(
                     notification_type="cliente_actualizado",
                     message=mensaje,
                     user_target="all",
@@ -522,7 +513,7 @@ def _guardar_nuevo_cliente(df_clientes, sheet_clientes, nuevo_nro, nuevo_sector,
         show_warning(mensaje_error)
 
     try:
-        nuevo_id = str(uuid.uuid4())[:8].upper()  # ID más corto
+        nuevo_id = generar_id(get_client_index(df_clientes).ids)
 
         nueva_fila = [
             nuevo_nro.strip(), 
@@ -544,10 +535,10 @@ def _guardar_nuevo_cliente(df_clientes, sheet_clientes, nuevo_nro, nuevo_sector,
             show_success("✅ Nuevo cliente agregado correctamente")
             
             # NOTIFICACIÓN MEJORADA
-            if 'notification_manager' in st.session_state:
+            if 'notification_service' in st.session_state:
                 mensaje = f"🆕 Cliente N° {nuevo_nro.strip()} - {nuevo_nombre.strip().upper()} agregado"
                 
-                st.session_state.notification_manager.add(
+                st.session_state.notification_service.emit(
                     notification_type="cliente_nuevo",
                     message=mensaje,
                     user_target="all",
@@ -0,0 +1,46 @@
+# components/exportador.py
+
+import streamlit as st
+from utils.exportacion import exportar, FORMATOS_EXPORTACION
+from utils.helpers import show_error
+from utils.date_utils import ahora_argentina
+from config.settings import EXPORT_FORMATS, DEBUG_MODE
+
+def render_exportador(df, nombre_base, key, columnas=None, titulo="⬇️ Exportar"):
+    """
+    Exporta la vista recibida (ya filtrada) a CSV, Excel o Parquet. El archivo se
+    genera solo al pedirlo y vive únicamente en la corrida que lo arma: no se
+    guarda en la sesión.
+    """
+    formatos = [f for f in EXPORT_FORMATS if f in FORMATOS_EXPORTACION]
+
+    with st.expander(f"{titulo} ({len(df)} filas)"):
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            formato = st.selectbox("Formato", formatos, key=f"{key}_formato")
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            generar = st.button("Preparar archivo", key=f"{key}_generar", use_container_width=True)
+
+        if not generar:
+            return
+
+        try:
+            with st.spinner("Generando archivo..."):
+                nombre = f"{nombre_base}_{ahora_argentina().strftime('%Y%m%d_%H%M')}"
+                datos, archivo, mime = exportar(df, formato, nombre, columnas)
+        except Exception as e:
+            show_error(f"❌ No se pudo exportar: {str(e)}")
+            if DEBUG_MODE:
+                st.exception(e)
+            return
+
+        st.download_button(
+            f"📥 Descargar {archivo}",
+            datos,
+            file_name=archivo,
+            mime=mime,
+            key=f"{key}_descargar",
+            use_container_width=True
+        )
+        st.caption("El archivo no se guarda en la sesión: descargalo ahora o volvé a prepararlo después.")
@@ -3,9 +3,9 @@ Componente del dashboard de métricas profesional
 Versión 3.1 - Optimizado para Render con métricas avanzadas
 """
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 from utils.helpers import cloud_log
+from utils.date_utils import ahora_argentina
 from config.settings import IS_RENDER
 
 def metric_card(value, label, icon, trend=None, delta=None, help_text=None):
@@ -101,10 +101,7 @@ def render_metrics_dashboard(df_reclamos, is_mobile=False):
         
         # Métricas temporales (últimas 24/48 horas)
         try:
-            df_fechas = df.copy()
-            df_fechas["Fecha y hora"] = pd.to_datetime(df_fechas["Fecha y hora"], errors='coerce')
-            ultimas_24h = df_fechas[df_fechas["Fecha y hora"] >= (datetime.now() - timedelta(hours=24))]
-            reclamos_24h = len(ultimas_24h)
+            reclamos_24h = int((df["Fecha y hora"] >= ahora_argentina() - timedelta(hours=24)).sum())
         except:
             reclamos_24h = 0
 
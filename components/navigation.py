@@ -18,6 +18,7 @@ def render_sidebar_navigation():
         {"icon": "🔧", "label": "Seguimiento", "key": "Seguimiento técnico", "permiso": "seguimiento_tecnico"},
         {"icon": "✅", "label": "Cierre", "key": "Cierre de Reclamos", "permiso": "cierre_reclamos"},
         {"icon": "📋", "label": "Reportes", "key": "Reportes", "permiso": "reportes"},
+        {"icon": "📥", "label": "Importar", "key": "Importar reclamos", "permiso": "importar_reclamos"},
         {"icon": "⚙️", "label": "Configuración", "key": "Configuración", "permiso": "configuracion"}
     ]
     
@@ -1,12 +1,66 @@
 # components/notification_bell.py
 
+import time
 import streamlit as st
-import uuid
 from utils.date_utils import format_fecha
-from config.settings import NOTIFICATION_TYPES
-from components.notifications import get_cached_notifications
+from config.settings import NOTIFICATION_TYPES, MAX_NOTIFICATIONS, NOTIFICATION_REFRESH_INTERVAL
+from components.notifications import (
+    get_cached_notifications,
+    get_notification_bus,
+    get_current_session_id
+)
 from utils.helpers import cloud_log
 
+# La campana es un fragment que se reejecuta solo cada segundo: lo emitido en
+# este proceso llega por el bus sin leer la hoja; lo de otros workers, al
+# releerla cada NOTIFICATION_REFRESH_INTERVAL segundos.
+
+def _id_numerico(notificacion):
+    """ID de la notificación como entero (0 si no es válido)"""
+    texto = str(notificacion.get('ID', '')).strip()
+    return int(texto) if texto.isdigit() else 0
+
+def _sincronizar_bandeja(user):
+    """Combina la relectura periódica de la hoja con lo recibido por el bus"""
+    ahora = time.time()
+    if (st.session_state.get('notificaciones_usuario') != user
+            or ahora - st.session_state.get('notificaciones_releidas', 0) >= NOTIFICATION_REFRESH_INTERVAL):
+        marcadas = st.session_state.get('notificaciones_marcadas', set())
+        frescas = [n for n in get_cached_notifications(user) if str(n.get('ID')) not in marcadas]
+        # La lectura cacheada puede no incluir lo último que llegó por el bus
+        ultimo_id = max((_id_numerico(n) for n in frescas), default=0)
+        recientes = [
+            n for n in st.session_state.get('notificaciones_bandeja', [])
+            if st.session_state.get('notificaciones_usuario') == user and _id_numerico(n) > ultimo_id
+        ]
+        st.session_state.notificaciones_bandeja = (recientes + list(frescas))[:MAX_NOTIFICATIONS]
+        st.session_state.notificaciones_usuario = user
+        st.session_state.notificaciones_releidas = ahora
+
+    session_id = get_current_session_id()
+    if session_id:
+        bus = get_notification_bus()
+        bus.subscribe(session_id, user)
+
+        nuevas = bus.drain(session_id)
+        if nuevas:
+            bandeja = st.session_state.notificaciones_bandeja
+            conocidas = {str(n.get('ID')) for n in bandeja}
+            nuevas = [n for n in reversed(nuevas) if str(n.get('ID')) not in conocidas]
+            st.session_state.notificaciones_bandeja = (nuevas + bandeja)[:MAX_NOTIFICATIONS]
+
+    return st.session_state.notificaciones_bandeja
+
+def _quitar_de_bandeja(notification_ids):
+    """Saca de la bandeja de la sesión las notificaciones marcadas como leídas"""
+    ids = {str(i) for i in notification_ids}
+    # La lectura cacheada puede seguir trayéndolas como no leídas hasta que venza
+    st.session_state.notificaciones_marcadas = st.session_state.get('notificaciones_marcadas', set()) | ids
+    st.session_state.notificaciones_bandeja = [
+        n for n in st.session_state.get('notificaciones_bandeja', [])
+        if str(n.get('ID')) not in ids
+    ]
+
 def render_notification_bell():
     """Muestra el ícono de notificaciones con estilo CRM profesional"""
     if 'notification_manager' not in st.session_state:
@@ -16,9 +70,6 @@ def render_notification_bell():
     if not user:
         return
         
-    notifications = get_cached_notifications(user)
-    unread_count = len([n for n in notifications if not n.get('Leída', False)])
-    
     # Estilos CSS para el componente de notificaciones
     notification_styles = """
     <style>
@@ -107,98 +158,105 @@ def render_notification_bell():
     
     # Ícono en el sidebar con estilo CRM
     with st.sidebar:
-        st.markdown("---")
-        st.markdown("**📋 Notificaciones**")
-        
-        # Contenedor principal de la campana
-        col1, col2 = st.columns([1, 3])
-        
-        with col1:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 0.5rem;">
-                <div style="font-size: 1.5rem;">🔔</div>
-                {f'<div class="notification-count">{unread_count}</div>' if unread_count > 0 else ''}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            if st.button("Ver notificaciones", 
-                        use_container_width=True,
-                        help="Mostrar panel de notificaciones",
-                        key="notification_toggle_btn"):
-                st.session_state.show_notifications = not st.session_state.get('show_notifications', False)
-        
-        # Panel de notificaciones
-        if st.session_state.get('show_notifications'):
-            with st.container():
-                st.markdown("---")
-                
-                if not notifications:
-                    st.info("🎉 No tienes notificaciones nuevas", icon="ℹ️")
-                    return
+        _render_campana(user)
+
+@st.fragment(run_every=1)
+def _render_campana(user):
+    """Campana y panel de notificaciones de la sesión"""
+    notifications = _sincronizar_bandeja(user)
+    unread_count = len([n for n in notifications if not n.get('Leída', False)])
+
+    st.markdown("---")
+    st.markdown("**📋 Notificaciones**")
+    
+    # Contenedor principal de la campana
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        st.markdown(f"""
+        <div style="text-align: center; padding: 0.5rem;">
+            <div style="font-size: 1.5rem;">🔔</div>
+            {f'<div class="notification-count">{unread_count}</div>' if unread_count > 0 else ''}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        if st.button("Ver notificaciones", 
+                    use_container_width=True,
+                    help="Mostrar panel de notificaciones",
+                    key="notification_toggle_btn"):
+            st.session_state.show_notifications = not st.session_state.get('show_notifications', False)
+    
+    # Panel de notificaciones
+    if st.session_state.get('show_notifications'):
+        with st.container():
+            st.markdown("---")
+            
+            if not notifications:
+                st.info("🎉 No tienes notificaciones nuevas", icon="ℹ️")
+                return
+            
+            # Mostrar las 10 notificaciones más recientes
+            for idx, notification in enumerate(notifications[:10]):
+                is_unread = not notification.get('Leída', False)
+                icon = NOTIFICATION_TYPES.get(notification.get('Tipo'), {}).get('icon', '📋')
                 
-                # Mostrar las 10 notificaciones más recientes
-                for idx, notification in enumerate(notifications[:10]):
-                    is_unread = not notification.get('Leída', False)
-                    icon = NOTIFICATION_TYPES.get(notification.get('Tipo'), {}).get('icon', '📋')
-                    
-                    # Contenedor de notificación
-                    unread_class = "unread" if is_unread else ""
-                    st.markdown(f"""
-                    <div class="notification-item {unread_class}">
-                        <div style="display: flex; align-items: flex-start; gap: 0.75rem;">
-                            <div class="notification-icon">{icon}</div>
-                            <div class="notification-content">
-                                <div style="font-weight: 600; color: var(--text-primary); margin-bottom: 0.25rem;">
-                                    {notification.get('Mensaje', '[Sin mensaje]')}
-                                </div>
-                                <div class="notification-time">
-                                    {format_fecha(notification.get('Fecha_Hora'))}
-                                </div>
+                # Contenedor de notificación
+                unread_class = "unread" if is_unread else ""
+                st.markdown(f"""
+                <div class="notification-item {unread_class}">
+                    <div style="display: flex; align-items: flex-start; gap: 0.75rem;">
+                        <div class="notification-icon">{icon}</div>
+                        <div class="notification-content">
+                            <div style="font-weight: 600; color: var(--text-primary); margin-bottom: 0.25rem;">
+                                {notification.get('Mensaje', '[Sin mensaje]')}
+                            </div>
+                            <div class="notification-time">
+                                {format_fecha(notification.get('Fecha_Hora'))}
                             </div>
                         </div>
                     </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Botón para marcar como leída (solo para no leídas)
-                    if is_unread:
-                        notif_id = notification.get("ID", "unknown")
-                        unique_suffix = uuid.uuid4().hex[:8]
-                        key = f"read_{notif_id}_{idx}_{unique_suffix}"
-                        
-                        if st.button("✅ Marcar como leída", 
-                                   key=key,
-                                   use_container_width=True,
-                                   type="secondary",
-                                   size="small"):
-                            if notif_id != "unknown":
-                                try:
-                                    success = st.session_state.notification_manager.mark_as_read([int(notif_id)])
-                                    if success:
-                                        cloud_log(f"Notificación {notif_id} marcada como leída por {user}", "info")
-                                        st.cache_data.clear()
-                                        st.rerun()
-                                    else:
-                                        st.error("❌ Error al marcar como leída")
-                                except Exception as e:
-                                    st.error(f"❌ Error: {str(e)}")
-                                    cloud_log(f"Error marcando notificación como leída: {str(e)}", "error")
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Botón para marcar como leída (solo para no leídas)
+                if is_unread:
+                    notif_id = notification.get("ID", "unknown")
+                    key = f"read_{notif_id}_{idx}"
                     
-                    if idx < len(notifications[:10]) - 1:
-                        st.markdown("---")
+                    if st.button("✅ Marcar como leída", 
+                               key=key,
+                               use_container_width=True,
+                               type="secondary",
+                               size="small"):
+                        if notif_id != "unknown":
+                            try:
+                                success = st.session_state.notification_manager.mark_as_read(user, [int(notif_id)])
+                                if success:
+                                    cloud_log(f"Notificación {notif_id} marcada como leída por {user}", "info")
+                                    _quitar_de_bandeja([notif_id])
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Error al marcar como leída")
+                            except Exception as e:
+                                st.error(f"❌ Error: {str(e)}")
+                                cloud_log(f"Error marcando notificación como leída: {str(e)}", "error")
                 
-                # Botón para marcar todas como leídas
-                if unread_count > 0:
+                if idx < len(notifications[:10]) - 1:
                     st.markdown("---")
-                    if st.button("📭 Marcar todas como leídas", 
-                               use_container_width=True,
-                               type="primary"):
-                        unread_ids = [n['ID'] for n in notifications if not n.get('Leída', False) and n.get('ID') != 'unknown']
-                        if unread_ids:
-                            success = st.session_state.notification_manager.mark_as_read(unread_ids)
-                            if success:
-                                cloud_log(f"{len(unread_ids)} notificaciones marcadas como leídas por {user}", "info")
-                                st.cache_data.clear()
-                                st.rerun()
-                            else:
-                                st.error("❌ Error al marcar todas como leídas")
\ No newline at end of file
+            
+            # Botón para marcar todas como leídas
+            if unread_count > 0:
+                st.markdown("---")
+                if st.button("📭 Marcar todas como leídas", 
+                           use_container_width=True,
+                           type="primary"):
+                    unread_ids = [n['ID'] for n in notifications if not n.get('Leída', False) and n.get('ID') != 'unknown']
+                    if unread_ids:
+                        success = st.session_state.notification_manager.mark_as_read(user, unread_ids)
+                        if success:
+                            cloud_log(f"{len(unread_ids)} notificaciones marcadas como leídas por {user}", "info")
+                            _quitar_de_bandeja(unread_ids)
+                            st.rerun()
+                        else:
+                            st.error("❌ Error al marcar todas como leídas")
@@ -3,12 +3,29 @@
 import streamlit as st
 import pandas as pd
 import time
-from datetime import datetime, timedelta
+import threading
+from collections import deque
+from datetime import datetime
 from utils.date_utils import ahora_argentina, format_fecha
 from utils.api_manager import api_manager
-from utils.data_manager import safe_get_sheet_data, batch_update_sheet
+from utils.data_manager import safe_get_sheet_data
 from utils.helpers import cloud_log
-from config.settings import NOTIFICATION_TYPES, COLUMNAS_NOTIFICACIONES, MAX_NOTIFICATIONS, IS_RENDER
+from utils.unit_of_work import LoteEscritura
+from config.settings import (
+    NOTIFICATION_TYPES,
+    COLUMNAS_NOTIFICACIONES,
+    MAX_NOTIFICATIONS,
+    MAX_GLOBAL_NOTIFICATIONS,
+    NOTIFICATION_DEDUP_WINDOW,
+    NOTIFICATION_RATE_LIMITS,
+    NOTIFICATION_RETENTION_DAYS,
+    NOTIFICATION_RETENTION_BY_TYPE,
+    NOTIFICATION_RETENTION_DEFAULT_DAYS,
+    NOTIFICATION_RETENTION_INTERVAL,
+    NOTIFICATION_READ_RECEIPTS_TTL,
+    NOTIFICATION_BUS_TTL,
+    IS_RENDER
+)
 
 @st.cache_data(ttl=15 if IS_RENDER else 30)  # TTL más corto en Render
 def get_cached_notifications(username, unread_only=True, limit=MAX_NOTIFICATIONS):
@@ -22,9 +39,136 @@ def get_cached_notifications(username, unread_only=True, limit=MAX_NOTIFICATIONS
         cloud_log(f"Error en get_cached_notifications: {str(e)}", "error")
         return []
 
+def _comprimir_ids(ids):
+    """Comprime un conjunto de IDs en rangos: {1,2,3,7} -> '1-3,7'"""
+    ordenados = sorted({int(i) for i in ids})
+    if not ordenados:
+        return ""
+
+    tramos = []
+    inicio = fin = ordenados[0]
+    for actual in ordenados[1:]:
+        if actual == fin + 1:
+            fin = actual
+            continue
+        tramos.append(f"{inicio}-{fin}" if fin > inicio else str(inicio))
+        inicio = fin = actual
+    tramos.append(f"{inicio}-{fin}" if fin > inicio else str(inicio))
+    return ",".join(tramos)
+
+def _expandir_ids(texto):
+    """Inversa de _comprimir_ids: '1-3,7' -> {1,2,3,7}"""
+    ids = set()
+    for tramo in str(texto or "").split(","):
+        tramo = tramo.strip()
+        if not tramo:
+            continue
+        try:
+            if "-" in tramo:
+                inicio, fin = (int(x) for x in tramo.split("-", 1))
+                ids.update(range(inicio, fin + 1))
+            else:
+                ids.add(int(tramo))
+        except ValueError:
+            continue
+    return ids
+
+class ReadReceiptStore:
+    """
+    Estado de lectura por usuario, separado de las filas de notificaciones.
+    Se guarda una fila por username con los IDs leídos comprimidos en rangos,
+    así marcar como leídas es una única escritura chica y los conteos se
+    resuelven en memoria.
+    """
+    def __init__(self, sheet_leidas, ttl=NOTIFICATION_READ_RECEIPTS_TTL):
+        self.sheet = sheet_leidas
+        self.ttl = ttl
+        self._leidas = None  # username -> set de IDs
+        self._filas = {}     # username -> fila en la hoja
+        self._proxima_fila = 2
+        self._cargado_en = 0
+        self._lock = threading.Lock()
+
+    def _cargar(self, forzar=False):
+        """Relee la hoja si la copia en memoria venció (o si se fuerza). Devuelve False si la lectura falló"""
+        if not forzar and self._leidas is not None and time.time() - self._cargado_en < self.ttl:
+            return True
+
+        data, error = api_manager.safe_sheet_operation(self.sheet.get_all_values)
+        if error:
+            # Se sigue con la última copia (o vacía): el estado de lectura queda aproximado
+            # pero la bandeja no desaparece; _cargado_en no cambia y se reintenta en la próxima
+            cloud_log(f"No se pudo leer el estado de lectura: {error}", "error")
+            if self._leidas is None:
+                self._leidas = {}
+            return False
+
+        self._leidas = {}
+        self._filas = {}
+        for offset, fila in enumerate((data or [])[1:]):
+            if not fila or not str(fila[0]).strip():
+                continue
+            username = str(fila[0]).strip().lower()
+            ids = _expandir_ids(fila[1] if len(fila) > 1 else "")
+            # Si otro proceso duplicó la fila del usuario se unen los sets y se escribe en la primera
+            self._leidas[username] = self._leidas.get(username, set()) | ids
+            self._filas.setdefault(username, offset + 2)  # +2: header + base 1
+        self._proxima_fila = max(len(data or []), 1) + 1
+        self._cargado_en = time.time()
+        return True
+
+    def leidas(self, username):
+        """Devuelve el set de IDs leídos por el usuario"""
+        if not username:
+            return set()
+        with self._lock:
+            self._cargar()
+            return set(self._leidas.get(str(username).strip().lower(), set()))
+
+    def marcar(self, username, notification_ids):
+        """Agrega IDs al set del usuario con una sola escritura"""
+        username = str(username or "").strip().lower()
+        nuevos = {int(i) for i in notification_ids if str(i).strip().isdigit()}
+        if not username or not nuevos:
+            return False
+
+        with self._lock:
+            # Releer antes de escribir: otro worker pudo marcar o crear la fila del usuario
+            if not self._cargar(forzar=True):
+                return False
+            actuales = self._leidas.get(username, set())
+            if nuevos <= actuales:
+                return True
+
+            combinadas = actuales | nuevos
+            valores = [username, _comprimir_ids(combinadas), format_fecha(ahora_argentina())]
+
+            fila = self._filas.get(username)
+            if fila:
+                rango = f"A{fila}:{_col_letra(len(valores))}{fila}"
+                _, error = api_manager.safe_sheet_operation(self.sheet.update, rango, [valores])
+            else:
+                _, error = api_manager.safe_sheet_operation(self.sheet.append_row, valores)
+                if error is None:
+                    self._filas[username] = self._proxima_fila
+                    self._proxima_fila += 1
+
+            if error is not None:
+                cloud_log(f"Error guardando lectura de {username}: {error}", "error")
+                return False
+
+            self._leidas[username] = combinadas
+            return True
+
 class NotificationManager:
-    def __init__(self, sheet_notifications):
+    def __init__(self, sheet_notifications, sheet_leidas=None):
         self.sheet = sheet_notifications
+        self.receipts = ReadReceiptStore(sheet_leidas) if sheet_leidas is not None else None
+        self.ultimo_reporte_retencion = None
+        self._ultimo_id = 0  # último ID entregado por este proceso
+        self._bloque_global = None  # copia en memoria del bloque de slots globales
+        self._lock_ids = threading.Lock()
+        self.listeners = []  # callbacks que reciben cada notificación escrita
         self.max_retries = 3 if IS_RENDER else 1  # Menos reintentos en Render
 
     def _get_next_id(self):
@@ -33,14 +177,16 @@ class NotificationManager:
             try:
                 df = safe_get_sheet_data(self.sheet, COLUMNAS_NOTIFICACIONES)
                 if df.empty or 'ID' not in df.columns:
-                    return 1
+                    df = pd.DataFrame(columns=['ID'])
                 
                 # Manejo robusto de IDs
                 valid_ids = pd.to_numeric(df['ID'], errors='coerce').dropna()
-                if valid_ids.empty:
-                    return 1
-                    
-                return int(valid_ids.max()) + 1
+                leido = int(valid_ids.max()) if not valid_ids.empty else 0
+
+                # La lectura está cacheada: no repetir IDs ya entregados en este proceso
+                with self._lock_ids:
+                    self._ultimo_id = max(leido, self._ultimo_id) + 1
+                    return self._ultimo_id
             except Exception as e:
                 cloud_log(f"Intento {attempt + 1} fallido al obtener ID: {str(e)}", "warning")
                 if attempt == self.max_retries - 1:
@@ -58,20 +204,11 @@ class NotificationManager:
             return False
 
         try:
-            # Limitar notificaciones globales a 10
+            # Las globales rotan sobre un bloque fijo de filas (ring buffer)
             if user_target == 'all':
-                df_notif = safe_get_sheet_data(self.sheet, COLUMNAS_NOTIFICACIONES)
-                df_all = df_notif[df_notif['Usuario_Destino'] == 'all']
-                
-                if len(df_all) >= 10:
-                    # Convertir fecha de forma segura
-                    df_all = df_all.copy()
-                    df_all['Fecha_Hora'] = pd.to_datetime(df_all['Fecha_Hora'], errors='coerce')
-                    
-                    # Eliminar la más antigua si hay fechas válidas
-                    if not df_all['Fecha_Hora'].isna().all():
-                        mas_antigua_idx = df_all['Fecha_Hora'].idxmin()
-                        self._delete_rows([mas_antigua_idx])
+                return self._agregar_notificacion_global(
+                    notification_type, message, claim_id, action
+                )
 
             return self._agregar_notificacion_individual(
                 notification_type, message, user_target, claim_id, action
@@ -81,14 +218,9 @@ class NotificationManager:
             cloud_log(f"Error al agregar notificación: {str(e)}", "error")
             return False
 
-    def _agregar_notificacion_individual(self, notification_type, message, user_target, claim_id=None, action=None):
-        """Agrega una notificación individual con manejo robusto de errores"""
-        new_id = self._get_next_id()
-        if new_id is None:
-            return False
-
-        # Preparar datos de la notificación
-        new_notification = [
+    def _construir_fila(self, new_id, notification_type, message, user_target, claim_id=None, action=None):
+        """Arma la fila de la hoja para una notificación nueva"""
+        return [
             new_id,
             notification_type,
             NOTIFICATION_TYPES[notification_type]['priority'],
@@ -100,6 +232,26 @@ class NotificationManager:
             action or ""
         ]
 
+    def _avisar_listeners(self, fila):
+        """Entrega la notificación recién escrita a los listeners registrados"""
+        notificacion = dict(zip(COLUMNAS_NOTIFICACIONES, fila))
+        for listener in list(self.listeners):
+            try:
+                listener(notificacion)
+            except Exception as e:
+                cloud_log(f"Error en listener de notificaciones: {str(e)}", "error")
+
+    def _agregar_notificacion_individual(self, notification_type, message, user_target, claim_id=None, action=None):
+        """Agrega una notificación individual con manejo robusto de errores"""
+        new_id = self._get_next_id()
+        if new_id is None:
+            return False
+
+        # Preparar datos de la notificación
+        new_notification = self._construir_fila(
+            new_id, notification_type, message, user_target, claim_id, action
+        )
+
         # Intentar agregar la notificación
         for attempt in range(self.max_retries):
             success, error = api_manager.safe_sheet_operation(
@@ -108,6 +260,7 @@ class NotificationManager:
             )
             if success:
                 cloud_log(f"Notificación {new_id} agregada para {user_target}", "info")
+                self._avisar_listeners(new_notification)
                 return True
                 
             if IS_RENDER and attempt < self.max_retries - 1:
@@ -116,6 +269,190 @@ class NotificationManager:
         cloud_log(f"Fallo al agregar notificación para {user_target}", "error")
         return False
 
+    # --------------------------
+    # RING BUFFER DE NOTIFICACIONES GLOBALES
+    # --------------------------
+    # Las filas 2..MAX_GLOBAL_NOTIFICATIONS+1 quedan reservadas para las
+    # notificaciones 'all'. Cada global nueva pisa un slot en orden circular,
+    # así nunca se borran filas ni se corren los índices del resto.
+
+    def _fila_slot_libre(self):
+        """Fila placeholder para un slot global todavía sin usar"""
+        fila = [""] * len(COLUMNAS_NOTIFICACIONES)
+        fila[COLUMNAS_NOTIFICACIONES.index("Usuario_Destino")] = "all"
+        fila[COLUMNAS_NOTIFICACIONES.index("Leída")] = True
+        return fila
+
+    def _leer_bloque_global(self, usar_memoria=False):
+        """Lee solo el bloque de slots globales (sin pasar por la caché)"""
+        if usar_memoria and self._bloque_global is not None:
+            return [list(fila) for fila in self._bloque_global]
+
+        rango = f"A2:{_col_letra(len(COLUMNAS_NOTIFICACIONES))}{MAX_GLOBAL_NOTIFICATIONS + 1}"
+        valores, error = api_manager.safe_sheet_operation(self.sheet.get, rango)
+        if error:
+            cloud_log(f"Error leyendo bloque de notificaciones globales: {error}", "error")
+            return None
+        return [list(fila) for fila in (valores or [])]
+
+    def _recordar_slot(self, bloque, slot, fila):
+        """Actualiza la copia en memoria del bloque global tras ocupar un slot"""
+        bloque = [list(f) for f in bloque]
+        bloque[slot] = list(fila)
+        self._bloque_global = bloque
+
+    def _es_bloque_global(self, destinos):
+        """Indica si las primeras MAX_GLOBAL_NOTIFICATIONS filas ya forman el bloque de slots"""
+        primeras = [str(d).strip() for d in list(destinos)[:MAX_GLOBAL_NOTIFICATIONS]]
+        return len(primeras) == MAX_GLOBAL_NOTIFICATIONS and all(d == "all" for d in primeras)
+
+    def _asegurar_bloque_global(self, bloque):
+        """
+        Garantiza que las primeras MAX_GLOBAL_NOTIFICATIONS filas sean slots globales.
+        Si faltan (hoja vieja o recién creada) arma el bloque una única vez: las
+        notificaciones 'all' que estaban más abajo se mudan al bloque (las más
+        recientes, hasta completarlo) y el resto de los slots se crea vacío, todo
+        en un solo batchUpdate.
+        """
+        idx_destino = COLUMNAS_NOTIFICACIONES.index("Usuario_Destino")
+
+        slots_validos = 0
+        for fila in bloque:
+            destino = str(fila[idx_destino]).strip() if len(fila) > idx_destino else ""
+            if destino != "all":
+                break
+            slots_validos += 1
+
+        faltantes = MAX_GLOBAL_NOTIFICATIONS - slots_validos
+        if faltantes <= 0:
+            return bloque[:MAX_GLOBAL_NOTIFICATIONS]
+
+        # Lectura completa (solo mientras el bloque no existe): globales fuera del bloque
+        valores, error = api_manager.safe_sheet_operation(self.sheet.get_all_values)
+        if error:
+            cloud_log(f"Error leyendo notificaciones para armar el bloque global: {error}", "error")
+            return None
+
+        ancho = len(COLUMNAS_NOTIFICACIONES)
+        filas = [(list(fila) + [""] * ancho)[:ancho] for fila in (valores or [])[1:]]
+        ids = pd.to_numeric(pd.Series([fila[0] for fila in filas], dtype=object), errors='coerce')
+        sueltas = [
+            pos for pos in range(slots_validos, len(filas))
+            if str(filas[pos][idx_destino]).strip() == "all" and pd.notna(ids[pos])
+        ]
+
+        # Las más recientes ocupan los slots; las que no entran quedan donde están hasta la retención
+        migradas = sorted(sorted(sueltas, key=lambda pos: ids[pos], reverse=True)[:faltantes])
+        nuevas_filas = []
+        for pos in migradas:
+            fila = list(filas[pos])
+            fila[0] = int(ids[pos])
+            nuevas_filas.append(fila)
+        nuevas_filas += [self._fila_slot_libre() for _ in range(faltantes - len(migradas))]
+
+        lote = LoteEscritura()
+        for inicio, fin in reversed(_rangos_contiguos(migradas)):
+            lote.borrar_filas(self.sheet, inicio + 2, fin + 2)  # +2: header + base 1
+        lote.insertar_filas(self.sheet, 2 + slots_validos, faltantes)
+        lote.update(self.sheet, f"A{2 + slots_validos}", nuevas_filas)
+
+        ok, error = lote.commit()
+        if not ok:
+            cloud_log(f"Error creando slots de notificaciones globales: {error}", "error")
+            return None
+
+        safe_get_sheet_data.clear()
+        cloud_log(
+            f"Se reservaron {faltantes} slots para notificaciones globales "
+            f"({len(migradas)} notificaciones existentes mudadas al bloque)",
+            "info"
+        )
+        return bloque[:slots_validos] + nuevas_filas
+
+    def _elegir_slot_global(self, bloque):
+        """Devuelve la posición (0-based) del próximo slot en orden circular"""
+        ids = pd.to_numeric(
+            pd.Series([fila[0] if fila else "" for fila in bloque]),
+            errors='coerce'
+        )
+
+        libres = ids[ids.isna()]
+        if not libres.empty:
+            return int(libres.index[0])
+
+        # Todos ocupados: el siguiente al último escrito es el más antiguo
+        return (int(ids.idxmax()) + 1) % MAX_GLOBAL_NOTIFICATIONS
+
+    def _agregar_notificacion_global(self, notification_type, message, claim_id=None, action=None):
+        """Escribe una notificación 'all' pisando su slot con un único update por rango"""
+        bloque = self._leer_bloque_global()
+        if bloque is None:
+            return False
+
+        bloque = self._asegurar_bloque_global(bloque)
+        if bloque is None:
+            return False
+
+        new_id = self._get_next_id()
+        if new_id is None:
+            return False
+
+        slot = self._elegir_slot_global(bloque)
+        fila_hoja = slot + 2  # +2: header + base 1 de Google Sheets
+        new_notification = self._construir_fila(
+            new_id, notification_type, message, 'all', claim_id, action
+        )
+        rango = f"A{fila_hoja}:{_col_letra(len(new_notification))}{fila_hoja}"
+
+        for attempt in range(self.max_retries):
+            success, error = api_manager.safe_sheet_operation(
+                self.sheet.update,
+                rango,
+                [new_notification]
+            )
+            if error is None:
+                cloud_log(f"Notificación global {new_id} escrita en slot {slot + 1}", "info")
+                self._recordar_slot(bloque, slot, new_notification)
+                self._avisar_listeners(new_notification)
+                return True
+
+            if IS_RENDER and attempt < self.max_retries - 1:
+                time.sleep(2 ** attempt)
+
+        cloud_log("Fallo al escribir notificación global", "error")
+        return False
+
+    def preparar_en_lote(self, lote, notification_type, message, user_target='all', claim_id=None, action=None):
+        """
+        Encola la notificación en un LoteEscritura en lugar de escribirla ya.
+        Los listeners reciben la notificación solo si el lote se confirma.
+        """
+        if notification_type not in NOTIFICATION_TYPES:
+            cloud_log(f"Tipo de notificación no válido: {notification_type}", "error")
+            return None
+
+        new_id = self._get_next_id()
+        if new_id is None:
+            return None
+
+        fila = self._construir_fila(new_id, notification_type, message, user_target, claim_id, action)
+
+        if user_target == 'all':
+            bloque = self._leer_bloque_global(usar_memoria=True)
+            bloque = self._asegurar_bloque_global(bloque) if bloque is not None else None
+            if bloque is None:
+                return None
+
+            slot = self._elegir_slot_global(bloque)
+            # Se reserva el slot ya, para que otra global del mismo lote use el siguiente
+            self._recordar_slot(bloque, slot, fila)
+            lote.update(self.sheet, f"A{slot + 2}:{_col_letra(len(fila))}{slot + 2}", [fila])
+        else:
+            lote.append(self.sheet, [fila])
+
+        lote.al_confirmar(lambda: self._avisar_listeners(fila))
+        return fila
+
     def get_for_user(self, username, unread_only=True, limit=MAX_NOTIFICATIONS):
         """Obtiene notificaciones para un usuario con manejo robusto de datos"""
         try:
@@ -129,18 +466,26 @@ class NotificationManager:
             # Manejo seguro de fechas
             df['Fecha_Hora'] = pd.to_datetime(df['Fecha_Hora'], errors='coerce')
             
-            # Manejo seguro de campo Leída
-            df['Leída'] = (
+            # Estado de lectura: por usuario (receipts) y, para las individuales,
+            # también la columna histórica de la fila
+            leida_en_fila = (
                 df['Leída']
                 .astype(str)
                 .str.strip()
                 .str.upper()
                 .map({'FALSE': False, 'TRUE': True, 'FALSO': False, 'VERDADERO': True})
                 .fillna(False)
+                .astype(bool)
+            )
+            leidas_usuario = self.receipts.leidas(username) if self.receipts else set()
+            ids = pd.to_numeric(df['ID'], errors='coerce')
+            df['Leída'] = ids.isin(leidas_usuario) | (
+                leida_en_fila & (df['Usuario_Destino'] != 'all')
             )
 
-            # Filtrar notificaciones para el usuario
+            # Filtrar notificaciones para el usuario (ignorando slots globales libres)
             mask = (df['Usuario_Destino'] == username) | (df['Usuario_Destino'] == 'all')
+            mask &= df['ID'].astype(str).str.strip() != ''
             if unread_only:
                 mask &= (~df['Leída'])
 
@@ -163,107 +508,154 @@ class NotificationManager:
         notifications = self.get_for_user(username, unread_only=True)
         return len(notifications)
 
-    def mark_as_read(self, notification_ids):
-        """Marca notificaciones como leídas con manejo robusto"""
-        if not notification_ids:
+    def mark_as_read(self, username, notification_ids):
+        """Marca notificaciones como leídas solo para el usuario indicado"""
+        if not notification_ids or self.receipts is None:
             return False
 
         try:
-            df = safe_get_sheet_data(self.sheet, COLUMNAS_NOTIFICACIONES)
-            if df.empty:
-                return False
-
-            # Filtrar IDs válidos
             valid_ids = [int(id) for id in notification_ids if str(id).isdigit()]
             if not valid_ids:
                 return False
 
-            # Preparar actualizaciones
-            updates = []
-            for _, row in df[df['ID'].isin(valid_ids)].iterrows():
-                updates.append({
-                    'range': f"H{row.name + 2}",  # +2 porque Google Sheets empieza en 1 y header en 1
-                    'values': [[True]]
-                })
-
-            if not updates:
-                return False
-
-            # Ejecutar actualización por lotes
-            success, error = api_manager.safe_sheet_operation(
-                batch_update_sheet,
-                self.sheet,
-                updates,
-                is_batch=True
-            )
-            
+            success = self.receipts.marcar(username, valid_ids)
             if success:
-                cloud_log(f"Notificaciones {valid_ids} marcadas como leídas", "info")
-            else:
-                cloud_log(f"Error al marcar notificaciones: {error}", "error")
-                
+                cloud_log(f"Notificaciones {valid_ids} marcadas como leídas por {username}", "info")
             return success
 
         except Exception as e:
             cloud_log(f"Error al marcar como leídas: {str(e)}", "error")
             return False
 
-    def clear_old(self, days=30):
-        """Limpia notificaciones antiguas de forma segura"""
+    def _dias_retencion(self, notification_type, priority):
+        """Días de retención de una notificación según su tipo y prioridad"""
+        if notification_type in NOTIFICATION_RETENTION_BY_TYPE:
+            return NOTIFICATION_RETENTION_BY_TYPE[notification_type]
+        if not priority:
+            priority = NOTIFICATION_TYPES.get(notification_type, {}).get('priority', '')
+        return NOTIFICATION_RETENTION_DAYS.get(priority, NOTIFICATION_RETENTION_DEFAULT_DAYS)
+
+    def clear_old(self, days=None):
+        """
+        Elimina las notificaciones vencidas según la política de retención (o
+        las más viejas que `days`, si se indica). Devuelve un reporte de la
+        compactación o None si hubo un error.
+        """
         try:
-            df = safe_get_sheet_data(self.sheet, COLUMNAS_NOTIFICACIONES)
+            # Lectura fresca: las posiciones deben coincidir con la hoja actual
+            valores, error = api_manager.safe_sheet_operation(self.sheet.get_all_values)
+            if error:
+                cloud_log(f"Error al leer notificaciones para retención: {error}", "error")
+                return None
+
+            filas = [fila + [''] * (len(COLUMNAS_NOTIFICACIONES) - len(fila)) for fila in (valores or [])[1:]]
+            df = pd.DataFrame(
+                [fila[:len(COLUMNAS_NOTIFICACIONES)] for fila in filas],
+                columns=COLUMNAS_NOTIFICACIONES
+            )
+            reporte = {'eliminadas': 0, 'rangos': 0, 'filas_restantes': len(df)}
             if df.empty:
-                return True
-
-            # Manejo seguro de fechas
-            df = df.copy()
-            df['Fecha_Hora'] = pd.to_datetime(df['Fecha_Hora'], errors='coerce')
-            df = df[df['Fecha_Hora'].notna()]
-
-            # Calcular fecha de corte
-            cutoff_date = ahora_argentina() - timedelta(days=days)
-            old_ids = df[df['Fecha_Hora'] < cutoff_date]['ID'].tolist()
+                self.ultimo_reporte_retencion = reporte
+                return reporte
 
-            if not old_ids:
-                return True
-
-            # Eliminar notificaciones antiguas
-            success = self._delete_rows(old_ids)
-            if success:
-                cloud_log(f"Eliminadas {len(old_ids)} notificaciones antiguas", "info")
-            return success
+            fechas = pd.to_datetime(df['Fecha_Hora'], format='%d/%m/%Y %H:%M', errors='coerce')
+            if days is None:
+                dias = [self._dias_retencion(t, p) for t, p in zip(df['Tipo'], df['Prioridad'])]
+            else:
+                dias = [days] * len(df)
+            ahora = ahora_argentina().replace(tzinfo=None)
+            vencimientos = ahora - pd.to_timedelta(dias, unit='D')
+
+            vencidas = (fechas < vencimientos).to_numpy().copy()
+            bloque_global = self._es_bloque_global(df['Usuario_Destino'])
+            if bloque_global:
+                vencidas[:MAX_GLOBAL_NOTIFICATIONS] = False  # el bloque de slots rota solo
+
+            # Conservar la fila con el ID más alto para que la numeración no retroceda
+            ids = pd.to_numeric(df['ID'], errors='coerce')
+            if ids.notna().any():
+                vencidas[int(ids.to_numpy().argmax())] = False
+
+            posiciones = [int(pos) for pos in vencidas.nonzero()[0]]
+            if not posiciones:
+                self.ultimo_reporte_retencion = reporte
+                return reporte
+
+            rangos = _rangos_contiguos(posiciones)
+            if not self._delete_rows(posiciones, proteger_bloque=bloque_global):
+                return None
+
+            reporte = {
+                'eliminadas': len(posiciones),
+                'rangos': len(rangos),
+                'filas_restantes': len(df) - len(posiciones)
+            }
+            self.ultimo_reporte_retencion = reporte
+            try:
+                safe_get_sheet_data.clear()
+            except Exception:
+                pass
+            cloud_log(
+                f"Retención de notificaciones: {reporte['eliminadas']} eliminadas en "
+                f"{reporte['rangos']} rangos, quedan {reporte['filas_restantes']} filas",
+                "info"
+            )
+            return reporte
 
         except Exception as e:
             cloud_log(f"Error al limpiar notificaciones antiguas: {str(e)}", "error")
-            return False
+            return None
 
-    def _delete_rows(self, row_ids):
-        """Elimina filas de forma segura con manejo de errores"""
+    def _delete_rows(self, row_positions, proteger_bloque=True):
+        """
+        Elimina filas de forma segura con manejo de errores.
+        Recibe posiciones del DataFrame (0 = primera fila de datos) y las agrupa
+        en rangos contiguos. Con `proteger_bloque` (solo si el bloque de slots
+        globales ya existe) nunca borra ese bloque.
+        """
         try:
+            minimo = MAX_GLOBAL_NOTIFICATIONS if proteger_bloque else 0
+            posiciones = [
+                int(pos) for pos in row_positions
+                if str(pos).isdigit() and int(pos) >= minimo
+            ]
+
+            # Rangos de abajo hacia arriba para no correr índices
             updates = [{
-                'delete_dimension': {
+                'deleteDimension': {
                     'range': {
                         'sheetId': self.sheet.id,
                         'dimension': 'ROWS',
-                        'startIndex': int(row_id),
-                        'endIndex': int(row_id) + 1
+                        'startIndex': inicio + 1,  # +1 por el header (índices base 0)
+                        'endIndex': fin + 2
                     }
                 }
-            } for row_id in row_ids if str(row_id).isdigit()]
+            } for inicio, fin in reversed(_rangos_contiguos(posiciones))]
 
             if not updates:
                 return False
 
             success, error = api_manager.safe_sheet_operation(
-                self.sheet.batch_update,
+                self.sheet.spreadsheet.batch_update,
                 {'requests': updates}
             )
-            return success
+            return error is None
             
         except Exception as e:
             cloud_log(f"Error al eliminar filas: {str(e)}", "error")
             return False
 
+    def _liberar_slot_global(self, posicion):
+        """Vacía un slot global en lugar de borrar la fila"""
+        fila_hoja = int(posicion) + 2
+        rango = f"A{fila_hoja}:{_col_letra(len(COLUMNAS_NOTIFICACIONES))}{fila_hoja}"
+        _, error = api_manager.safe_sheet_operation(
+            self.sheet.update,
+            rango,
+            [self._fila_slot_libre()]
+        )
+        return error is None
+
     def delete_notification_by_id(self, notif_id):
         """Elimina una notificación por ID de forma segura"""
         try:
@@ -272,28 +664,283 @@ class NotificationManager:
                 return False
 
             # Buscar la notificación
-            fila = df[df['ID'] == notif_id]
+            fila = df[df['ID'].astype(str).str.strip() == str(notif_id).strip()]
             if fila.empty:
                 return False
 
-            row_id = int(fila.index[0])
-            return self._delete_rows([row_id])
+            posicion = int(fila.index[0])
+            bloque_global = self._es_bloque_global(df['Usuario_Destino'])
+            if bloque_global and posicion < MAX_GLOBAL_NOTIFICATIONS:
+                return self._liberar_slot_global(posicion)
+            return self._delete_rows([posicion], proteger_bloque=bloque_global)
             
         except Exception as e:
             cloud_log(f"Error al eliminar notificación {notif_id}: {str(e)}", "error")
             return False
 
 
+def _rangos_contiguos(posiciones):
+    """Agrupa posiciones en rangos contiguos: [1,2,3,7] -> [(1, 3), (7, 7)]"""
+    rangos = []
+    for pos in sorted(set(posiciones)):
+        if rangos and pos == rangos[-1][1] + 1:
+            rangos[-1] = (rangos[-1][0], pos)
+        else:
+            rangos.append((pos, pos))
+    return rangos
+
+def _col_letra(n):
+    """Convierte un número de columna (base 1) a su letra de Excel"""
+    letras = ""
+    while n:
+        n, resto = divmod(n - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+class NotificationBus:
+    """
+    Bus publish/subscribe en memoria: cada sesión abierta tiene una bandeja con
+    las notificaciones nuevas que le corresponden, sin leer la hoja. Las
+    sesiones que no lo consultan durante `ttl` segundos se dan de baja solas.
+    """
+
+    def __init__(self, capacidad=MAX_NOTIFICATIONS, ttl=NOTIFICATION_BUS_TTL):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._suscriptores = {}  # session_id -> {'username', 'bandeja', 'visto'}
+        self._lock = threading.Lock()
+
+    def _purgar(self, ahora):
+        """Da de baja las sesiones inactivas (cerradas sin logout); requiere el lock"""
+        vencidas = [
+            session_id for session_id, suscriptor in self._suscriptores.items()
+            if ahora - suscriptor['visto'] > self.ttl
+        ]
+        for session_id in vencidas:
+            del self._suscriptores[session_id]
+
+    def subscribe(self, session_id, username):
+        """Registra (o renueva) la sesión"""
+        ahora = time.time()
+        with self._lock:
+            self._purgar(ahora)
+            suscriptor = self._suscriptores.get(session_id)
+            if suscriptor is None or suscriptor['username'] != username:
+                suscriptor = {'username': username, 'bandeja': deque(maxlen=self.capacidad)}
+                self._suscriptores[session_id] = suscriptor
+            suscriptor['visto'] = ahora
+
+    def unsubscribe(self, session_id):
+        """Da de baja una sesión"""
+        with self._lock:
+            self._suscriptores.pop(session_id, None)
+
+    def publish(self, notificacion):
+        """Deja la notificación en la bandeja de cada sesión destinataria"""
+        destino = str(notificacion.get('Usuario_Destino', ''))
+        with self._lock:
+            self._purgar(time.time())
+            for suscriptor in self._suscriptores.values():
+                if destino in ('all', suscriptor['username']):
+                    suscriptor['bandeja'].append(dict(notificacion))
+
+    def drain(self, session_id):
+        """Devuelve y vacía la bandeja de la sesión"""
+        with self._lock:
+            suscriptor = self._suscriptores.get(session_id)
+            if suscriptor is None:
+                return []
+            suscriptor['visto'] = time.time()
+            pendientes = list(suscriptor['bandeja'])
+            suscriptor['bandeja'].clear()
+            return pendientes
+
+class NotificationService:
+    """
+    Capa de emisión sobre NotificationManager. Cada notificación tiene una clave
+    de idempotencia (tipo, destino, sujeto, ventana de tiempo) y cada tipo puede
+    tener un intervalo mínimo entre emisiones; ambas se resuelven en memoria, de
+    modo que los reruns repetidos no escriben en la hoja.
+    """
+
+    def __init__(self, manager, bus=None, ventana=NOTIFICATION_DEDUP_WINDOW, limites=None):
+        self.manager = manager
+        self.bus = bus
+        if bus is not None:
+            manager.listeners.append(self._publicar)
+        self.ventana = ventana
+        self.limites = dict(NOTIFICATION_RATE_LIMITS if limites is None else limites)
+        self._emitidas = {}  # clave de idempotencia -> vencimiento
+        self._ultima_emision = {}  # (tipo, destino) -> timestamp
+        self._lock = threading.Lock()
+
+    def _publicar(self, notificacion):
+        """Publica en el bus cada notificación que el gestor escribió en la hoja"""
+        self.bus.publish(notificacion)
+
+    def _purgar(self, ahora):
+        """Descarta las claves cuya ventana ya venció"""
+        vencidas = [clave for clave, vence in self._emitidas.items() if vence <= ahora]
+        for clave in vencidas:
+            del self._emitidas[clave]
+
+    def emit(self, notification_type, message, user_target='all', claim_id=None,
+             action=None, sujeto=None, ventana=None):
+        """
+        Emite una notificación salvo que ya se haya emitido en la ventana o que el
+        tipo esté limitado. Devuelve True si la notificación existe (nueva o previa).
+        """
+        if notification_type not in NOTIFICATION_TYPES:
+            cloud_log(f"Tipo de notificación no válido: {notification_type}", "error")
+            return False
+
+        reserva = self._reservar(notification_type, message, user_target, sujeto, ventana)
+        if reserva is None:
+            return True
+
+        success = self.manager.add(
+            notification_type=notification_type,
+            message=message,
+            user_target=user_target,
+            claim_id=claim_id,
+            action=action
+        )
+
+        if not success:
+            self._liberar(*reserva)
+
+        return success
+
+    def emit_en_lote(self, lote, notification_type, message, user_target='all', claim_id=None,
+                     action=None, sujeto=None, ventana=None):
+        """Igual que emit, pero la escritura viaja dentro del LoteEscritura indicado"""
+        if notification_type not in NOTIFICATION_TYPES:
+            cloud_log(f"Tipo de notificación no válido: {notification_type}", "error")
+            return False
+
+        reserva = self._reservar(notification_type, message, user_target, sujeto, ventana)
+        if reserva is None:
+            return True
+
+        fila = self.manager.preparar_en_lote(
+            lote, notification_type, message, user_target, claim_id, action
+        )
+        if fila is None:
+            self._liberar(*reserva)
+            return False
+
+        lote.al_fallar(lambda: self._liberar(*reserva))
+        return True
+
+    def _reservar(self, notification_type, message, user_target, sujeto, ventana):
+        """
+        Reserva la clave de idempotencia y el turno del límite de frecuencia.
+        Devuelve None si la notificación ya se emitió o está limitada.
+        """
+        ventana = self.ventana if ventana is None else ventana
+        sujeto = message if sujeto is None else sujeto
+        ahora = time.time()
+        bucket = int(ahora // ventana) if ventana else 0
+        clave = (notification_type, str(user_target), str(sujeto), bucket)
+        clave_limite = (notification_type, str(user_target))
+
+        with self._lock:
+            self._purgar(ahora)
+            if clave in self._emitidas:
+                return None
+
+            intervalo = self.limites.get(notification_type, 0)
+            ultima = self._ultima_emision.get(clave_limite)
+            if intervalo and ultima is not None and ahora - ultima < intervalo:
+                return None
+
+            # Reservar antes de escribir para que otra sesión no duplique en paralelo
+            self._emitidas[clave] = (bucket + 1) * ventana if ventana else ahora + 1
+            self._ultima_emision[clave_limite] = ahora
+
+        return clave, clave_limite, ahora
+
+    def _liberar(self, clave, clave_limite, ahora):
+        """Deshace una reserva cuando la escritura falló"""
+        with self._lock:
+            self._emitidas.pop(clave, None)
+            if self._ultima_emision.get(clave_limite) == ahora:
+                del self._ultima_emision[clave_limite]
+
+class NotificationRetentionJob:
+    """Tarea en segundo plano que aplica la retención de notificaciones periódicamente"""
+
+    def __init__(self, manager, intervalo=NOTIFICATION_RETENTION_INTERVAL):
+        self.manager = manager
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(
+            target=self._ejecutar, name="retencion-notificaciones", daemon=True
+        )
+
+    def start(self):
+        """Inicia la tarea si no está corriendo"""
+        if not self._hilo.is_alive():
+            self._hilo.start()
+        return self
+
+    def stop(self):
+        """Solicita la detención de la tarea"""
+        self._detener.set()
+
+    def _ejecutar(self):
+        """Bucle principal: compacta y espera hasta la próxima corrida"""
+        while not self._detener.is_set():
+            self.manager.clear_old()
+            self._detener.wait(self.intervalo)
+
+@st.cache_resource
+def _get_shared_notification_manager(_sheet_notifications, _sheet_leidas):
+    """Un único gestor por proceso: el estado de lectura se comparte entre sesiones"""
+    return NotificationManager(_sheet_notifications, _sheet_leidas)
+
+@st.cache_resource
+def get_notification_bus():
+    """Bus de notificaciones compartido por todas las sesiones del proceso"""
+    return NotificationBus()
+
+@st.cache_resource
+def _get_shared_notification_service(_sheet_notifications, _sheet_leidas):
+    """Un único servicio de emisión por proceso: la deduplicación abarca todas las sesiones"""
+    return NotificationService(
+        _get_shared_notification_manager(_sheet_notifications, _sheet_leidas),
+        bus=get_notification_bus()
+    )
+
+def get_current_session_id():
+    """ID de la sesión de Streamlit en curso (None fuera de un script)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+@st.cache_resource
+def _start_retention_job(_manager):
+    """Arranca una sola tarea de retención por proceso"""
+    return NotificationRetentionJob(_manager).start()
+
+
 # ✅ FUNCIÓN DE INICIALIZACIÓN
-def init_notification_manager(sheet_notifications):
+def init_notification_manager(sheet_notifications, sheet_leidas=None):
     """Inicializa el gestor de notificaciones con estilo CRM"""
     if 'notification_manager' not in st.session_state:
-        st.session_state.notification_manager = NotificationManager(sheet_notifications)
+        st.session_state.notification_manager = _get_shared_notification_manager(
+            sheet_notifications, sheet_leidas
+        )
         cloud_log("Gestor de notificaciones inicializado", "info")
 
-        # Limpieza programada de notificaciones antiguas
-        user = st.session_state.get('auth', {}).get('user_info', {}).get('username', '')
-        if user and st.session_state.get('clear_notifications_job') is None:
-            if st.session_state.notification_manager.clear_old():
-                st.session_state.clear_notifications_job = True
-                cloud_log("Tarea de limpieza de notificaciones programada", "info")
\ No newline at end of file
+        # Retención periódica de notificaciones antiguas (una tarea por proceso)
+        _start_retention_job(st.session_state.notification_manager)
+
+    if 'notification_service' not in st.session_state:
+        st.session_state.notification_service = _get_shared_notification_service(
+            sheet_notifications, sheet_leidas
+        )
@@ -3,12 +3,15 @@
 import time
 from datetime import datetime
 import pytz
-import pandas as pd
 import streamlit as st
 
-from utils.date_utils import format_fecha, ahora_argentina, parse_fecha
+from utils.date_utils import format_fecha, ahora_argentina
 from utils.api_manager import api_manager
 from utils.data_manager import batch_update_sheet
+from utils.indices import get_claims_index, actualizar_estado_reclamo
+from utils.unit_of_work import LoteEscritura
+from utils.filtros import get_filter_index, etiqueta_con_conteo
+from utils.vistas import get_reclamos_enriquecidos
 from config.settings import (
     SECTORES_DISPONIBLES,
     TECNICOS_DISPONIBLES,
@@ -81,11 +84,8 @@ def render_cierre_reclamos(df_reclamos, df_clientes, sheet_reclamos, sheet_clien
         }
 
     try:
-        # Normalización de datos
-        df_reclamos["ID Reclamo"] = df_reclamos["ID Reclamo"].astype(str).str.strip()
-        df_reclamos["Nº Cliente"] = df_reclamos["Nº Cliente"].astype(str).str.strip()
-        df_reclamos["Técnico"] = df_reclamos["Técnico"].astype(str).fillna("")
-        df_reclamos["Fecha y hora"] = df_reclamos["Fecha y hora"].apply(parse_fecha)
+        # Vista compartida ya normalizada (IDs, técnico y fechas); no se modifica en el lugar
+        df_reclamos = get_reclamos_enriquecidos(df_reclamos, df_clientes)
 
         # Procesar cada sección
         cambios_tecnicos = _mostrar_reasignacion_tecnico(df_reclamos, sheet_reclamos)
@@ -134,9 +134,8 @@ def _mostrar_reasignacion_tecnico(df_reclamos, sheet_reclamos):
     if not cliente_busqueda:
         return False
 
-    reclamos_filtrados = df_reclamos[
-        (df_reclamos["Nº Cliente"] == cliente_busqueda) & 
-        (df_reclamos["Estado"].isin(["Pendiente", "En curso"]))
+    reclamos_filtrados = df_reclamos.loc[
+        get_claims_index(df_reclamos).activos(cliente_busqueda, incluir_desconexiones=False)
     ]
 
     if reclamos_filtrados.empty:
@@ -184,9 +183,11 @@ def _mostrar_reasignacion_tecnico(df_reclamos, sheet_reclamos):
                 
                 if success:
                     st.success("✅ Técnico actualizado correctamente.")
-                    if 'notification_manager' in st.session_state and nuevo_tecnico:
+                    if reclamo['Estado'] == "Pendiente":
+                        actualizar_estado_reclamo(reclamo["ID Reclamo"], "En curso")
+                    if 'notification_service' in st.session_state and nuevo_tecnico:
                         mensaje = f"📌 El cliente N° {reclamo['Nº Cliente']} fue asignado al técnico {nuevo_tecnico}."
-                        st.session_state.notification_manager.add(
+                        st.session_state.notification_service.emit(
                             notification_type="reclamo_asignado",
                             message=mensaje,
                             user_target="all",
@@ -208,7 +209,8 @@ def _mostrar_reasignacion_tecnico(df_reclamos, sheet_reclamos):
     return False
 
 def _mostrar_reclamos_en_curso(df_reclamos, df_clientes, sheet_reclamos, sheet_clientes):
-    en_curso = df_reclamos[df_reclamos["Estado"] == "En curso"].copy()
+    # Filtros sobre el índice de bitmaps del snapshot (sin copias intermedias)
+    indice = get_filter_index(df_reclamos, ("Estado", "Sector", "Técnico"), multivalor=("Técnico",))
     
     # Filtros
     col1, col2 = st.columns(2)
@@ -220,23 +222,19 @@ def _mostrar_reclamos_en_curso(df_reclamos, df_clientes, sheet_reclamos, sheet_c
             format_func=lambda x: f"Sector {x}" if x != "Todos" else x
         )
     
-    if filtro_sector != "Todos":
-        en_curso = en_curso[en_curso["Sector"] == str(filtro_sector)]
+    filtros = {"Estado": "En curso", "Sector": filtro_sector}
+    base = indice.mascara(filtros)
 
-    if en_curso.empty:
+    if not base.any():
         st.info("📭 No hay reclamos en curso en este momento.")
         # Limpiar el filtro si no hay reclamos
         if 'filtro_tecnicos_persistente' in st.session_state:
             st.session_state.filtro_tecnicos_persistente = []
         return False
 
-    # Filtro por técnicos
-    tecnicos_unicos = sorted(set(
-        tecnico.strip().upper()
-        for t in en_curso["Técnico"]
-        for tecnico in t.split(",")
-        if tecnico.strip()
-    ))
+    # Filtro por técnicos: solo los que tienen reclamos en curso con el filtro actual
+    opciones_tecnicos = [(t, n) for t, n in indice.opciones("Técnico", filtros) if n]
+    tecnicos_unicos = [t for t, _ in opciones_tecnicos]
 
     # Inicializar filtro en session_state si no existe
     if 'filtro_tecnicos_persistente' not in st.session_state:
@@ -255,20 +253,15 @@ def _mostrar_reclamos_en_curso(df_reclamos, df_clientes, sheet_reclamos, sheet_c
             "👷 Filtrar por técnico asignado", 
             tecnicos_unicos, 
             key="filtro_tecnicos_cierre",
-            default=st.session_state.filtro_tecnicos_persistente
+            default=st.session_state.filtro_tecnicos_persistente,
+            format_func=etiqueta_con_conteo(opciones_tecnicos)
         )
 
     # Feedback visual del filtro
     if tecnicos_seleccionados:
         st.info(f"🔍 Filtrado por técnico(s): {', '.join(tecnicos_seleccionados)}")
 
-    if tecnicos_seleccionados:
-        en_curso = en_curso[
-            en_curso["Técnico"].apply(lambda t: any(
-                tecnico.strip().upper() in t.upper() 
-                for tecnico in tecnicos_seleccionados
-            ))
-        ]
+    en_curso = df_reclamos.iloc[indice.posiciones({"Técnico": tecnicos_seleccionados}, base)]
 
     st.markdown(f"### 📋 Reclamos en curso: {len(en_curso)} encontrados")
     
@@ -289,8 +282,8 @@ def _mostrar_reclamos_en_curso(df_reclamos, df_clientes, sheet_reclamos, sheet_c
 
     st.dataframe(df_mostrar, use_container_width=True, height=400,
                 column_config={
-                    "Ingreso": st.column_config.TextColumn("Ingreso", help="Fecha de ingreso"),
-                    "Cierre": st.column_config.TextColumn("Cierre", help="Fecha de cierre (si está resuelto)"),
+                    "Ingreso": st.column_config.DatetimeColumn("Ingreso", help="Fecha de ingreso", format="DD/MM/YYYY HH:mm"),
+                    "Cierre": st.column_config.DatetimeColumn("Cierre", help="Fecha de cierre (si está resuelto)", format="DD/MM/YYYY HH:mm"),
                     "Sector": st.column_config.TextColumn("Sector", help="Número de sector asignado")
                 })
 
@@ -306,7 +299,7 @@ def _mostrar_reclamos_en_curso(df_reclamos, df_clientes, sheet_reclamos, sheet_c
             with col1:
                 st.markdown(f"**#{row['Nº Cliente']} - {row['Nombre']}**")
                 st.markdown(f"📅 Ingreso: {format_fecha(row['Fecha y hora'])}")
-                st.markdown(f"📅 Cierre: {row.get('Fecha_formateada', '') or '—'}")
+                st.markdown(f"📅 Cierre: {format_fecha(row.get('Fecha_formateada'), default_text='—')}")
                 st.markdown(f"📍 Sector: {row.get('Sector', 'N/A')}")
                 st.markdown(f"📌 {row['Tipo de reclamo']}")
                 st.markdown(f"👷 {row['Técnico']}")
@@ -358,24 +351,18 @@ def _cerrar_reclamo(row, nuevo_precinto, precinto_actual, cliente_info, sheet_re
             if nuevo_precinto.strip() and nuevo_precinto != precinto_actual:
                 updates.append({"range": f"{col_precinto}{fila_index}", "values": [[nuevo_precinto.strip()]]})
 
-            success, error = api_manager.safe_sheet_operation(
-                batch_update_sheet,
-                sheet_reclamos,
-                updates,
-                is_batch=True
-            )
+            # Reclamos y Clientes en un único batchUpdate (todo o nada)
+            lote = LoteEscritura()
+            lote.update_rangos(sheet_reclamos, updates)
+
+            if nuevo_precinto.strip() and nuevo_precinto != precinto_actual and not cliente_info.empty:
+                index_cliente_en_clientes = cliente_info.index[0] + 2
+                lote.update(sheet_clientes, f"F{index_cliente_en_clientes}", [[nuevo_precinto.strip()]])
+
+            success, error = lote.commit()
             
             if success:
-                if nuevo_precinto.strip() and nuevo_precinto != precinto_actual and not cliente_info.empty:
-                    index_cliente_en_clientes = cliente_info.index[0] + 2
-                    success_precinto, error_precinto = api_manager.safe_sheet_operation(
-                        sheet_clientes.update,
-                        f"F{index_cliente_en_clientes}",
-                        [[nuevo_precinto.strip()]]
-                    )
-                    if not success_precinto:
-                        st.warning(f"⚠️ Precinto guardado en reclamo pero no en hoja de clientes: {error_precinto}")
-
+                actualizar_estado_reclamo(row.get("ID Reclamo", ""), "Resuelto")
                 st.success(f"🟢 Reclamo de {row['Nombre']} cerrado correctamente. Fecha cierre: {fecha_resolucion}")
                 return True
             else:
@@ -413,6 +400,7 @@ def _volver_a_pendiente(row, sheet_reclamos):
             )
             
             if success:
+                actualizar_estado_reclamo(row.get("ID Reclamo", ""), "Pendiente")
                 st.success(f"🔄 Reclamo de {row['Nombre']} vuelto a PENDIENTE. Se borró la fecha de cierre.")
                 return True
             else:
@@ -440,14 +428,6 @@ def _mostrar_limpieza_reclamos(df_reclamos, sheet_reclamos):
         st.info("✅ No hay reclamos resueltos para limpiar.")
         return False
 
-    # Procesar fechas
-    df_resueltos["Fecha y hora"] = pd.to_datetime(df_resueltos["Fecha y hora"])
-    
-    if df_resueltos["Fecha y hora"].dt.tz is None:
-        df_resueltos["Fecha y hora"] = df_resueltos["Fecha y hora"].dt.tz_localize(tz_argentina)
-    else:
-        df_resueltos["Fecha y hora"] = df_resueltos["Fecha y hora"].dt.tz_convert(tz_argentina)
-    
     # Calcular días desde resolución (usar fecha_formateada si existe para cierre)
     df_resueltos["Dias_resuelto"] = (datetime.now(tz_argentina) - df_resueltos["Fecha y hora"]).dt.days
     
@@ -1,11 +1,22 @@
 # components/reclamos/gestion.py
 
+import zlib
 import streamlit as st
 import pandas as pd
-from utils.date_utils import parse_fecha, format_fecha
+import numpy as np
+from utils.date_utils import format_fecha
 from utils.api_manager import api_manager, batch_update_sheet
 from utils.helpers import cloud_log, show_success, show_error, show_warning, show_info, badge
-from config.settings import SECTORES_DISPONIBLES, DEBUG_MODE, IS_RENDER
+from utils.indices import actualizar_estado_reclamo
+from utils.filtros import get_filter_index, etiqueta_con_conteo, TODOS
+from utils.busqueda import get_claim_search_index
+from utils.vistas import get_reclamos_enriquecidos
+from utils.unit_of_work import LoteEscritura
+from components.exportador import render_exportador
+from config.settings import (
+    SECTORES_DISPONIBLES, DEBUG_MODE, IS_RENDER, MAX_RECLAMOS_POR_PAGINA,
+    TECNICOS_DISPONIBLES, PRIORIDADES_RECLAMO, COLUMNAS_RECLAMOS, NOTIFICATION_TYPES
+)
 
 # --- ESTILOS CSS PARA GESTIÓN DE RECLAMOS ---
 GESTION_STYLES = """
@@ -163,20 +174,6 @@ GESTION_STYLES = """
     box-shadow: 0 0 0 3px rgba(37, 99, 235, 0.1);
     outline: none;
 }
-
-.desconexion-item {
-    background: var(--bg-surface);
-    border-radius: var(--radius-lg);
-    padding: 1.25rem;
-    border: 1px solid var(--border-color);
-    margin: 0.75rem 0;
-    transition: all 0.3s ease;
-}
-
-.desconexion-item:hover {
-    background: var(--bg-secondary);
-    border-color: var(--primary-color);
-}
 </style>
 """
 
@@ -221,10 +218,21 @@ def render_gestion_reclamos(df_reclamos, df_clientes, sheet_reclamos, user):
         _mostrar_estadisticas(df)
         
         # Mostrar filtros y tabla (no produce cambios)
-        df_filtrado = _mostrar_filtros_y_tabla(df)
+        df_filtrado, etiquetas_pagina = _mostrar_filtros_y_tabla(df)
+        render_exportador(df_filtrado, "reclamos", key="exportar_reclamos", columnas=COLUMNAS_RECLAMOS)
+
+        # Edición masiva de los reclamos filtrados
+        cambios_masivos = _mostrar_edicion_masiva(df_filtrado, etiquetas_pagina, sheet_reclamos, user)
+        if cambios_masivos:
+            result.update({
+                'needs_refresh': True,
+                'message': f'{cambios_masivos} reclamos actualizados',
+                'data_updated': True
+            })
+            return result
         
         # Sección de edición de reclamos
-        cambios_edicion = _mostrar_edicion_reclamo(df_filtrado, sheet_reclamos)
+        cambios_edicion = _mostrar_edicion_reclamo(df_filtrado, sheet_reclamos, df)
         if cambios_edicion:
             result.update({
                 'needs_refresh': True,
@@ -234,11 +242,11 @@ def render_gestion_reclamos(df_reclamos, df_clientes, sheet_reclamos, user):
             return result
         
         # Gestión de desconexiones
-        cambios_desconexiones = _gestionar_desconexiones(df_filtrado, sheet_reclamos)
-        if cambios_desconexiones:
+        desconexiones_resueltas = _gestionar_desconexiones(df_filtrado, sheet_reclamos, user)
+        if desconexiones_resueltas:
             result.update({
                 'needs_refresh': True,
-                'message': 'Desconexiones actualizadas',
+                'message': f'{desconexiones_resueltas} desconexiones resueltas',
                 'data_updated': True
             })
             return result
@@ -256,43 +264,16 @@ def render_gestion_reclamos(df_reclamos, df_clientes, sheet_reclamos, user):
     return result
 
 def _preparar_datos(df_reclamos, df_clientes):
-    """Prepara y limpia los datos para su visualización"""
+    """Vista enriquecida compartida (más recientes primero); no se modifica en el lugar"""
     try:
-        # Hacer copias para no modificar los dataframes originales
-        df = df_reclamos.copy()
-        df_clientes = df_clientes.copy()
-        
-        # Normalización de datos (una sola vez)
-        df_clientes["Nº Cliente"] = df_clientes["Nº Cliente"].astype(str).str.strip()
-        df["Nº Cliente"] = df["Nº Cliente"].astype(str).str.strip()
-        df["ID Reclamo"] = df["ID Reclamo"].astype(str).str.strip()
-
-        # Optimización: Solo traer las columnas necesarias de clientes
-        cols_clientes = ["Nº Cliente", "N° de Precinto", "Teléfono"]
-        df_clientes = df_clientes[cols_clientes].drop_duplicates(subset=["Nº Cliente"])
-
-        # Merge más eficiente con datos de clientes
-        df = pd.merge(
-            df, 
-            df_clientes,
-            on="Nº Cliente", 
-            how="left", 
-            suffixes=("", "_cliente")
-        )
-
-        # Procesamiento de fechas
-        if 'Fecha y hora' in df.columns:
-            df["Fecha y hora"] = df["Fecha y hora"].apply(parse_fecha)
-            df["Fecha_formateada"] = df["Fecha y hora"].apply(
-                lambda x: format_fecha(x, '%d/%m/%Y %H:%M') if pd.notna(x) else "Fecha inválida"
-            )
+        df = get_reclamos_enriquecidos(df_reclamos, df_clientes, recientes_primero=True)
 
-            # Validación de fechas
-            if df["Fecha y hora"].isna().any():
-                num_fechas_invalidas = df["Fecha y hora"].isna().sum()
-                show_warning(f"⚠️ {num_fechas_invalidas} reclamos tienen fechas inválidas o faltantes")
+        # Validación de fechas
+        if "Fecha y hora" in df.columns and df["Fecha y hora"].isna().any():
+            num_fechas_invalidas = df["Fecha y hora"].isna().sum()
+            show_warning(f"⚠️ {num_fechas_invalidas} reclamos tienen fechas inválidas o faltantes")
 
-        return df.sort_values("Fecha y hora", ascending=False)
+        return df
     
     except Exception as e:
         cloud_log(f"Error preparando datos: {str(e)}", "error")
@@ -353,99 +334,301 @@ def _mostrar_filtros_y_tabla(df):
         <h3>🔍 Filtros de Búsqueda</h3>
     """, unsafe_allow_html=True)
     
+    # Las opciones y sus conteos salen del índice de filtros (facetas)
+    indice = get_filter_index(df, COLUMNAS_FILTRO)
+    filtros = {
+        "Estado": st.session_state.get("filtro_estado", TODOS),
+        "Sector": st.session_state.get("filtro_sector", TODOS),
+        "Tipo de reclamo": st.session_state.get("filtro_tipo", TODOS),
+    }
+    opciones_estado = indice.opciones("Estado", filtros)
+    opciones_sector = indice.opciones("Sector", filtros, incluir=SECTORES_DISPONIBLES)
+    opciones_tipo = indice.opciones("Tipo de reclamo", filtros)
+
+    # Un valor que ya no existe en el snapshot vuelve a 'Todos'
+    for clave, opciones in (("filtro_estado", opciones_estado), ("filtro_sector", opciones_sector),
+                            ("filtro_tipo", opciones_tipo)):
+        if st.session_state.get(clave, TODOS) not in [TODOS] + [v for v, _ in opciones]:
+            st.session_state[clave] = TODOS
+
     # Filtros en columnas
     col1, col2, col3 = st.columns(3)
     
     with col1:
         estado = st.selectbox(
             "Estado", 
-            ["Todos"] + sorted(df["Estado"].dropna().unique()),
-            key="filtro_estado"
+            [TODOS] + [v for v, _ in opciones_estado],
+            key="filtro_estado",
+            format_func=etiqueta_con_conteo(opciones_estado)
         )
     
     with col2:
         sector = st.selectbox(
             "Sector", 
-            ["Todos"] + sorted(SECTORES_DISPONIBLES),
-            key="filtro_sector"
+            [TODOS] + [v for v, _ in opciones_sector],
+            key="filtro_sector",
+            format_func=etiqueta_con_conteo(opciones_sector)
         )
     
     with col3:
         tipo = st.selectbox(
             "Tipo de reclamo", 
-            ["Todos"] + sorted(df["Tipo de reclamo"].dropna().unique()),
-            key="filtro_tipo"
+            [TODOS] + [v for v, _ in opciones_tipo],
+            key="filtro_tipo",
+            format_func=etiqueta_con_conteo(opciones_tipo)
         )
 
-    # Aplicar filtros
-    df_filtrado = df.copy()
-    if estado != "Todos": 
-        df_filtrado = df_filtrado[df_filtrado["Estado"] == estado]
-    if sector != "Todos": 
-        df_filtrado = df_filtrado[df_filtrado["Sector"] == str(sector)]
-    if tipo != "Todos": 
-        df_filtrado = df_filtrado[df_filtrado["Tipo de reclamo"] == tipo]
+    # Aplicar filtros: AND de bitmaps, sin copiar el DataFrame
+    posiciones = indice.posiciones({"Estado": estado, "Sector": sector, "Tipo de reclamo": tipo})
+
+    st.markdown(f"**📈 Mostrando {len(posiciones)} de {len(df)} reclamos**")
 
-    st.markdown(f"**📈 Mostrando {len(df_filtrado)} de {len(df)} reclamos**")
+    posiciones_pagina = _paginar_tabla(df, posiciones, (estado, sector, tipo))
 
-    # Mostrar tabla optimizada
+    # Solo la página visible se serializa hacia el navegador
     columnas = [
-        "Fecha_formateada", "Nº Cliente", "Nombre", 
+        "Fecha_texto", "Nº Cliente", "Nombre", 
         "Sector", "Tipo de reclamo", "Teléfono", "Estado"
     ]
     
     st.dataframe(
-        df_filtrado[columnas].rename(columns={"Fecha_formateada": "Fecha y hora"}),
+        df.iloc[posiciones_pagina][columnas].rename(columns={"Fecha_texto": "Fecha y hora"}),
         use_container_width=True,
         hide_index=True,
-        height=400
+        height=min(400, 38 + 35 * max(len(posiciones_pagina), 1))
     )
     
     st.markdown("</div>", unsafe_allow_html=True)
-    return df_filtrado
+    return df.iloc[posiciones], list(df.index[posiciones_pagina])
+
+# Resultados que se ofrecen en el selector de edición
+RESULTADOS_BUSQUEDA_RECLAMOS = 20
+
+# Columnas con filtro en la tabla de reclamos
+COLUMNAS_FILTRO = ("Estado", "Sector", "Tipo de reclamo")
+
+# Columnas por las que se puede ordenar la tabla
+ORDEN_TABLA = {
+    "Fecha": "Fecha y hora",
+    "N° Cliente": "Nº Cliente",
+    "Nombre": "Nombre",
+    "Sector": "Sector",
+    "Tipo de reclamo": "Tipo de reclamo",
+    "Estado": "Estado",
+}
+
+def _claves_orden(serie):
+    """Convierte una columna en un array ordenable con np.argsort"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Las fechas ya llegan tz-aware desde cargar_datos: se ordena sobre la vista int64
+        return serie.values.view("i8")
+    numeros = pd.to_numeric(serie, errors="coerce")
+    if numeros.notna().mean() > 0.9:
+        return numeros.fillna(np.inf).to_numpy()
+    return serie.fillna("").astype(str).str.upper().to_numpy()
+
+def _paginar_tabla(df, posiciones, filtros):
+    """Ordena las posiciones filtradas y devuelve solo las de la página actual"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        orden = st.selectbox("Ordenar por", list(ORDEN_TABLA), key="tabla_orden")
+    with col2:
+        descendente = st.checkbox("Descendente", value=True, key="tabla_desc")
+
+    total_paginas = max(1, -(-len(posiciones) // MAX_RECLAMOS_POR_PAGINA))
+
+    # Al cambiar filtros u orden se vuelve a la primera página
+    firma = (filtros, orden, descendente)
+    if st.session_state.get("tabla_firma") != firma:
+        st.session_state.tabla_firma = firma
+        st.session_state.tabla_pagina = 1
+    st.session_state.tabla_pagina = min(st.session_state.get("tabla_pagina", 1), total_paginas)
+
+    with col3:
+        pagina = st.number_input(
+            f"Página (de {total_paginas})", min_value=1, max_value=total_paginas,
+            step=1, key="tabla_pagina"
+        )
+
+    if len(posiciones) == 0:
+        return posiciones
+
+    # Orden estable sobre las filas filtradas únicamente
+    claves = _claves_orden(df[ORDEN_TABLA[orden]].iloc[posiciones])
+    indices = np.argsort(claves, kind="stable")
+    if descendente:
+        indices = indices[::-1]
+
+    inicio = (int(pagina) - 1) * MAX_RECLAMOS_POR_PAGINA
+    return posiciones[indices[inicio:inicio + MAX_RECLAMOS_POR_PAGINA]]
+
+SIN_CAMBIOS = "— Sin cambios —"
+ESTADOS_EDITABLES = ["Pendiente", "En curso", "Resuelto"]
+
+def _columna_reclamos(nombre):
+    """Número de columna (1-based) de un campo en la hoja Reclamos"""
+    return COLUMNAS_RECLAMOS.index(nombre) + 1
+
+def _mostrar_edicion_masiva(df, etiquetas_pagina, sheet_reclamos, user):
+    """Cambia estado, técnico, prioridad o sector de varios reclamos en una sola escritura"""
+    with st.expander("🧰 Edición masiva"):
+        alcance = st.radio(
+            "Aplicar a",
+            ["Reclamos seleccionados", f"Todos los filtrados ({len(df)})"],
+            horizontal=True,
+            key="masiva_alcance"
+        )
+
+        if alcance == "Reclamos seleccionados":
+            # Solo se ofrecen los de la página visible para no enviar miles de opciones
+            opciones = [e for e in etiquetas_pagina if e in df.index]
+            st.session_state.masiva_seleccion = [
+                e for e in st.session_state.get("masiva_seleccion", []) if e in opciones
+            ]
+            etiquetas = st.multiselect(
+                "Reclamos (página actual)",
+                opciones,
+                key="masiva_seleccion",
+                format_func=lambda e: (
+                    f"{df.at[e, 'Nº Cliente']} - {df.at[e, 'Nombre']} - "
+                    f"{df.at[e, 'Tipo de reclamo']} ({df.at[e, 'Estado']})"
+                )
+            )
+        else:
+            etiquetas = list(df.index)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            estado = st.selectbox("🔄 Estado", [SIN_CAMBIOS] + ESTADOS_EDITABLES, key="masiva_estado")
+            prioridad = st.selectbox("⚡ Prioridad", [SIN_CAMBIOS] + PRIORIDADES_RECLAMO, key="masiva_prioridad")
+        with col2:
+            tecnicos = st.multiselect("👷 Técnico(s)", TECNICOS_DISPONIBLES, key="masiva_tecnicos")
+            sector = st.selectbox("📍 Sector", [SIN_CAMBIOS] + SECTORES_DISPONIBLES, key="masiva_sector")
+
+        cambios = {}
+        if estado != SIN_CAMBIOS:
+            cambios["Estado"] = estado
+        if tecnicos:
+            cambios["Técnico"] = ", ".join(t.upper() for t in tecnicos)
+        elif estado == "Pendiente":
+            cambios["Técnico"] = ""  # igual que la edición individual
+        if prioridad != SIN_CAMBIOS:
+            cambios["Prioridad"] = prioridad
+        if sector != SIN_CAMBIOS:
+            cambios["Sector"] = str(sector)
+
+        # Si el cambio alcanza reclamos que no están a la vista se pide confirmación explícita
+        confirmado = True
+        if len(etiquetas) > len(etiquetas_pagina):
+            confirmado = st.checkbox(
+                f"Confirmo aplicar los cambios a {len(etiquetas)} reclamos, "
+                f"incluidos {len(etiquetas) - len(etiquetas_pagina)} que no están en la página actual",
+                key="masiva_confirmar"
+            )
 
-def _mostrar_edicion_reclamo(df, sheet_reclamos):
+        if not st.button(
+            f"💾 Aplicar a {len(etiquetas)} reclamos",
+            disabled=not etiquetas or not cambios or not confirmado,
+            use_container_width=True,
+            key="masiva_aplicar"
+        ):
+            return 0
+
+        return _aplicar_edicion_masiva(df.loc[etiquetas], cambios, sheet_reclamos, user)
+
+def _aplicar_edicion_masiva(df_objetivo, cambios, sheet_reclamos, user):
+    """Escribe los cambios y una sola notificación resumen en un único batchUpdate"""
+    columnas = {campo: _columna_reclamos(campo) for campo in cambios}
+    celdas = {
+        (etiqueta + 2, columnas[campo]): valor
+        for etiqueta in df_objetivo.index
+        for campo, valor in cambios.items()
+    }
+    ids = df_objetivo["ID Reclamo"].astype(str).tolist()
+
+    lote = LoteEscritura()
+    lote.update_celdas(sheet_reclamos, celdas)
+    if "Estado" in cambios:
+        def _reflejar_estados():
+            for id_reclamo in ids:
+                actualizar_estado_reclamo(id_reclamo, cambios["Estado"])
+        lote.al_confirmar(_reflejar_estados)
+
+    resumen = ", ".join(f"{campo} → {valor or 'vacío'}" for campo, valor in cambios.items())
+    if 'notification_service' in st.session_state:
+        tipo = _tipo_notificacion_masiva(cambios)
+        st.session_state.notification_service.emit_en_lote(
+            lote,
+            notification_type=tipo,
+            message=f"{NOTIFICATION_TYPES[tipo]['icon']} {len(ids)} reclamos actualizados: {resumen}",
+            user_target="all",
+            claim_id=ids[0] if len(ids) == 1 else None,
+            sujeto=zlib.crc32(",".join(sorted(ids)).encode())
+        )
+
+    with st.spinner(f"Actualizando {len(ids)} reclamos..."):
+        ok, error = lote.commit()
+
+    if not ok:
+        show_error(f"❌ Error en la edición masiva: {error}")
+        cloud_log(f"Error en edición masiva de {len(ids)} reclamos: {error}", "error")
+        return 0
+
+    show_success(f"✅ {len(ids)} reclamos actualizados ({resumen})")
+    usuario = (user or {}).get('username', 'desconocido')
+    cloud_log(f"Edición masiva de {len(ids)} reclamos por {usuario}: {resumen}", "info")
+    return len(ids)
+
+def _tipo_notificacion_masiva(cambios):
+    """Tipo de notificación según los campos tocados por la edición masiva"""
+    if "Estado" in cambios:
+        return "status_change"
+    if cambios.get("Técnico"):
+        return "reclamo_asignado"
+    return "reclamo_actualizado"
+
+def _mostrar_edicion_reclamo(df, sheet_reclamos, df_completo):
     """Muestra la interfaz para editar reclamos con experiencia mejorada"""
     st.markdown("""
     <div class="edicion-section">
         <h3>✏️ Edición de Reclamo Puntual</h3>
     """, unsafe_allow_html=True)
     
-    # Crear selector mejorado con búsqueda
-    df["selector"] = df.apply(
-        lambda x: f"{x['Nº Cliente']} - {x['Nombre']} - {x['Tipo de reclamo']} ({x['Estado']})", 
-        axis=1
-    )
-    
-    # Búsqueda avanzada
+    # Búsqueda sobre el índice invertido del snapshot (top-N, sin recorrer todo el historial)
     busqueda = st.text_input(
-        "🔍 Buscar por número de cliente, nombre o tipo",
+        "🔍 Buscar por número de cliente, nombre, dirección, tipo, detalles o ID",
         placeholder="Ej: 1234, Juan, Desconexión...",
         key="busqueda_reclamo"
     )
     
-    # Filtrar opciones basadas en la búsqueda
-    opciones_filtradas = [""] + df["selector"].tolist()
-    if busqueda:
-        opciones_filtradas = [""] + [
-            opc for opc in df["selector"].tolist() 
-            if busqueda.lower() in opc.lower()
-        ]
+    if busqueda.strip():
+        resultados = get_claim_search_index(df_completo).buscar(
+            busqueda, RESULTADOS_BUSQUEDA_RECLAMOS, permitido=df.index.__contains__
+        )
+        opciones = [etiqueta for etiqueta, _ in resultados]
+        if not opciones:
+            st.info("No se encontraron reclamos para esa búsqueda")
+    else:
+        # Sin búsqueda: los más recientes del filtro actual
+        opciones = list(df.index[:RESULTADOS_BUSQUEDA_RECLAMOS])
     
     seleccion = st.selectbox(
         "Seleccioná un reclamo para editar", 
-        opciones_filtradas,
+        [None] + opciones,
         index=0,
-        key="selector_reclamo"
+        key="selector_reclamo_etiqueta",
+        format_func=lambda e: "" if e is None else (
+            f"{df.at[e, 'Nº Cliente']} - {df.at[e, 'Nombre']} - "
+            f"{df.at[e, 'Tipo de reclamo']} ({df.at[e, 'Estado']}) · {df.at[e, 'ID Reclamo']}"
+        )
     )
 
-    if not seleccion:
+    if seleccion is None or seleccion not in df.index:
         st.markdown("</div>", unsafe_allow_html=True)
         return False
 
-    # Obtener el reclamo seleccionado
-    numero_cliente = seleccion.split(" - ")[0]
-    reclamo_actual = df[df["Nº Cliente"] == numero_cliente].iloc[0]
+    # Obtener el reclamo seleccionado (por etiqueta, es decir por ID Reclamo y no por cliente)
+    reclamo_actual = df.loc[seleccion]
     reclamo_id = reclamo_actual["ID Reclamo"]
 
     # Mostrar información del reclamo con estilo CRM
@@ -645,13 +828,14 @@ def _actualizar_reclamo(df, sheet_reclamos, reclamo_id, updates, full_update=Fal
 
         if success:
             show_success("✅ Reclamo actualizado correctamente")
+            actualizar_estado_reclamo(reclamo_id, updates['estado'])
 
             # Notificación de cambio de estado
-            if updates['estado'] != estado_anterior and 'notification_manager' in st.session_state:
+            if updates['estado'] != estado_anterior and 'notification_service' in st.session_state:
                 mensaje = f"El reclamo {reclamo_id} cambió de estado: {estado_anterior} → {updates['estado']}"
                 usuario = st.session_state.auth.get('user_info', {}).get('username', 'desconocido')
                 
-                st.session_state.notification_manager.add(
+                st.session_state.notification_service.emit(
                     notification_type="status_change",
                     message=mensaje,
                     user_target="all",
@@ -674,8 +858,8 @@ def _actualizar_reclamo(df, sheet_reclamos, reclamo_id, updates, full_update=Fal
             st.exception(e)
         return False
 
-def _gestionar_desconexiones(df, sheet_reclamos):
-    """Gestiona las desconexiones a pedido con estilo CRM"""
+def _gestionar_desconexiones(df, sheet_reclamos, user):
+    """Gestiona las desconexiones a pedido: selección y resolución en lote"""
     st.markdown("""
     <div class="edicion-section">
         <h3>🔌 Gestión de Desconexiones a Pedido</h3>
@@ -689,62 +873,84 @@ def _gestionar_desconexiones(df, sheet_reclamos):
     if desconexiones.empty:
         show_success("✅ No hay desconexiones pendientes de marcar como resueltas")
         st.markdown("</div>", unsafe_allow_html=True)
-        return False
+        return 0
 
     show_info(f"📄 Hay {len(desconexiones)} desconexiones cargadas. Ir a Impresión para imprimir listado.")
-    
-    cambios = False
-    
-    for i, row in desconexiones.iterrows():
-        st.markdown(f"""
-        <div class="desconexion-item">
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <div>
-                    <strong>{row['Nº Cliente']} - {row['Nombre']}</strong>
-                    <div style="color: var(--text-secondary); font-size: 0.9rem; margin-top: 0.25rem;">
-                        📅 {format_fecha(row['Fecha y hora'])} - Sector {row['Sector']}
-                    </div>
-                </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("✅ Marcar como Resuelto", key=f"resuelto_{i}", use_container_width=True):
-            if _marcar_desconexion_como_resuelta(row, sheet_reclamos):
-                cambios = True
-        
-        st.markdown("</div></div>", unsafe_allow_html=True)
-        st.markdown("---")
-    
+
+    columnas = [c for c in ["Nº Cliente", "Nombre", "Dirección", "Sector", "Fecha_texto"] if c in desconexiones.columns]
+    st.dataframe(
+        desconexiones[columnas].rename(columns={"Fecha_texto": "Fecha y hora"}),
+        use_container_width=True,
+        height=min(400, 40 + 35 * len(desconexiones))
+    )
+
+    if st.checkbox(f"Marcar todas ({len(desconexiones)}) — listado ya impreso", key="desconexiones_todas"):
+        etiquetas = list(desconexiones.index)
+    else:
+        st.session_state.desconexiones_seleccion = [
+            e for e in st.session_state.get("desconexiones_seleccion", []) if e in desconexiones.index
+        ]
+        etiquetas = st.multiselect(
+            "Desconexiones a marcar como resueltas",
+            list(desconexiones.index),
+            key="desconexiones_seleccion",
+            format_func=lambda e: f"{desconexiones.at[e, 'Nº Cliente']} - {desconexiones.at[e, 'Nombre']}"
+        )
+
+    resueltas = 0
+    if st.button(
+        f"✅ Marcar {len(etiquetas)} como resueltas",
+        disabled=not etiquetas,
+        use_container_width=True,
+        key="desconexiones_resolver"
+    ):
+        resueltas = _resolver_desconexiones(desconexiones.loc[etiquetas], sheet_reclamos, user)
+
     st.markdown("</div>", unsafe_allow_html=True)
-    return cambios
+    return resueltas
 
-def _marcar_desconexion_como_resuelta(row, sheet_reclamos):
-    """Marca una desconexión como resuelta con notificación"""
+def _resolver_desconexiones(df_objetivo, sheet_reclamos, user):
+    """Marca las desconexiones como resueltas: estados y notificación resumen en un solo lote"""
     try:
-        fila = row.name + 2
-        success, error = api_manager.safe_sheet_operation(
-            sheet_reclamos.update, 
-            f"I{fila}", 
-            [["Resuelto"]]
-        )
-        
-        if success:
-            show_success(f"✅ Desconexión de {row['Nombre']} marcada como resuelta")
-            
-            # Notificación
-            if 'notification_manager' in st.session_state:
-                st.session_state.notification_manager.add(
-                    notification_type="desconexion_resuelta",
-                    message=f"Desconexión resuelta: {row['Nº Cliente']} - {row['Nombre']}",
-                    user_target="all",
-                    claim_id=row.get("ID Reclamo", "")
-                )
-            
-            return True
-        else:
+        columna_estado = _columna_reclamos("Estado")
+        ids = df_objetivo["ID Reclamo"].astype(str).tolist()
+
+        lote = LoteEscritura()
+        lote.update_celdas(sheet_reclamos, {
+            (etiqueta + 2, columna_estado): "Resuelto" for etiqueta in df_objetivo.index
+        })
+
+        def _reflejar_estados():
+            for id_reclamo in ids:
+                actualizar_estado_reclamo(id_reclamo, "Resuelto")
+        lote.al_confirmar(_reflejar_estados)
+
+        if 'notification_service' in st.session_state:
+            clientes = df_objetivo["Nº Cliente"].astype(str).tolist()
+            detalle = ", ".join(clientes[:10]) + (f" y {len(clientes) - 10} más" if len(clientes) > 10 else "")
+            st.session_state.notification_service.emit_en_lote(
+                lote,
+                notification_type="desconexion_resuelta",
+                message=f"🔌 {len(ids)} desconexiones resueltas (clientes {detalle})",
+                user_target="all",
+                claim_id=ids[0] if len(ids) == 1 else None,
+                sujeto=zlib.crc32(",".join(sorted(ids)).encode())
+            )
+
+        with st.spinner(f"Resolviendo {len(ids)} desconexiones..."):
+            ok, error = lote.commit()
+
+        if not ok:
             show_error(f"❌ Error al actualizar: {error}")
-            return False
+            cloud_log(f"Error resolviendo {len(ids)} desconexiones: {error}", "error")
+            return 0
+
+        show_success(f"✅ {len(ids)} desconexiones marcadas como resueltas")
+        usuario = (user or {}).get('username', 'desconocido')
+        cloud_log(f"{len(ids)} desconexiones resueltas por {usuario}", "info")
+        return len(ids)
     except Exception as e:
         error_msg = f"❌ Error inesperado: {str(e)}"
         show_error(error_msg)
-        cloud_log(f"Error marcando desconexión como resuelta: {str(e)}", "error")
-        return False
\ No newline at end of file
+        cloud_log(f"Error marcando desconexiones como resueltas: {str(e)}", "error")
+        return 0
\ No newline at end of file
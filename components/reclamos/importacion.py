@@ -0,0 +1,318 @@
+# components/reclamos/importacion.py
+
+import csv
+import io
+import re
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.date_utils import ahora_argentina, format_fecha, parse_fechas_series
+from utils.api_manager import api_manager
+from utils.helpers import cloud_log, show_success, show_error, show_warning, format_phone_number
+from utils.indices import get_client_index, get_claims_index
+from utils.busqueda import normalizar_texto
+from utils.ids import generar_id
+from config.settings import (
+    SECTORES_DISPONIBLES,
+    TIPOS_RECLAMO,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_WRITE_CHUNK,
+    DEBUG_MODE
+)
+
+# Encabezados aceptados (canonizados) para cada columna del reclamo
+ALIAS_COLUMNAS = {
+    "Nº Cliente": ["ncliente", "nrocliente", "numerocliente", "nrodecliente", "cliente", "ndecliente"],
+    "Sector": ["sector", "zona"],
+    "Nombre": ["nombre", "nombreyapellido", "titular"],
+    "Dirección": ["direccion", "domicilio"],
+    "Teléfono": ["telefono", "tel", "celular"],
+    "Tipo de reclamo": ["tipodereclamo", "tipo", "tiporeclamo", "motivo"],
+    "Detalles": ["detalles", "detalle", "observaciones", "descripcion"],
+    "N° de Precinto": ["ndeprecinto", "precinto", "nprecinto"],
+    "Fecha y hora": ["fechayhora", "fecha", "fechahora", "fechaingreso"],
+}
+COLUMNAS_OBLIGATORIAS = ["Nº Cliente", "Sector", "Tipo de reclamo"]
+
+def _canon(nombre):
+    """Encabezado sin acentos ni separadores para compararlo con los alias"""
+    return re.sub(r"[^a-z0-9]", "", normalizar_texto(nombre))
+
+def _mapear_columnas(columnas):
+    """Devuelve {columna del archivo: columna del sistema}"""
+    alias = {a: destino for destino, lista in ALIAS_COLUMNAS.items() for a in lista}
+    mapeo = {}
+    for col in columnas:
+        destino = alias.get(_canon(col))
+        if destino and destino not in mapeo.values():
+            mapeo[col] = destino
+    return mapeo
+
+def _leer_bloques(archivo):
+    """Lee el archivo por bloques de IMPORT_CHUNK_SIZE filas (CSV o XLSX)"""
+    nombre = archivo.name.lower()
+    if nombre.endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezado = [str(c).strip() if c is not None else "" for c in next(filas, [])]
+            bloque = []
+            for fila in filas:
+                bloque.append(fila)
+                if len(bloque) >= IMPORT_CHUNK_SIZE:
+                    yield pd.DataFrame(bloque, columns=encabezado, dtype=object)
+                    bloque = []
+            if bloque:
+                yield pd.DataFrame(bloque, columns=encabezado, dtype=object)
+        finally:
+            libro.close()
+        return
+
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", errors="replace")
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        separador = csv.Sniffer().sniff(muestra, delimiters=",;\t|").delimiter
+    except csv.Error:
+        separador = ","
+    yield from pd.read_csv(
+        texto, sep=separador, dtype=str, keep_default_na=False,
+        chunksize=IMPORT_CHUNK_SIZE
+    )
+
+def _validar_bloque(bloque, tipos_por_clave):
+    """Normaliza y valida un bloque de forma vectorizada; agrega la columna 'Motivo'"""
+    bloque = bloque.rename(columns=_mapear_columnas(bloque.columns))
+    for col in ALIAS_COLUMNAS:
+        if col not in bloque.columns:
+            bloque[col] = ""
+    bloque = bloque[list(ALIAS_COLUMNAS)].fillna("").astype(str).apply(lambda s: s.str.strip())
+
+    # Excel entrega los números como float: 1234.0 -> 1234
+    for col in ("Nº Cliente", "Teléfono"):
+        bloque[col] = bloque[col].str.replace(r"\.0$", "", regex=True)
+
+    # Fecha: se valida en bloque y se reescribe con el formato de la carga manual
+    fechas = parse_fechas_series(bloque["Fecha y hora"])
+    fecha_invalida = (bloque["Fecha y hora"] != "") & fechas.isna()
+    bloque.loc[fechas.notna(), "Fecha y hora"] = fechas[fechas.notna()].map(format_fecha)
+
+    # Sector: '01' -> '1'; lo que no es número se compara en mayúsculas
+    numerico = pd.to_numeric(bloque["Sector"], errors="coerce")
+    bloque["Sector"] = np.where(
+        numerico.notna(),
+        numerico.fillna(0).astype(int).astype(str),
+        bloque["Sector"].str.upper()
+    )
+
+    # Tipo: se acepta sin distinguir mayúsculas ni acentos
+    bloque["Tipo de reclamo"] = bloque["Tipo de reclamo"].map(
+        lambda t: tipos_por_clave.get(normalizar_texto(t), "")
+    )
+
+    condiciones = [
+        bloque["Nº Cliente"] == "",
+        ~bloque["Sector"].isin(SECTORES_DISPONIBLES),
+        bloque["Tipo de reclamo"] == "",
+        fecha_invalida,
+    ]
+    motivos = ["Falta el N° de cliente", "Sector inválido", "Tipo de reclamo inválido", "Fecha inválida"]
+    bloque["Motivo"] = np.select(condiciones, motivos, default="")
+    return bloque
+
+def _analizar_archivo(archivo, df_reclamos, df_clientes):
+    """Lee, valida y deduplica todo el archivo. Devuelve (válidos, rechazados, total leído)"""
+    tipos_por_clave = {normalizar_texto(t): t for t in TIPOS_RECLAMO}
+    validos, rechazados, total = [], [], 0
+
+    for bloque in _leer_bloques(archivo):
+        total += len(bloque)
+        bloque = _validar_bloque(bloque, tipos_por_clave)
+        ok = bloque["Motivo"] == ""
+        validos.append(bloque[ok].drop(columns="Motivo"))
+        rechazados.append(bloque[~ok])
+
+    columnas = list(ALIAS_COLUMNAS)
+    df_validos = pd.concat(validos, ignore_index=True) if validos else pd.DataFrame(columns=columnas)
+    df_rechazados = pd.concat(rechazados, ignore_index=True) if rechazados else pd.DataFrame(columns=columnas + ["Motivo"])
+
+    # Un reclamo activo por cliente: contra la base y dentro del archivo
+    indice_reclamos = get_claims_index(df_reclamos)
+    con_activos = df_validos["Nº Cliente"].map(indice_reclamos.tiene_activos).astype(bool)
+    repetido = df_validos.duplicated(subset=["Nº Cliente"], keep="first")
+    duplicados = df_validos[con_activos | repetido].assign(
+        Motivo=np.where(con_activos[con_activos | repetido], "Cliente con reclamo activo", "Repetido en el archivo")
+    )
+    df_validos = df_validos[~(con_activos | repetido)].reset_index(drop=True)
+
+    # Clientes nuevos: sin nombre o dirección no se pueden dar de alta
+    indice_clientes = get_client_index(df_clientes)
+    nuevo = ~df_validos["Nº Cliente"].map(indice_clientes.__contains__).astype(bool)
+    incompleto = nuevo & ((df_validos["Nombre"] == "") | (df_validos["Dirección"] == ""))
+    sin_datos = df_validos[incompleto].assign(Motivo="Cliente nuevo sin nombre o dirección")
+    df_validos = df_validos[~incompleto].reset_index(drop=True)
+    df_validos["Cliente nuevo"] = nuevo[~incompleto].to_numpy()
+
+    # Clientes existentes: los datos vacíos se completan con los de la base
+    for col in ("Nombre", "Dirección", "Teléfono", "N° de Precinto"):
+        vacio = (df_validos[col] == "") & ~df_validos["Cliente nuevo"]
+        if vacio.any():
+            df_validos.loc[vacio, col] = df_validos.loc[vacio, "Nº Cliente"].map(
+                lambda nro: str((indice_clientes.get(nro) or {}).get(col, "") or "")
+            )
+
+    df_rechazados = pd.concat([df_rechazados, duplicados, sin_datos], ignore_index=True)
+    return df_validos, df_rechazados, total
+
+def _telefonos(serie):
+    """Formatea los teléfonos no vacíos igual que la carga manual"""
+    return serie.map(lambda t: format_phone_number(t) if t else "")
+
+def _filas_reclamos(df, df_reclamos, atendido_por):
+    """Arma las filas de la hoja Reclamos con el mismo formato que la carga manual"""
+    ahora = format_fecha(ahora_argentina())
+    fechas = df["Fecha y hora"].where(df["Fecha y hora"] != "", ahora)
+    es_desconexion = df["Tipo de reclamo"].str.lower().str.contains("desconexion a pedido")
+    estados = np.where(es_desconexion, "Desconexión", "Pendiente").tolist()
+    # Los IDs del proceso son crecientes: basta con chequear contra los existentes
+    en_uso = get_claims_index(df_reclamos).ids
+    ids = [generar_id(en_uso) for _ in range(len(df))]
+
+    return [
+        [fecha, nro, sector, nombre.upper(), direccion.upper(), telefono, tipo,
+         detalles.upper(), estado, "", precinto, atendido_por.upper(), "", "", "", id_reclamo]
+        for fecha, nro, sector, nombre, direccion, telefono, tipo, detalles, estado, precinto, id_reclamo
+        in zip(fechas, df["Nº Cliente"], df["Sector"], df["Nombre"], df["Dirección"], _telefonos(df["Teléfono"]),
+               df["Tipo de reclamo"], df["Detalles"], estados, df["N° de Precinto"], ids)
+    ]
+
+def _filas_clientes(df, df_clientes):
+    """Arma las filas de la hoja Clientes para los clientes nuevos"""
+    ahora = format_fecha(ahora_argentina())
+    nuevos = df[df["Cliente nuevo"]]
+    en_uso = get_client_index(df_clientes).ids
+    return [
+        [nro, sector, nombre.upper(), direccion.upper(), telefono, precinto, generar_id(en_uso), ahora]
+        for nro, sector, nombre, direccion, telefono, precinto
+        in zip(nuevos["Nº Cliente"], nuevos["Sector"], nuevos["Nombre"], nuevos["Dirección"],
+               _telefonos(nuevos["Teléfono"]), nuevos["N° de Precinto"])
+    ]
+
+def _escribir_por_bloques(sheet, filas, progreso, avance_inicial, peso, texto):
+    """append_rows en bloques de IMPORT_WRITE_CHUNK actualizando la barra de progreso"""
+    for inicio in range(0, len(filas), IMPORT_WRITE_CHUNK):
+        bloque = filas[inicio:inicio + IMPORT_WRITE_CHUNK]
+        _, error = api_manager.safe_sheet_operation(
+            sheet.append_rows, bloque, value_input_option="RAW"
+        )
+        if error:
+            return inicio, error
+        hecho = min(inicio + IMPORT_WRITE_CHUNK, len(filas))
+        progreso.progress(
+            min(1.0, avance_inicial + peso * hecho / len(filas)),
+            text=f"{texto}: {hecho}/{len(filas)}"
+        )
+    return len(filas), None
+
+def render_importacion_reclamos(df_reclamos, df_clientes, sheet_reclamos, sheet_clientes, user):
+    """Importación masiva de reclamos desde CSV o Excel"""
+    result = {'needs_refresh': False, 'message': None, 'data_updated': False}
+
+    st.markdown("### 📥 Importación masiva de reclamos")
+    st.caption(
+        "Columnas obligatorias: N° de cliente, sector y tipo de reclamo. "
+        "Para clientes nuevos también nombre y dirección."
+    )
+
+    archivo = st.file_uploader("Archivo CSV o Excel", type=["csv", "xlsx"], key="importacion_archivo")
+    if archivo is None:
+        st.session_state.pop('importacion_analisis', None)
+        return result
+
+    clave = (archivo.name, archivo.size)
+    analisis = st.session_state.get('importacion_analisis')
+    if not analisis or analisis['clave'] != clave:
+        try:
+            inicio = time.time()
+            with st.spinner("Validando archivo..."):
+                validos, rechazados, total = _analizar_archivo(archivo, df_reclamos, df_clientes)
+            analisis = {
+                'clave': clave, 'validos': validos, 'rechazados': rechazados,
+                'total': total, 'segundos': time.time() - inicio
+            }
+            st.session_state.importacion_analisis = analisis
+        except Exception as e:
+            show_error(f"❌ No se pudo leer el archivo: {str(e)}")
+            if DEBUG_MODE:
+                st.exception(e)
+            return result
+
+    validos, rechazados = analisis['validos'], analisis['rechazados']
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Filas leídas", analisis['total'])
+    col2.metric("A importar", len(validos))
+    col3.metric("Rechazadas", len(rechazados))
+    col4.metric("Clientes nuevos", int(validos["Cliente nuevo"].sum()) if not validos.empty else 0)
+    st.caption(f"Validación en {analisis['segundos']:.2f} s")
+
+    if not rechazados.empty:
+        with st.expander(f"⚠️ Filas rechazadas ({len(rechazados)})"):
+            st.dataframe(rechazados.head(200), use_container_width=True)
+            st.download_button(
+                "⬇️ Descargar rechazadas (CSV)",
+                rechazados.to_csv(index=False).encode("utf-8"),
+                file_name="reclamos_rechazados.csv",
+                mime="text/csv"
+            )
+
+    if validos.empty:
+        show_warning("No hay filas válidas para importar")
+        return result
+
+    with st.expander("👁️ Vista previa"):
+        st.dataframe(validos.head(50), use_container_width=True)
+
+    if not st.button(f"📥 Importar {len(validos)} reclamos", type="primary", use_container_width=True):
+        return result
+
+    atendido_por = (user or {}).get('nombre', '') or "IMPORTACION"
+    filas_clientes = _filas_clientes(validos, df_clientes)
+    filas_reclamos = _filas_reclamos(validos, df_reclamos, atendido_por)
+    peso_clientes = len(filas_clientes) / (len(filas_clientes) + len(filas_reclamos))
+    progreso = st.progress(0.0, text="Importando...")
+    inicio = time.time()
+
+    if filas_clientes:
+        escritos, error = _escribir_por_bloques(
+            sheet_clientes, filas_clientes, progreso, 0.0, peso_clientes, "Clientes"
+        )
+        if error:
+            show_error(f"❌ Error creando clientes ({escritos} creados): {error}")
+            return result
+
+    escritos, error = _escribir_por_bloques(
+        sheet_reclamos, filas_reclamos, progreso, peso_clientes, 1 - peso_clientes, "Reclamos"
+    )
+    st.session_state.pop('importacion_analisis', None)
+
+    if error:
+        show_error(f"❌ Se importaron {escritos} de {len(filas_reclamos)} reclamos: {error}")
+    else:
+        show_success(
+            f"✅ {escritos} reclamos y {len(filas_clientes)} clientes importados "
+            f"en {time.time() - inicio:.1f} s"
+        )
+
+    if escritos:
+        cloud_log(f"Importación masiva: {escritos} reclamos, {len(filas_clientes)} clientes", "info")
+        if 'notification_service' in st.session_state:
+            st.session_state.notification_service.emit(
+                notification_type="nuevo_reclamo",
+                message=f"📥 Se importaron {escritos} reclamos ({len(filas_clientes)} clientes nuevos)",
+                user_target="all"
+            )
+        result.update({'needs_refresh': True, 'data_updated': True, 'message': f"{escritos} reclamos importados"})
+
+    return result
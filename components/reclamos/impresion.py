@@ -6,8 +6,9 @@ import pandas as pd
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-from utils.date_utils import format_fecha, parse_fecha
+from utils.date_utils import parse_fecha
 from utils.pdf_utils import agregar_pie_pdf
+from utils.vistas import get_reclamos_enriquecidos
 from utils.date_utils import ahora_argentina
 from utils.reporte_diario import *
 
@@ -69,7 +70,7 @@ def render_impresion_reclamos(df_reclamos, df_clientes, user):
 
     try:
         # Preparar datos con información del usuario
-        df_merged = _preparar_datos(df_reclamos, df_clientes, user)
+        df_merged = _preparar_datos(df_reclamos, df_clientes)
         
         # Mostrar estadísticas rápidas
         _mostrar_estadisticas_rapidas(df_merged)
@@ -199,28 +200,9 @@ def _mostrar_estadisticas_rapidas(df_merged):
         st.markdown(f'<div class="card-impresion">🔌 Desconexiones <span class="stats-badge">{desconexiones}</span></div>', 
                    unsafe_allow_html=True)
 
-def _preparar_datos(df_reclamos, df_clientes, user):
-    """Prepara y combina los datos para impresión incluyendo info de usuario"""
-    df_pdf = df_reclamos.copy()
-    
-    # Procesamiento de fechas
-    df_pdf["Fecha y hora"] = pd.to_datetime(
-        df_pdf["Fecha y hora"], 
-        dayfirst=True, 
-        errors='coerce'
-    )
-    
-    # Agregar información del usuario a los datos
-    df_pdf["Usuario_impresion"] = user.get('nombre', 'Sistema')
-    
-    # Merge con clientes (optimizado)
-    return pd.merge(
-        df_pdf,
-        df_clientes[["Nº Cliente", "N° de Precinto"]].drop_duplicates(),
-        on="Nº Cliente",
-        how="left",
-        suffixes=("", "_cliente")
-    )
+def _preparar_datos(df_reclamos, df_clientes):
+    """Vista enriquecida compartida con datos del cliente y fechas ya procesadas"""
+    return get_reclamos_enriquecidos(df_reclamos, df_clientes)
 
 def _mostrar_reclamos_pendientes(df_merged):
     """Muestra tabla de reclamos pendientes con mejor formato"""
@@ -230,23 +212,19 @@ def _mostrar_reclamos_pendientes(df_merged):
         ]
         
         if not df_pendientes.empty:
-            # Formatear datos para visualización
-            df_pendientes_display = df_pendientes.copy()
-            df_pendientes_display["Fecha y hora"] = df_pendientes_display["Fecha y hora"].apply(
-                lambda f: format_fecha(f, '%d/%m/%Y %H:%M') if not pd.isna(f) else 'Sin fecha'
-            )
+            # La fecha ya viene formateada en la vista
+            df_pendientes_display = df_pendientes[[
+                "Fecha_texto", "Nº Cliente", "Nombre", 
+                "Dirección", "Sector", "Tipo de reclamo"
+            ]].rename(columns={"Fecha_texto": "Fecha y hora"})
             
             # Mostrar tabla con configuración mejorada
             st.dataframe(
-                df_pendientes_display[[
-                    "Fecha y hora", "Nº Cliente", "Nombre", 
-                    "Dirección", "Sector", "Tipo de reclamo"
-                ]],
+                df_pendientes_display,
                 use_container_width=True,
                 column_config={
-                    "Fecha y hora": st.column_config.DatetimeColumn(
-                        "Fecha y hora",
-                        format="DD/MM/YYYY HH:mm"
+                    "Fecha y hora": st.column_config.TextColumn(
+                        "Fecha y hora"
                     ),
                     "Nº Cliente": st.column_config.TextColumn(
                         "N° Cliente",
@@ -4,9 +4,11 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from utils.date_utils import ahora_argentina, format_fecha, parse_fecha
-from utils.api_manager import api_manager
-from utils.data_manager import batch_update_sheet
 from utils.helpers import cloud_log, show_success, show_error, show_warning, show_info, format_phone_number
+from utils.indices import get_client_index, get_claims_index
+from utils.ids import generar_id
+from utils.unit_of_work import LoteEscritura
+from components.buscador_clientes import render_buscador_clientes
 from config.settings import (
     SECTORES_DISPONIBLES,
     TIPOS_RECLAMO,
@@ -117,23 +119,6 @@ RECLAMOS_STYLES = """
 """
 
 # --- FUNCIONES HELPER MEJORADAS ---
-def _normalizar_datos(df_clientes, df_reclamos, nro_cliente):
-    """Normaliza datos solo cuando es necesario con manejo robusto"""
-    try:
-        if not nro_cliente:
-            return df_clientes, df_reclamos
-        
-        df_clientes_normalizado = df_clientes.copy()
-        df_reclamos_normalizado = df_reclamos.copy()
-        
-        df_clientes_normalizado["Nº Cliente"] = df_clientes_normalizado["Nº Cliente"].astype(str).str.strip()
-        df_reclamos_normalizado["Nº Cliente"] = df_reclamos_normalizado["Nº Cliente"].astype(str).str.strip()
-        
-        return df_clientes_normalizado, df_reclamos_normalizado
-    except Exception as e:
-        cloud_log(f"Error normalizando datos: {str(e)}", "error")
-        return df_clientes, df_reclamos
-
 def _validar_y_normalizar_sector(sector_input):
     """Valida y normaliza el sector ingresado con mejor manejo de errores"""
     try:
@@ -166,31 +151,16 @@ def _verificar_reclamos_activos(nro_cliente, df_reclamos):
         if not nro_cliente or df_reclamos.empty:
             return pd.DataFrame()
         
-        # Normalizar número de cliente para búsqueda
-        nro_cliente_clean = str(nro_cliente).strip()
-        
-        if nro_cliente_clean not in df_reclamos["Nº Cliente"].values:
+        # Índice por cliente compartido: sin recorrer ni normalizar todos los reclamos
+        etiquetas = get_claims_index(df_reclamos).activos(nro_cliente)
+        if not etiquetas:
             return pd.DataFrame()
         
-        reclamos_cliente = df_reclamos[df_reclamos["Nº Cliente"] == nro_cliente_clean].copy()
-        
-        # Convertir estados a minúsculas para comparación case-insensitive
-        estados_activos = ["pendiente", "en curso"]
-        reclamos_activos = reclamos_cliente[
-            reclamos_cliente["Estado"].astype(str).str.strip().str.lower().isin(estados_activos) |
-            (reclamos_cliente["Tipo de reclamo"].astype(str).str.strip().str.lower() == "desconexion a pedido")
-        ]
-        
-        return reclamos_activos
+        return df_reclamos.loc[etiquetas]
     except Exception as e:
         cloud_log(f"Error verificando reclamos activos: {str(e)}", "error")
         return pd.DataFrame()
 
-def generar_id_unico():
-    """Genera un ID único para reclamos"""
-    import uuid
-    return str(uuid.uuid4())[:8].upper()
-
 # --- FUNCIÓN PRINCIPAL OPTIMIZADA CON ESTILO CRM ---
 def render_nuevo_reclamo(df_reclamos, df_clientes, sheet_reclamos, sheet_clientes, current_user=None):
     """
@@ -215,6 +185,13 @@ def render_nuevo_reclamo(df_reclamos, df_clientes, sheet_reclamos, sheet_cliente
         'reclamos_activos': pd.DataFrame()
     }
 
+    # Búsqueda por nombre, dirección o teléfono para completar el N° de cliente
+    with st.expander("🔍 ¿No sabés el número? Buscar cliente", expanded=False):
+        nro_encontrado = render_buscador_clientes(df_clientes, key="buscar_cliente_reclamo")
+        if nro_encontrado and st.button("Usar este cliente", key="usar_cliente_encontrado"):
+            st.session_state.nro_cliente_input = nro_encontrado
+            st.rerun()
+
     # Input de número de cliente
     estado['nro_cliente'] = st.text_input(
         "🔢 N° de Cliente *", 
@@ -224,16 +201,11 @@ def render_nuevo_reclamo(df_reclamos, df_clientes, sheet_reclamos, sheet_cliente
     ).strip()
 
     if estado['nro_cliente']:
-        # Normalizar datos
-        df_clientes_norm, df_reclamos_norm = _normalizar_datos(
-            df_clientes, df_reclamos, estado['nro_cliente']
-        )
+        # Buscar cliente en el índice compartido (O(1) por tecla)
+        cliente = get_client_index(df_clientes).get(estado['nro_cliente'])
         
-        # Buscar cliente
-        match = df_clientes_norm[df_clientes_norm["Nº Cliente"] == estado['nro_cliente']]
-        
-        if not match.empty:
-            estado['cliente_existente'] = match.iloc[0].to_dict()
+        if cliente is not None:
+            estado['cliente_existente'] = cliente
             st.markdown("""
             <div class="success-banner">
                 <div style="display: flex; align-items: center; gap: 0.5rem;">
@@ -255,18 +227,19 @@ def render_nuevo_reclamo(df_reclamos, df_clientes, sheet_reclamos, sheet_cliente
             """, unsafe_allow_html=True)
         
         # Verificar reclamos activos
-        estado['reclamos_activos'] = _verificar_reclamos_activos(estado['nro_cliente'], df_reclamos_norm)
+        estado['reclamos_activos'] = _verificar_reclamos_activos(estado['nro_cliente'], df_reclamos)
         
         if not estado['reclamos_activos'].empty:
             estado['formulario_bloqueado'] = True
             
             # NOTIFICACIÓN DE INTENTO DE RECLAMO REPETIDO
-            if 'notification_manager' in st.session_state:
-                st.session_state.notification_manager.add(
-                    notification_type="reclamo_repetido",
+            if 'notification_service' in st.session_state:
+                st.session_state.notification_service.emit(
+                    notification_type="duplicate_claim",
                     message=f"⚠️ Intento de reclamo duplicado para cliente {estado['nro_cliente']}",
                     user_target="admin",
-                    claim_id=estado['nro_cliente']
+                    claim_id=estado['nro_cliente'],
+                    sujeto=estado['nro_cliente']
                 )
             
             st.markdown("""
@@ -320,13 +293,13 @@ def render_nuevo_reclamo(df_reclamos, df_clientes, sheet_reclamos, sheet_cliente
             st.rerun()
             
     elif not estado['formulario_bloqueado'] and estado['nro_cliente']:
-        estado = _mostrar_formulario_reclamo(estado, df_clientes, sheet_reclamos, sheet_clientes, current_user)
+        estado = _mostrar_formulario_reclamo(estado, df_reclamos, df_clientes, sheet_reclamos, sheet_clientes, current_user)
 
     st.markdown("</div>", unsafe_allow_html=True)  # Cierre del container
     return estado
 
 # --- FUNCIÓN DE FORMULARIO MEJORADA CON ESTILO CRM ---
-def _mostrar_formulario_reclamo(estado, df_clientes, sheet_reclamos, sheet_clientes, current_user):
+def _mostrar_formulario_reclamo(estado, df_reclamos, df_clientes, sheet_reclamos, sheet_clientes, current_user):
     """Muestra y procesa el formulario de nuevo reclamo con estilo CRM"""
     
     st.markdown("<div class='reclamo-form'>", unsafe_allow_html=True)
@@ -440,14 +413,15 @@ def _mostrar_formulario_reclamo(estado, df_clientes, sheet_reclamos, sheet_clien
         estado = _procesar_envio_formulario(
             estado, nombre, direccion, telefono, sector, 
             tipo_reclamo, detalles, precinto, atendido_por,
-            df_clientes, sheet_reclamos, sheet_clientes
+            df_reclamos, df_clientes, sheet_reclamos, sheet_clientes
         )
     
     return estado
 
 # --- FUNCIÓN DE PROCESAMIENTO OPTIMIZADA CON NOTIFICACIONES ---
 def _procesar_envio_formulario(estado, nombre, direccion, telefono, sector, tipo_reclamo, 
-                              detalles, precinto, atendido_por, df_clientes, sheet_reclamos, sheet_clientes):
+                              detalles, precinto, atendido_por, df_reclamos, df_clientes,
+                              sheet_reclamos, sheet_clientes):
     """Procesa el envío del formulario de manera optimizada"""
     
     # Validar campos obligatorios
@@ -476,7 +450,7 @@ def _procesar_envio_formulario(estado, nombre, direccion, telefono, sector, tipo
             # Preparar datos del reclamo
             fecha_hora = ahora_argentina()
             estado_reclamo = "Desconexión" if "desconexion a pedido" in tipo_reclamo.lower() else "Pendiente"
-            id_reclamo = generar_id_unico()
+            id_reclamo = generar_id(get_claims_index(df_reclamos).ids)
 
             # Formatear teléfono si existe
             telefono_formateado = format_phone_number(telefono.strip()) if telefono.strip() else ""
@@ -498,34 +472,37 @@ def _procesar_envio_formulario(estado, nombre, direccion, telefono, sector, tipo
                 id_reclamo                                  # ID único
             ]
 
-            # Guardar reclamo
-            success, error = api_manager.safe_sheet_operation(
-                sheet_reclamos.append_row,
-                fila_reclamo
+            # Reclamo, cliente y notificación viajan en un único batchUpdate (todo o nada)
+            lote = LoteEscritura()
+            lote.append(sheet_reclamos, [fila_reclamo])
+
+            # NOTIFICACIÓN DE NUEVO RECLAMO
+            if 'notification_service' in st.session_state:
+                st.session_state.notification_service.emit_en_lote(
+                    lote,
+                    notification_type="nuevo_reclamo",
+                    message=f"📝 Nuevo reclamo {id_reclamo} - {tipo_reclamo} para cliente {estado['nro_cliente']}",
+                    user_target="all",
+                    claim_id=id_reclamo
+                )
+
+            # Gestionar cliente (nuevo o actualización)
+            aviso_cliente = _gestionar_cliente(
+                lote, estado['nro_cliente'], sector_normalizado, nombre, 
+                direccion, telefono_formateado, precinto, df_clientes, sheet_clientes
             )
 
+            success, error = lote.commit()
+
             if success:
                 estado.update({
                     'reclamo_guardado': True,
                     'formulario_bloqueado': True
                 })
                 
-                # NOTIFICACIÓN DE NUEVO RECLAMO
-                if 'notification_manager' in st.session_state:
-                    st.session_state.notification_manager.add(
-                        notification_type="nuevo_reclamo",
-                        message=f"📝 Nuevo reclamo {id_reclamo} - {tipo_reclamo} para cliente {estado['nro_cliente']}",
-                        user_target="all",
-                        claim_id=id_reclamo
-                    )
-                
                 cloud_log(f"Nuevo reclamo {id_reclamo} creado por {atendido_por}", "info")
-                
-                # Gestionar cliente (nuevo o actualización)
-                _gestionar_cliente(
-                    estado['nro_cliente'], sector_normalizado, nombre, 
-                    direccion, telefono_formateado, precinto, df_clientes, sheet_clientes
-                )
+                if aviso_cliente:
+                    show_info(aviso_cliente)
                 
                 # Limpiar cache y forzar recarga
                 st.cache_data.clear()
@@ -544,14 +521,15 @@ def _procesar_envio_formulario(estado, nombre, direccion, telefono, sector, tipo
     
     return estado
 
-def _gestionar_cliente(nro_cliente, sector, nombre, direccion, telefono, precinto, df_clientes, sheet_clientes):
-    """Gestiona la creación o actualización del cliente con notificaciones"""
+def _gestionar_cliente(lote, nro_cliente, sector, nombre, direccion, telefono, precinto, df_clientes, sheet_clientes):
+    """Encola en el lote el alta o la actualización del cliente y devuelve el aviso para el operador"""
     try:
-        cliente_existente = df_clientes[df_clientes["Nº Cliente"].astype(str).str.strip() == str(nro_cliente).strip()]
+        indice_clientes = get_client_index(df_clientes)
+        cliente_existente = indice_clientes.get(nro_cliente)
         
-        if cliente_existente.empty:
+        if cliente_existente is None:
             # Crear nuevo cliente
-            nuevo_id = str(uuid.uuid4())[:8].upper()
+            nuevo_id = generar_id(indice_clientes.ids)
             fila_cliente = [
                 nro_cliente, 
                 sector,
@@ -563,22 +541,22 @@ def _gestionar_cliente(nro_cliente, sector, nombre, direccion, telefono, precint
                 format_fecha(ahora_argentina())
             ]
             
-            success, error = api_manager.safe_sheet_operation(sheet_clientes.append_row, fila_cliente)
-            if success:
-                show_info("ℹ️ Nuevo cliente registrado automáticamente")
-                
-                # NOTIFICACIÓN DE NUEVO CLIENTE
-                if 'notification_manager' in st.session_state:
-                    st.session_state.notification_manager.add(
-                        notification_type="cliente_nuevo",
-                        message=f"🆕 Cliente N° {nro_cliente} - {nombre.upper()} creado desde reclamo",
-                        user_target="admin",
-                        action=f"clientes:{nro_cliente}"
-                    )
+            lote.append(sheet_clientes, [fila_cliente])
+            
+            # NOTIFICACIÓN DE NUEVO CLIENTE
+            if 'notification_service' in st.session_state:
+                st.session_state.notification_service.emit_en_lote(
+                    lote,
+                    notification_type="cliente_nuevo",
+                    message=f"🆕 Cliente N° {nro_cliente} - {nombre.upper()} creado desde reclamo",
+                    user_target="admin",
+                    action=f"clientes:{nro_cliente}"
+                )
+            return "ℹ️ Nuevo cliente registrado automáticamente"
         else:
             # Actualizar cliente existente si hay cambios
             updates = []
-            idx = cliente_existente.index[0] + 2
+            idx = indice_clientes.fila(nro_cliente) + 2
             
             campos_actualizar = {
                 "B": sector,
@@ -590,17 +568,15 @@ def _gestionar_cliente(nro_cliente, sector, nombre, direccion, telefono, precint
             
             for col, nuevo_valor in campos_actualizar.items():
                 campo_name = ["Sector", "Nombre", "Dirección", "Teléfono", "N° de Precinto"][list(campos_actualizar.keys()).index(col)]
-                valor_actual = str(cliente_existente.iloc[0][campo_name]).strip() if campo_name in cliente_existente.columns else ""
+                valor_actual = str(cliente_existente.get(campo_name, "")).strip()
                 if valor_actual != str(nuevo_valor).strip():
                     updates.append({"range": f"{col}{idx}", "values": [[nuevo_valor]]})
             
             if updates:
-                success, error = api_manager.safe_sheet_operation(
-                    batch_update_sheet, sheet_clientes, updates, is_batch=True
-                )
-                if success:
-                    show_info("🔁 Datos del cliente actualizados automáticamente")
+                lote.update_rangos(sheet_clientes, updates)
+                return "🔁 Datos del cliente actualizados automáticamente"
                     
     except Exception as e:
         cloud_log(f"Error gestionando cliente desde reclamo: {str(e)}", "error")
-        # No mostrar error al usuario para no interrumpir el flujo del reclamo
\ No newline at end of file
+        # No mostrar error al usuario para no interrumpir el flujo del reclamo
+    return None
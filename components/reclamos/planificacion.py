@@ -3,17 +3,24 @@
 import io
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from utils.date_utils import parse_fecha, format_fecha
 from utils.api_manager import api_manager, batch_update_sheet
 from utils.pdf_utils import agregar_pie_pdf
+from utils.vistas import get_reclamos_enriquecidos
+from components.exportador import render_exportador
+from utils.filtros import get_filter_index, etiqueta_con_conteo
+from utils.asignacion import asignar_por_zonas
+from utils.helpers import cloud_log
 from config.settings import (
     SECTORES_DISPONIBLES,
     TECNICOS_DISPONIBLES,
     MATERIALES_POR_RECLAMO,
-    ROUTER_POR_SECTOR
+    ROUTER_POR_SECTOR,
+    ASIGNACION_TIEMPO_LIMITE
 )
 
 GRUPOS_POSIBLES = [f"Grupo {letra}" for letra in "ABCDE"]
@@ -35,6 +42,19 @@ ZONAS_COMPATIBLES = {
     "Zona 5": ["Zona 1", "Zona 3"]
 }
 
+# Topología compilada una vez al importar: índices de zona, sector → zona,
+# adyacencia (ADYACENCIA_ZONAS[i, j]: la zona j es compatible con la i) y centralidad
+ZONAS = list(SECTORES_VECINOS)
+INDICE_ZONA = {zona: i for i, zona in enumerate(ZONAS)}
+ZONA_POR_SECTOR = {str(s): zona for zona, sectores in SECTORES_VECINOS.items() for s in sectores}
+INDICE_ZONA_POR_SECTOR = {s: INDICE_ZONA[zona] for s, zona in ZONA_POR_SECTOR.items()}
+ADYACENCIA_ZONAS = np.array([[b in ZONAS_COMPATIBLES.get(a, []) for b in ZONAS] for a in ZONAS], dtype=bool)
+CENTRALIDAD_ZONAS = np.array([len(ZONAS_COMPATIBLES.get(zona, [])) for zona in ZONAS])
+
+def _indices_zona(sectores):
+    """Índice de zona de cada sector (-1 si no pertenece a ninguna zona)"""
+    return sectores.astype(str).str.strip().map(INDICE_ZONA_POR_SECTOR).fillna(-1).astype(int).to_numpy()
+
 def inicializar_estado_grupos():
     if "asignaciones_grupos" not in st.session_state:
         st.session_state.asignaciones_grupos = {g: [] for g in GRUPOS_POSIBLES}
@@ -52,15 +72,11 @@ def agrupar_zonas_completas(zonas, grupos, df_reclamos, permitir_redistribucion=
     if not grupos or not zonas:
         return {g: [] for g in grupos}
     
-    # Calcular reclamos por zona
-    reclamos_por_zona = {}
-    for zona in zonas:
-        sectores_zona = SECTORES_VECINOS.get(zona, [])
-        total_reclamos = len(df_reclamos[
-            df_reclamos["Sector"].astype(str).isin(sectores_zona) &
-            (df_reclamos["Estado"] == "Pendiente")
-        ])
-        reclamos_por_zona[zona] = total_reclamos
+    # Calcular reclamos por zona (un solo mapeo y un conteo)
+    pendientes = df_reclamos["Estado"].to_numpy() == "Pendiente"
+    indices = _indices_zona(df_reclamos["Sector"])[pendientes]
+    conteos = np.bincount(indices[indices >= 0], minlength=len(ZONAS))
+    reclamos_por_zona = {zona: int(conteos[INDICE_ZONA[zona]]) if zona in INDICE_ZONA else 0 for zona in zonas}
     
     # Ordenar zonas por cantidad de reclamos (descendente)
     zonas_ordenadas = sorted(zonas, key=lambda z: reclamos_por_zona[z], reverse=True)
@@ -126,11 +142,9 @@ def _son_zonas_compatibles(zona, zonas_destino):
     if not zonas_destino:
         return True  # Siempre compatible con grupo vacío
     
-    for zona_dest in zonas_destino:
-        if (zona in ZONAS_COMPATIBLES.get(zona_dest, []) or 
-            zona_dest in ZONAS_COMPATIBLES.get(zona, [])):
-            return True
-    return False
+    i = INDICE_ZONA[zona]
+    destinos = [INDICE_ZONA[z] for z in zonas_destino]
+    return bool(ADYACENCIA_ZONAS[destinos, i].any() or ADYACENCIA_ZONAS[i, destinos].any())
 
 def distribuir_por_sector_mejorado(df_reclamos, grupos_activos):
     """
@@ -145,20 +159,16 @@ def distribuir_por_sector_mejorado(df_reclamos, grupos_activos):
     # Usar algoritmo que no divide zonas
     zonas_por_grupo = agrupar_zonas_completas(zonas, grupos, df_reclamos)
     
-    # Crear mapa: sector → grupo (ahora todos los sectores de una zona van al mismo grupo)
-    sector_grupo_map = {}
+    # Mapa zona → grupo (todos los sectores de una zona van al mismo grupo)
+    grupo_por_zona = np.full(len(ZONAS) + 1, None, dtype=object)  # la última posición: sin zona
     for grupo, zonas_asignadas in zonas_por_grupo.items():
         for zona in zonas_asignadas:
-            sectores = SECTORES_VECINOS.get(zona, [])
-            for sector in sectores:
-                sector_grupo_map[str(sector)] = grupo
-
-    # Asignar reclamos
-    for _, r in df_reclamos.iterrows():
-        sector = str(r.get("Sector", "")).strip()
-        grupo = sector_grupo_map.get(sector)
-        if grupo:
-            asignaciones[grupo].append(r["ID Reclamo"])
+            grupo_por_zona[INDICE_ZONA[zona]] = grupo
+
+    # Asignar reclamos: un mapeo vectorizado y un groupby (conserva el orden original)
+    grupo_reclamo = pd.Series(grupo_por_zona[_indices_zona(df_reclamos["Sector"])], index=df_reclamos.index)
+    for grupo, ids in df_reclamos["ID Reclamo"].groupby(grupo_reclamo, sort=False):
+        asignaciones[grupo] = ids.tolist()
     
     return asignaciones
 
@@ -168,6 +178,13 @@ def _balancear_asignaciones(asignaciones, df_reclamos):
     - Todos los grupos tendrán carga floor(N/G) o ceil(N/G).
     - Condición de corte: max(cargas) - min(cargas) <= 1
     """
+    # Zona de cada reclamo y zonas presentes por grupo, calculadas una sola vez
+    zona_por_id = dict(zip(df_reclamos["ID Reclamo"], _indices_zona(df_reclamos["Sector"])))
+    zonas_por_grupo = {}
+    for grupo, recs in asignaciones.items():
+        indices = np.array([zona_por_id.get(r, -1) for r in recs], dtype=int)
+        zonas_por_grupo[grupo] = np.bincount(indices[indices >= 0], minlength=len(ZONAS))
+
     # Cargas iniciales
     carga_por_grupo = {g: len(recs) for g, recs in asignaciones.items()}
 
@@ -192,10 +209,8 @@ def _balancear_asignaciones(asignaciones, df_reclamos):
         # Elegir un reclamo candidato del grupo más cargado que sea compatible con el menos cargado
         reclamo_a_transferir = _encontrar_reclamo_transferible(
             asignaciones[grupo_mas_cargado],
-            grupo_mas_cargado,
-            grupo_menos_cargado,
-            df_reclamos,
-            asignaciones
+            zonas_por_grupo[grupo_menos_cargado] > 0,
+            zona_por_id
         )
 
         if not reclamo_a_transferir:
@@ -206,69 +221,71 @@ def _balancear_asignaciones(asignaciones, df_reclamos):
         asignaciones[grupo_mas_cargado].remove(reclamo_a_transferir)
         asignaciones[grupo_menos_cargado].append(reclamo_a_transferir)
 
-        # Actualizar cargas
+        # Actualizar cargas y zonas presentes
         carga_por_grupo[grupo_mas_cargado] -= 1
         carga_por_grupo[grupo_menos_cargado] += 1
+        zona = zona_por_id.get(reclamo_a_transferir, -1)
+        if zona >= 0:
+            zonas_por_grupo[grupo_mas_cargado][zona] -= 1
+            zonas_por_grupo[grupo_menos_cargado][zona] += 1
 
     return asignaciones
 
-def _encontrar_reclamo_transferible(reclamos_grupo_origen, grupo_origen, grupo_destino, df_reclamos, asignaciones):
+def _encontrar_reclamo_transferible(reclamos_grupo_origen, zonas_destino, zona_por_id):
     """
     Elige el mejor reclamo para mover del grupo origen al destino:
     - Compatible con zonas del destino (prioridad alta)
     - Zonas más "centrales" (mayor conectividad) tienen más prioridad
     - Si el destino aún no tiene zonas, prioriza centralidad
+    `zonas_destino` es la máscara de zonas presentes en el destino.
     """
-    # 1) Armar zonas actuales del destino
-    zonas_destino = []
-    reclamos_destino = df_reclamos[df_reclamos["ID Reclamo"].isin(asignaciones[grupo_destino])]
-    for _, r in reclamos_destino.iterrows():
-        sec = str(r["Sector"])
-        for z, sectores in SECTORES_VECINOS.items():
-            if sec in sectores and z not in zonas_destino:
-                zonas_destino.append(z)
-
-    # 2) Evaluar candidatos del origen
-    mejor_id = None
-    mejor_score = float("-inf")
-
-    for reclamo_id in reclamos_grupo_origen:
-        fila = df_reclamos[df_reclamos["ID Reclamo"] == reclamo_id]
-        if fila.empty:
-            continue
-
-        sector = str(fila.iloc[0]["Sector"])
-        zona_reclamo = None
-        for z, sectores in SECTORES_VECINOS.items():
-            if sector in sectores:
-                zona_reclamo = z
-                break
-
-        if not zona_reclamo:
-            continue
+    # 1) Puntaje por zona (no por reclamo): centralidad + compatibilidad con el destino
+    puntajes = CENTRALIDAD_ZONAS.copy()
+    if zonas_destino.any():
+        puntajes += 100 * ADYACENCIA_ZONAS[zonas_destino].any(axis=0)
+        puntajes += 20 * zonas_destino
+    else:
+        puntajes += 10  # Sin zonas destino aún → pequeño empuje para desbloquear
 
-        # Puntaje base por centralidad (cuántas zonas son compatibles con esta zona)
-        centralidad = len(ZONAS_COMPATIBLES.get(zona_reclamo, []))
-        score = centralidad  # base
-
-        if zonas_destino:
-            # Compatible con al menos una zona del destino
-            compatible = any(zona_reclamo in ZONAS_COMPATIBLES.get(zd, []) for zd in zonas_destino)
-            if compatible:
-                score += 100
-            # Match exacto (misma zona) también suma
-            if zona_reclamo in zonas_destino:
-                score += 20
-        else:
-            # Sin zonas destino aún → priorizar centralidad pura
-            score += 10  # pequeño empuje para desbloquear
-
-        if score > mejor_score:
-            mejor_score = score
-            mejor_id = reclamo_id
+    # 2) Primer reclamo del origen cuya zona tenga el mejor puntaje disponible
+    zonas_origen = np.array([zona_por_id.get(r, -1) for r in reclamos_grupo_origen], dtype=int)
+    con_zona = np.flatnonzero(zonas_origen >= 0)
+    if len(con_zona):
+        puntajes_origen = puntajes[zonas_origen[con_zona]]
+        return reclamos_grupo_origen[con_zona[np.argmax(puntajes_origen)]]
 
     # 3) Fallback si no encontramos nada
-    return mejor_id if mejor_id is not None else (reclamos_grupo_origen[0] if reclamos_grupo_origen else None)
+    return reclamos_grupo_origen[0] if reclamos_grupo_origen else None
+
+def distribuir_optimo(df_reclamos, grupos_activos):
+    """
+    Asignación por flujo de costo mínimo: menor dispersión de zonas con cargas
+    balanceadas. Si ASIGNACION_TIEMPO_LIMITE se agota se usa la mejor solución
+    encontrada; solo si no se resolvió ninguna se usa la distribución por
+    sector con el balanceo greedy.
+    Devuelve (asignaciones, zona base por grupo o None).
+    """
+    grupos = GRUPOS_POSIBLES[:grupos_activos]
+    pendientes = df_reclamos[df_reclamos["Estado"] == "Pendiente"]
+    sectores = pendientes["Sector"].astype(str).str.strip()
+
+    # Orden por sector y antigüedad: cada grupo recibe tramos contiguos de su zona
+    orden = pd.DataFrame({
+        "sector": pd.to_numeric(sectores, errors="coerce"),
+        "fecha": pendientes["Fecha y hora"]
+    }).sort_values(["sector", "fecha"], kind="mergesort").index
+    zonas = [ZONA_POR_SECTOR.get(s) for s in sectores.loc[orden]]
+
+    resultado = asignar_por_zonas(
+        pendientes.loc[orden, "ID Reclamo"].tolist(), zonas, grupos,
+        ZONAS_COMPATIBLES, limite_segundos=ASIGNACION_TIEMPO_LIMITE
+    )
+    if resultado is not None:
+        return resultado
+
+    cloud_log("Asignación óptima sin resultado a tiempo: se usa distribución por sector balanceada", "warning")
+    asignaciones = distribuir_por_sector_mejorado(df_reclamos, grupos_activos)
+    return _balancear_asignaciones(asignaciones, pendientes), None
 
 def distribuir_por_tipo(df_reclamos, grupos_activos):
     df_reclamos = df_reclamos[df_reclamos["Estado"] == "Pendiente"].copy()  # <--- agregado
@@ -308,29 +325,36 @@ def _mostrar_reclamos_disponibles(df_reclamos, grupos_activos):
     st.markdown("---")
     st.markdown("### 📋 Reclamos pendientes para asignar")
 
-    df_reclamos.columns = df_reclamos.columns.str.strip()
-    df_reclamos["ID Reclamo"] = df_reclamos["ID Reclamo"].astype(str).str.strip()
-    df_reclamos["Fecha y hora"] = pd.to_datetime(df_reclamos["Fecha y hora"], dayfirst=True, errors='coerce')
-
     # Verificamos si hay IDs vacíos
     if df_reclamos["ID Reclamo"].eq("").any():
         st.error("❌ Hay reclamos con ID vacío. Por favor, corregílos en la hoja antes de continuar.")
         return None
 
-    df_pendientes = df_reclamos[df_reclamos["Estado"] == "Pendiente"].copy()
+    # Filtros sobre el índice de bitmaps del snapshot; opciones con conteo de pendientes
+    indice = get_filter_index(df_reclamos, ("Estado", "Sector", "Tipo de reclamo"))
+    filtros = {
+        "Estado": "Pendiente",
+        "Sector": st.session_state.get("filtro_sector_planificacion", "Todos"),
+        "Tipo de reclamo": st.session_state.get("filtro_tipo_planificacion", "Todos"),
+    }
+    opciones_tipo = [(t, n) for t, n in indice.opciones("Tipo de reclamo", filtros) if n]
+    if filtros["Tipo de reclamo"] not in ["Todos"] + [t for t, _ in opciones_tipo]:
+        st.session_state.filtro_tipo_planificacion = "Todos"
 
     # Filtros
     col1, col2 = st.columns(2)
     with col1:
         filtro_sector = st.selectbox("Filtrar por sector", ["Todos"] + sorted(SECTORES_DISPONIBLES),
+                                     key="filtro_sector_planificacion",
                                      format_func=lambda x: f"Sector {x}" if x != "Todos" else x)
     with col2:
-        filtro_tipo = st.selectbox("Filtrar por tipo de reclamo", ["Todos"] + sorted(df_pendientes["Tipo de reclamo"].dropna().unique()))
+        filtro_tipo = st.selectbox("Filtrar por tipo de reclamo", ["Todos"] + [t for t, _ in opciones_tipo],
+                                   key="filtro_tipo_planificacion",
+                                   format_func=etiqueta_con_conteo(opciones_tipo))
 
-    if filtro_sector != "Todos":
-        df_pendientes = df_pendientes[df_pendientes["Sector"] == str(filtro_sector)]
-    if filtro_tipo != "Todos":
-        df_pendientes = df_pendientes[df_pendientes["Tipo de reclamo"] == filtro_tipo]
+    df_pendientes = df_reclamos.iloc[indice.posiciones(
+        {"Estado": "Pendiente", "Sector": filtro_sector, "Tipo de reclamo": filtro_tipo}
+    )]
 
     orden = st.selectbox("🔃 Ordenar reclamos por:", ["Fecha más reciente", "Sector", "Tipo de reclamo"])
     if orden == "Fecha más reciente":
@@ -399,7 +423,7 @@ def _limpiar_asignaciones(df_reclamos):
             if str(id) in ids_validos
         ]
 
-def render_planificacion_grupos(df_reclamos, sheet_reclamos, user):
+def render_planificacion_grupos(df_reclamos, df_clientes, sheet_reclamos, user):
     # Aplicar estilos tipo CRM
     st.markdown("""
         <style>
@@ -436,6 +460,9 @@ def render_planificacion_grupos(df_reclamos, sheet_reclamos, user):
     st.caption("Asigna reclamos pendientes a grupos de técnicos para optimizar el trabajo en campo")
 
     try:
+        # Vista compartida con IDs normalizados y fechas ya parseadas (solo lectura)
+        df_reclamos = get_reclamos_enriquecidos(df_reclamos, df_clientes)
+
         inicializar_estado_grupos()
         _limpiar_asignaciones(df_reclamos)
 
@@ -446,7 +473,7 @@ def render_planificacion_grupos(df_reclamos, sheet_reclamos, user):
         with col2:
             modo_distribucion = st.selectbox(
                 "📊 Modo de distribución",
-                ["Manual", "Automática por sector (mejorada)", "Automática por tipo de reclamo"],
+                ["Manual", "Automática por sector (mejorada)", "Óptima por zonas y carga", "Automática por tipo de reclamo"],
                 index=0
             )
 
@@ -466,6 +493,19 @@ def render_planificacion_grupos(df_reclamos, sheet_reclamos, user):
                     for grupo, zonas_asignadas in zonas_por_grupo.items():
                         st.markdown(f"- **{grupo}** cubre: {', '.join(zonas_asignadas)}")
 
+                elif modo_distribucion == "Óptima por zonas y carga":
+                    asignaciones, zonas_base = distribuir_optimo(df_reclamos, grupos_activos)
+                    st.session_state.simulacion_asignaciones = asignaciones
+
+                    if not any(asignaciones.values()):
+                        st.info("ℹ️ No hay reclamos pendientes para distribuir")
+                    elif zonas_base:
+                        st.markdown("### 🗺️ Zona base por grupo (óptima):")
+                        for grupo, zona in zonas_base.items():
+                            st.markdown(f"- **{grupo}** ({len(asignaciones[grupo])} reclamos) base en {zona}")
+                    else:
+                        st.info("ℹ️ Se usó la distribución por sector con balanceo de cargas")
+
                 else:
                     st.session_state.simulacion_asignaciones = distribuir_por_tipo(df_reclamos, grupos_activos)
 
@@ -507,6 +547,10 @@ def render_planificacion_grupos(df_reclamos, sheet_reclamos, user):
 
         if df_pendientes is not None:
             materiales_por_grupo = _mostrar_reclamos_asignados(df_pendientes, grupos_activos)
+            render_exportador(
+                _tabla_asignaciones(df_reclamos, grupos_activos), "asignaciones",
+                key="exportar_asignaciones", titulo="⬇️ Exportar asignaciones"
+            )
             cambios = _mostrar_acciones_finales(
                 df_reclamos, sheet_reclamos, 
                 grupos_activos, materiales_por_grupo, df_pendientes
@@ -576,6 +620,21 @@ def _mostrar_reclamos_asignados(df_pendientes, grupos_activos):
     return materiales_por_grupo
 
 
+def _tabla_asignaciones(df_reclamos, grupos_activos):
+    """Reclamos asignados con su grupo y técnicos, en el orden de asignación"""
+    filas = []
+    for grupo in GRUPOS_POSIBLES[:grupos_activos]:
+        tecnicos = ", ".join(st.session_state.tecnicos_grupos[grupo])
+        for reclamo_id in st.session_state.asignaciones_grupos[grupo]:
+            filas.append((grupo, tecnicos, reclamo_id))
+
+    asignaciones = pd.DataFrame(filas, columns=["Grupo", "Técnicos del grupo", "ID Reclamo"])
+    columnas = ["ID Reclamo", "Fecha y hora", "Nº Cliente", "Nombre", "Dirección", "Sector", "Tipo de reclamo", "Detalles"]
+    return asignaciones.merge(
+        df_reclamos[[c for c in columnas if c in df_reclamos.columns]],
+        on="ID Reclamo", how="left"
+    )
+
 def _calcular_materiales_grupo(reclamos_grupo):
     """Calcula los materiales necesarios para un grupo de trabajo"""
     materiales_total = {}
@@ -646,10 +705,10 @@ def _guardar_cambios(df_reclamos, sheet_reclamos, grupos_activos):
             success, error = api_manager.safe_sheet_operation(batch_update_sheet, sheet_reclamos, updates, is_batch=True)
             if success:
                 st.success("✅ Reclamos actualizados correctamente en la hoja.")
-                if 'notification_manager' in st.session_state:
+                if 'notification_service' in st.session_state:
                     for n in notificaciones:
                         mensaje = f"📋 Se asignaron {n['cantidad']} reclamos a {n['grupo']} (Técnicos: {n['tecnicos']})."
-                        st.session_state.notification_manager.add(
+                        st.session_state.notification_service.emit(
                             notification_type="reclamo_asignado",
                             message=mensaje,
                             user_target="all"
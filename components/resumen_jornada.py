@@ -1,9 +1,8 @@
 # components/resumen_jornada.py
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-from utils.date_utils import format_fecha, ahora_argentina, parse_fecha
+from utils.date_utils import format_fecha, ahora_argentina
 from utils.helpers import cloud_log, get_status_badge
 from utils.api_manager import api_manager
 from config.settings import DEBUG_MODE, IS_RENDER
@@ -139,17 +138,9 @@ def render_resumen_jornada(df_reclamos):
     """, unsafe_allow_html=True)
     
     try:
-        # Manejo robusto de fechas
-        df_reclamos = df_reclamos.copy()
-        df_reclamos["Fecha y hora"] = df_reclamos["Fecha y hora"].apply(
-            lambda x: parse_fecha(x) if not pd.isna(x) else pd.NaT
-        )
-        
-        # Filtrar reclamos de hoy
+        # 'Fecha y hora' llega parseada en hora argentina desde cargar_datos
         hoy = ahora_argentina().date()
-        df_hoy = df_reclamos[
-            df_reclamos["Fecha y hora"].dt.tz_localize(None).dt.date == hoy
-        ].copy()
+        df_hoy = df_reclamos[df_reclamos["Fecha y hora"].dt.date == hoy].copy()
         
         # Filtrar reclamos en curso
         df_en_curso = df_reclamos[df_reclamos["Estado"] == "En curso"].copy()
@@ -275,50 +266,31 @@ def _notificar_reclamos_no_asignados(df):
     """
     Detecta reclamos sin técnico hace más de 36 horas y notifica globalmente
     """
-    if 'notification_manager' not in st.session_state or st.session_state.notification_manager is None:
+    if st.session_state.get('notification_service') is None:
         return
     
     try:
         ahora = ahora_argentina()
         umbral = ahora - timedelta(hours=36)
         
-        # Preparar datos para análisis
-        df_analisis = df.copy()
-        df_analisis["Fecha y hora"] = df_analisis["Fecha y hora"].apply(
-            lambda x: parse_fecha(x) if not pd.isna(x) else pd.NaT
-        )
-        
         # Filtrar reclamos problemáticos
-        df_filtrado = df_analisis[
-            (df_analisis["Estado"].isin(["Pendiente", "En curso"])) &
-            (df_analisis["Técnico"].isna() | (df_analisis["Técnico"].astype(str).str.strip() == "")) &
-            (df_analisis["Fecha y hora"] < umbral)
-        ].copy()
+        df_filtrado = df[
+            (df["Estado"].isin(["Pendiente", "En curso"])) &
+            (df["Técnico"].isna() | (df["Técnico"].astype(str).str.strip() == "")) &
+            (df["Fecha y hora"] < umbral)
+        ]
         
         if df_filtrado.empty:
             return
         
-        # Verificar si ya existe una notificación similar
-        notificaciones_existentes = st.session_state.notification_manager.get_for_user(
-            "all", unread_only=False, limit=20
+        # La deduplicación y el límite de frecuencia los resuelve el servicio en memoria
+        mensaje = f"Hay {len(df_filtrado)} reclamos sin técnico asignado desde hace más de 36 horas."
+        st.session_state.notification_service.emit(
+            notification_type="unassigned_claim",
+            message=mensaje,
+            user_target="all",
+            sujeto=len(df_filtrado)
         )
-        
-        ya_existe = any(
-            n.get("Tipo") == "unassigned_claim" and 
-            n.get("Mensaje", "").startswith(f"Hay {len(df_filtrado)}")
-            for n in notificaciones_existentes
-        )
-        
-        if not ya_existe:
-            mensaje = f"Hay {len(df_filtrado)} reclamos sin técnico asignado desde hace más de 36 horas."
-            success = st.session_state.notification_manager.add(
-                notification_type="unassigned_claim",
-                message=mensaje,
-                user_target="all"
-            )
-            
-            if success:
-                cloud_log(f"Notificación de reclamos no asignados enviada: {mensaje}", "info")
                 
     except Exception as e:
         error_msg = f"Error en notificación de reclamos no asignados: {str(e)}"
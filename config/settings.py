@@ -29,8 +29,28 @@ WORKSHEET_RECLAMOS = "Reclamos"
 WORKSHEET_CLIENTES = "Clientes"
 WORKSHEET_USUARIOS = "usuarios"
 WORKSHEET_NOTIFICACIONES = "Notificaciones"
+WORKSHEET_NOTIFICACIONES_LEIDAS = "Notificaciones_Leidas"
 
 MAX_NOTIFICATIONS = 15  # Aumentado para mejor UX en CRM
+MAX_GLOBAL_NOTIFICATIONS = 10  # Filas fijas (ring buffer) para notificaciones 'all'
+NOTIFICATION_DEDUP_WINDOW = 3600  # Segundos en los que una misma notificación no se repite
+NOTIFICATION_RATE_LIMITS = {  # Segundos mínimos entre emisiones del mismo tipo y destino
+    "unassigned_claim": 6 * 3600,
+}
+NOTIFICATION_RETENTION_DAYS = {  # Días que se conserva una notificación según su prioridad
+    "critica": 60,
+    "alta": 30,
+    "media": 14,
+    "baja": 7,
+}
+NOTIFICATION_RETENTION_BY_TYPE = {  # Excepciones por tipo (tienen precedencia sobre la prioridad)
+    "daily_reminder": 2,
+}
+NOTIFICATION_RETENTION_DEFAULT_DAYS = 30
+NOTIFICATION_RETENTION_INTERVAL = 6 * 3600  # Segundos entre corridas de la tarea de retención
+NOTIFICATION_READ_RECEIPTS_TTL = 30  # Segundos que se confía en la copia en memoria del estado de lectura
+NOTIFICATION_REFRESH_INTERVAL = 30  # Segundos entre relecturas de la hoja desde la campana
+NOTIFICATION_BUS_TTL = 600  # Segundos sin actividad tras los que una sesión sale del bus
 
 # Cargar credenciales desde variable de entorno en Render
 def get_gspread_client():
@@ -71,6 +91,8 @@ NOTIFICATION_TYPES = {
     "reclamo_asignado": {"priority": "media", "icon": "👷", "color": "#5F27CD"},
     "trabajo_asignado": {"priority": "media", "icon": "🛠️", "color": "#FF9FF3"},
     "cierre_exitoso": {"priority": "media", "icon": "✅", "color": "#10AC84"},
+    "desconexion_resuelta": {"priority": "baja", "icon": "🔌", "color": "#1DD1A1"},
+    "reclamo_actualizado": {"priority": "baja", "icon": "🧰", "color": "#8395A7"},
     "alerta_urgente": {"priority": "critica", "icon": "🚨", "color": "#EE5A24"},
 }
 
@@ -79,6 +101,9 @@ COLUMNAS_NOTIFICACIONES = [
     "Usuario_Destino", "ID_Reclamo", "Fecha_Hora", "Leída", "Acción", "Color"
 ]
 
+# Estado de lectura por usuario: IDs leídos comprimidos en rangos ("1-40,45,47-50")
+COLUMNAS_NOTIFICACIONES_LEIDAS = ["username", "leidas", "Ultima_Actualizacion"]
+
 # --------------------------
 # ESTRUCTURAS DE DATOS MEJORADAS
 # --------------------------
@@ -129,7 +154,7 @@ PERMISOS_POR_ROL = {
         'descripcion': 'Técnico de campo - Ejecución de trabajos',
         'permisos': [
             'inicio', 'reclamos_cargados', 'seguimiento_tecnico', 
-            'cierre_reclamos', 'mi_agenda'
+            'cierre_reclamos', 'mi_agenda', 'dashboard'
         ],
         'color': '#33D1FF',
         'icon': '🔧'
@@ -138,7 +163,7 @@ PERMISOS_POR_ROL = {
         'descripcion': 'Personal administrativo - Atención al cliente',
         'permisos': [
             'inicio', 'reclamos_cargados', 'gestion_clientes',
-            'imprimir_reclamos', 'dashboard'
+            'imprimir_reclamos', 'dashboard', 'importar_reclamos'
         ],
         'color': '#9D33FF',
         'icon': '💼'
@@ -150,9 +175,20 @@ PERMISOS_POR_ROL = {
         ],
         'color': '#FF33A8',
         'icon': '👀'
+    },
+    'usuario': {
+        'descripcion': 'Usuario general - Carga e impresión de reclamos',
+        'permisos': [
+            'inicio', 'reclamos_cargados', 'imprimir_reclamos', 'dashboard'
+        ],
+        'color': '#64748B',
+        'icon': '👤'
     }
 }
 
+# Permisos disponibles sin iniciar sesión
+PERMISOS_PUBLICOS = ['login', 'logout', 'error']
+
 # Mapeo de opciones de navegación a permisos
 OPCIONES_PERMISOS = {
     "Inicio": "inicio",
@@ -165,7 +201,8 @@ OPCIONES_PERMISOS = {
     "Reportes": "reportes",
     "Mi Agenda": "mi_agenda",
     "Gestión de Equipos": "gestion_equipos",
-    "Configuración": "configuracion"
+    "Configuración": "configuracion",
+    "Importar reclamos": "importar_reclamos"
 }
 
 # --------------------------
@@ -187,6 +224,10 @@ TIPOS_RECLAMO = [
     "Mantenimiento Preventivo", "Instalación Especial", "Consulta Técnica"
 ]
 
+# Importación masiva de reclamos
+IMPORT_CHUNK_SIZE = 5000  # Filas leídas por bloque del archivo
+IMPORT_WRITE_CHUNK = 500  # Filas por llamada a append_rows
+
 # Prioridades para reclamos
 PRIORIDADES_RECLAMO = [
     "Baja", "Normal", "Alta", "Urgente", "Crítica"
@@ -247,6 +288,11 @@ else:
     MAX_ROWS_PER_PAGE = 100
 
 SESSION_TIMEOUT = 2700  # 45 minutos de inactividad
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "")  # Vacío: se genera uno por proceso
+SESSION_QUERY_PARAM = "sesion"  # Parámetro de URL que lleva el token firmado
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", "100000"))  # Costo de PBKDF2
+USER_DIRECTORY_REFRESH = 300  # Segundos entre recargas del directorio de usuarios
+USER_DIRECTORY_MISS_REFRESH = 30  # Segundos mínimos entre recargas por un username desconocido
 
 # --------------------------
 # CONFIGURACIÓN DE ESTILOS CRM
@@ -285,12 +331,9 @@ def obtener_permisos_por_rol(rol):
     return PERMISOS_POR_ROL.get(rol, {}).get('permisos', [])
 
 def rol_tiene_permiso(rol, permiso_requerido):
-    """Verifica si un rol tiene un permiso específico"""
-    if permiso_requerido == 'admin':
-        return rol == 'admin'
-    
-    permisos = obtener_permisos_por_rol(rol)
-    return '*' in permisos or permiso_requerido in permisos
+    """Verifica si un rol tiene un permiso específico (usa la matriz compilada)"""
+    from utils.permissions import rol_tiene_permiso as _rol_tiene_permiso
+    return _rol_tiene_permiso(rol, permiso_requerido)
 
 def get_role_config(rol):
     """Obtiene la configuración completa de un rol"""
@@ -342,9 +385,11 @@ MAX_CLIENTES_POR_PAGINA = 100
 MAX_RECLAMOS_POR_PAGINA = 50
 MAX_USUARIOS_POR_PAGINA = 30
 MAX_HISTORIAL_CLIENTE = 20
+ASIGNACION_TIEMPO_LIMITE = 2.0  # Segundos para el asignador óptimo de planificación
 
 # --------------------------
 # CONFIGURACIÓN DE EXPORTACIÓN
 # --------------------------
-EXPORT_FORMATS = ['PDF', 'Excel', 'CSV', 'Imagen']
-EXPORT_DEFAULT = 'PDF'
\ No newline at end of file
+EXPORT_FORMATS = ['PDF', 'Excel', 'CSV', 'Parquet', 'Imagen']
+EXPORT_DEFAULT = 'PDF'
+EXPORT_CHUNK_SIZE = 5000  # Filas por bloque al exportar
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Asignación de reclamos pendientes a grupos de trabajo
+Versión 1.0 - Flujo de costo mínimo sobre zonas: dispersión geográfica mínima con carga balanceada
+
+Los reclamos de una misma zona son intercambiables para el costo, así que el
+problema se resuelve sobre cantidades por zona (a lo sumo unas decenas de
+nodos) y recién al final se reparten los IDs. Cada grupo tiene una zona
+"ancla"; mandar un reclamo a un grupo cuesta la distancia (en saltos del grafo
+de zonas compatibles) entre la zona del reclamo y el ancla del grupo. Para
+cada combinación de anclas se resuelve un transporte con flujo de costo
+mínimo en el que cada grupo recibe floor(N/G) o ceil(N/G) reclamos.
+"""
+import time
+from collections import deque
+from itertools import combinations_with_replacement
+from utils.helpers import cloud_log
+
+SIN_ZONA = None
+
+def distancias_zonas(zonas, compatibles):
+    """Saltos entre cada par de zonas en el grafo de compatibilidad (BFS, no dirigido)"""
+    vecinos = {z: set() for z in zonas}
+    for zona, otras in compatibles.items():
+        for otra in otras:
+            if zona in vecinos and otra in vecinos:
+                vecinos[zona].add(otra)
+                vecinos[otra].add(zona)
+
+    inalcanzable = len(zonas)
+    distancias = {}
+    for origen in zonas:
+        vistos = {origen: 0}
+        cola = deque([origen])
+        while cola:
+            actual = cola.popleft()
+            for vecina in vecinos[actual]:
+                if vecina not in vistos:
+                    vistos[vecina] = vistos[actual] + 1
+                    cola.append(vecina)
+        for destino in zonas:
+            distancias[origen, destino] = vistos.get(destino, inalcanzable)
+    return distancias
+
+class _FlujoCostoMinimo:
+    """Caminos mínimos sucesivos (Bellman-Ford) para grafos chicos con costos negativos"""
+
+    def __init__(self, nodos):
+        self.aristas = []  # [destino, capacidad, costo, inversa]
+        self.salientes = [[] for _ in range(nodos)]
+
+    def arista(self, origen, destino, capacidad, costo):
+        self.salientes[origen].append(len(self.aristas))
+        self.aristas.append([destino, capacidad, costo, len(self.aristas) + 1])
+        self.salientes[destino].append(len(self.aristas))
+        self.aristas.append([origen, 0, -costo, len(self.aristas) - 1])
+        return len(self.aristas) - 2
+
+    def resolver(self, fuente, sumidero):
+        """Envía el flujo máximo al menor costo. Devuelve (flujo, costo)"""
+        flujo_total = costo_total = 0
+        nodos = len(self.salientes)
+        while True:
+            distancia = [float("inf")] * nodos
+            previa = [None] * nodos
+            distancia[fuente] = 0
+            for _ in range(nodos - 1):
+                cambio = False
+                for nodo in range(nodos):
+                    if distancia[nodo] == float("inf"):
+                        continue
+                    for indice in self.salientes[nodo]:
+                        destino, capacidad, costo, _ = self.aristas[indice]
+                        if capacidad > 0 and distancia[nodo] + costo < distancia[destino]:
+                            distancia[destino] = distancia[nodo] + costo
+                            previa[destino] = indice
+                            cambio = True
+                if not cambio:
+                    break
+            if distancia[sumidero] == float("inf"):
+                return flujo_total, costo_total
+
+            # Cuello de botella del camino y aumento
+            envio, nodo = float("inf"), sumidero
+            while nodo != fuente:
+                arista = self.aristas[previa[nodo]]
+                envio = min(envio, arista[1])
+                nodo = self.aristas[arista[3]][0]
+            nodo = sumidero
+            while nodo != fuente:
+                arista = self.aristas[previa[nodo]]
+                arista[1] -= envio
+                self.aristas[arista[3]][1] += envio
+                nodo = self.aristas[arista[3]][0]
+            flujo_total += envio
+            costo_total += envio * distancia[sumidero]
+
+def _transporte(cantidades, anclas, distancias, cupos):
+    """
+    Reparte las cantidades por zona entre los grupos (uno por ancla) respetando
+    los cupos. Devuelve (costo, {(zona, indice_grupo): cantidad}).
+    """
+    zonas = list(cantidades)
+    fuente, sumidero = 0, 1 + len(zonas) + len(anclas)
+    red = _FlujoCostoMinimo(sumidero + 1)
+    # El cupo mínimo de cada grupo se fuerza con un costo muy negativo
+    obligatorio = 1 + max(distancias.values(), default=0) * sum(cantidades.values())
+
+    aristas = {}
+    for i, zona in enumerate(zonas):
+        red.arista(fuente, 1 + i, cantidades[zona], 0)
+        for j, ancla in enumerate(anclas):
+            costo = 0 if zona is SIN_ZONA else distancias[zona, ancla]
+            aristas[zona, j] = red.arista(1 + i, 1 + len(zonas) + j, cantidades[zona], costo)
+    for j, (minimo, extra) in enumerate(cupos):
+        red.arista(1 + len(zonas) + j, sumidero, minimo, -obligatorio)
+        if extra:
+            red.arista(1 + len(zonas) + j, sumidero, extra, 0)
+
+    _, costo = red.resolver(fuente, sumidero)
+    costo += obligatorio * sum(minimo for minimo, _ in cupos)
+    reparto = {clave: red.aristas[red.aristas[indice][3]][1] for clave, indice in aristas.items()}
+    return costo, reparto
+
+def asignar_por_zonas(ids, zonas, grupos, compatibles, limite_segundos=None):
+    """
+    Asigna cada reclamo (ids[i] en la zona zonas[i]; None si no tiene zona) a
+    un grupo minimizando la dispersión geográfica con cargas que difieren en a
+    lo sumo 1. Los IDs deben venir en el orden en que se quieren repartir
+    (p. ej. por sector y fecha) para que cada grupo reciba tramos contiguos.
+
+    Returns:
+        ({grupo: [ids]}, {grupo: zona_ancla}). Si se agota el tiempo se devuelve
+        la mejor solución encontrada, o None si no llegó a resolverse ninguna
+    """
+    inicio = time.perf_counter()
+    if not grupos:
+        return {}, {}
+    if not ids:
+        return {g: [] for g in grupos}, {}  # sin reclamos no hay zona base que elegir
+
+    todas_zonas = list(dict.fromkeys(list(compatibles) + [z for z in zonas if z is not SIN_ZONA]))
+    distancias = distancias_zonas(todas_zonas, compatibles)
+
+    cantidades = {}
+    for zona in zonas:
+        cantidades[zona] = cantidades.get(zona, 0) + 1
+
+    base, resto = divmod(len(ids), len(grupos))
+    cupos = [(base, 1 if resto else 0)] * len(grupos)
+
+    mejor = None
+    candidatas = [z for z in todas_zonas if cantidades.get(z)] or todas_zonas[:1]
+    for anclas in combinations_with_replacement(candidatas, len(grupos)):
+        if limite_segundos is not None and time.perf_counter() - inicio > limite_segundos:
+            if mejor is None:
+                cloud_log(f"Asignación óptima: tiempo agotado con {len(ids)} reclamos", "warning")
+                return None
+            # Se usa la mejor combinación de anclas resuelta hasta ahora
+            cloud_log(f"Asignación óptima: tiempo agotado con {len(ids)} reclamos, se usa la mejor encontrada", "warning")
+            break
+        costo, reparto = _transporte(cantidades, anclas, distancias, cupos)
+        # Empates: menos zonas distintas por grupo
+        dispersion = sum(1 for cantidad in reparto.values() if cantidad)
+        if mejor is None or (costo, dispersion) < mejor[:2]:
+            mejor = (costo, dispersion, anclas, reparto)
+
+    _, _, anclas, reparto = mejor
+
+    # Reparto de IDs: cada zona se entrega en tramos, primero a los grupos anclados en ella
+    por_zona = {}
+    for reclamo_id, zona in zip(ids, zonas):
+        por_zona.setdefault(zona, []).append(reclamo_id)
+
+    asignaciones = {g: [] for g in grupos}
+    for zona, ids_zona in por_zona.items():
+        orden = sorted(
+            range(len(grupos)),
+            key=lambda j: 0 if zona is SIN_ZONA else distancias[zona, anclas[j]]
+        )
+        desde = 0
+        for j in orden:
+            cantidad = reparto.get((zona, j), 0)
+            asignaciones[grupos[j]].extend(ids_zona[desde:desde + cantidad])
+            desde += cantidad
+
+    return asignaciones, dict(zip(grupos, anclas))
@@ -0,0 +1,230 @@
+"""
+Búsqueda de clientes y reclamos por texto
+Versión 1.1 - Índices invertidos (trigramas, prefijos, palabras) construidos una vez por snapshot
+"""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.indices import version_snapshot
+
+CAMPOS_BUSQUEDA_CLIENTES = ["Nº Cliente", "Nombre", "Dirección", "Teléfono"]
+SIMILITUD_MINIMA = 0.5  # Fracción de trigramas del término que deben coincidir
+RESULTADOS_POR_DEFECTO = 10
+PUNTAJE_PREFIJO = 0.9  # Una palabra exacta vale 1
+
+def normalizar_texto(texto):
+    """Minúsculas, sin acentos y solo caracteres alfanuméricos separados por espacio"""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9ñ]+", " ", texto).strip()
+
+def _normalizar_serie(serie):
+    """normalizar_texto aplicado a toda una columna con operaciones vectorizadas"""
+    return (serie.fillna("").astype(str).str.lower()
+            .str.normalize("NFKD").str.replace(r"[\u0300-\u036f]", "", regex=True)
+            .str.replace(r"[^a-z0-9ñ]+", " ", regex=True).str.strip())
+
+def trigramas(palabra):
+    """Trigramas de una palabra (la palabra entera si tiene menos de 3 caracteres)"""
+    if len(palabra) < 3:
+        return {palabra} if palabra else set()
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+class ClientSearchIndex:
+    """
+    Índice invertido de clientes: trigramas -> posiciones para coincidencias
+    aproximadas y un vocabulario ordenado para búsquedas por prefijo.
+    """
+
+    def __init__(self, df_clientes, campos=CAMPOS_BUSQUEDA_CLIENTES):
+        campos = [c for c in campos if c in df_clientes.columns]
+        self._registros = df_clientes[campos].astype(str).to_dict('records') if campos else []
+        self._etiquetas = list(df_clientes.index)
+        self._por_trigrama = defaultdict(list)
+        por_palabra = defaultdict(set)
+
+        for pos, registro in enumerate(self._registros):
+            palabras = set(normalizar_texto(" ".join(registro.values())).split())
+            telefono = re.sub(r"\D", "", registro.get("Teléfono", ""))
+            if telefono:
+                palabras.add(telefono)
+            for palabra in palabras:
+                por_palabra[palabra].add(pos)
+            for trigrama in set().union(*(trigramas(p) for p in palabras)) if palabras else ():
+                self._por_trigrama[trigrama].append(pos)
+
+        self._vocabulario = sorted(por_palabra)
+        self._por_palabra = dict(por_palabra)
+
+    def _por_prefijo(self, prefijo):
+        """Posiciones con alguna palabra que empiece con el prefijo"""
+        posiciones = set()
+        i = bisect_left(self._vocabulario, prefijo)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(prefijo):
+            posiciones |= self._por_palabra[self._vocabulario[i]]
+            i += 1
+        return posiciones
+
+    def _puntajes_termino(self, termino):
+        """Puntaje por posición para un término: palabra exacta > prefijo > similitud de trigramas"""
+        puntajes = dict.fromkeys(self._por_prefijo(termino), PUNTAJE_PREFIJO)
+        puntajes.update(dict.fromkeys(self._por_palabra.get(termino, ()), 1.0))
+        if len(termino) >= 3:
+            tris = trigramas(termino)
+            coincidencias = defaultdict(int)
+            for trigrama in tris:
+                for pos in self._por_trigrama.get(trigrama, ()):
+                    coincidencias[pos] += 1
+            for pos, n in coincidencias.items():
+                similitud = PUNTAJE_PREFIJO * n / len(tris)
+                if n / len(tris) >= SIMILITUD_MINIMA and similitud > puntajes.get(pos, 0):
+                    puntajes[pos] = similitud
+        return puntajes
+
+    def buscar(self, consulta, k=RESULTADOS_POR_DEFECTO):
+        """Top-k clientes para la consulta: [(etiqueta, registro, puntaje)]"""
+        terminos = normalizar_texto(consulta).split()
+        if not terminos:
+            return []
+
+        puntajes_por_termino = [self._puntajes_termino(t) for t in terminos]
+        # Todos los términos deben coincidir; se parte del conjunto más chico
+        candidatos = set(min(puntajes_por_termino, key=len))
+        for puntajes in puntajes_por_termino:
+            candidatos &= puntajes.keys()
+
+        consulta_exacta = str(consulta).strip()
+        resultados = []
+        for pos in candidatos:
+            puntaje = sum(p[pos] for p in puntajes_por_termino)
+            if self._registros[pos].get("Nº Cliente", "").strip() == consulta_exacta:
+                puntaje += len(terminos)  # el número exacto va primero
+            resultados.append((puntaje, -pos, pos))
+
+        mejores = heapq.nlargest(k, resultados)
+        return [
+            (self._etiquetas[pos], dict(self._registros[pos]), round(puntaje, 3))
+            for puntaje, _, pos in mejores
+        ]
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _client_search_index(version, _df_clientes):
+    """Índice de búsqueda por versión de snapshot"""
+    return ClientSearchIndex(_df_clientes)
+
+def get_client_search_index(df_clientes):
+    """Índice de búsqueda de clientes compartido para el snapshot dado"""
+    return _client_search_index(version_snapshot(df_clientes), df_clientes)
+
+def buscar_clientes(df_clientes, consulta, k=RESULTADOS_POR_DEFECTO):
+    """Atajo: top-k clientes que coinciden con la consulta"""
+    return get_client_search_index(df_clientes).buscar(consulta, k)
+
+# --------------------------
+# RECLAMOS
+# --------------------------
+# Peso de cada campo en el ranking: los identificadores pesan más que el texto libre
+PESOS_CAMPOS_RECLAMOS = {
+    "Nº Cliente": 3.0,
+    "ID Reclamo": 3.0,
+    "Nombre": 2.0,
+    "Dirección": 1.5,
+    "Tipo de reclamo": 1.5,
+    "Detalles": 1.0,
+}
+
+class ClaimSearchIndex:
+    """
+    Índice invertido de reclamos: palabra normalizada -> {posición: peso del
+    campo}. Cada término se expande por prefijo sobre el vocabulario ordenado y
+    el puntaje es la suma de peso del campo x idf. Todos los términos deben
+    coincidir. A igual puntaje gana la posición más baja (el orden del DataFrame).
+    """
+
+    def __init__(self, df_reclamos, pesos=PESOS_CAMPOS_RECLAMOS):
+        campos = [c for c in pesos if c in df_reclamos.columns]
+        self._etiquetas = list(df_reclamos.index)
+        self._ids = (df_reclamos["ID Reclamo"].astype(str).str.strip().tolist()
+                     if "ID Reclamo" in df_reclamos.columns else [""] * len(df_reclamos))
+
+        # Tokenización vectorizada: (palabra, posición, peso) de todos los campos
+        partes = []
+        for campo in campos:
+            palabras = _normalizar_serie(df_reclamos[campo]).str.split().reset_index(drop=True).explode()
+            palabras = palabras[palabras.notna() & (palabras != "")]
+            partes.append(pd.DataFrame({"palabra": palabras.to_numpy(), "pos": palabras.index.to_numpy(),
+                                        "peso": pesos[campo]}))
+
+        self._postings = {}
+        tokens = pd.concat(partes, ignore_index=True) if partes else None
+        if tokens is not None and not tokens.empty:
+            # Una palabra en varios campos de la misma fila conserva el mayor peso
+            tokens = tokens.sort_values("peso", ascending=False).drop_duplicates(["palabra", "pos"])
+            tokens = tokens.sort_values("palabra", kind="stable")
+            palabras = tokens["palabra"].to_numpy()
+            posiciones = tokens["pos"].tolist()
+            pesos_token = tokens["peso"].tolist()
+            cortes = np.flatnonzero(palabras[1:] != palabras[:-1]) + 1
+            inicios = [0] + cortes.tolist()
+            finales = cortes.tolist() + [len(palabras)]
+            for inicio, fin in zip(inicios, finales):
+                self._postings[palabras[inicio]] = dict(zip(posiciones[inicio:fin], pesos_token[inicio:fin]))
+
+        self._vocabulario = sorted(self._postings)
+        total = max(len(self._etiquetas), 1)
+        self._idf = {p: math.log(1 + total / len(pos)) for p, pos in self._postings.items()}
+
+    def _puntajes_termino(self, termino):
+        """Puntaje por posición para un término (exacto o como prefijo)"""
+        puntajes = {}
+        i = bisect_left(self._vocabulario, termino)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(termino):
+            palabra = self._vocabulario[i]
+            factor = self._idf[palabra] * (1.0 if palabra == termino else PUNTAJE_PREFIJO)
+            for pos, peso in self._postings[palabra].items():
+                puntaje = peso * factor
+                if puntaje > puntajes.get(pos, 0):
+                    puntajes[pos] = puntaje
+            i += 1
+        return puntajes
+
+    def buscar(self, consulta, k=RESULTADOS_POR_DEFECTO, permitido=None):
+        """
+        Top-k reclamos para la consulta: [(etiqueta, puntaje)]. `permitido`
+        (etiqueta -> bool) restringe los resultados, p. ej. a los filtrados.
+        """
+        terminos = normalizar_texto(consulta).split()
+        if not terminos:
+            return []
+
+        puntajes_por_termino = sorted((self._puntajes_termino(t) for t in terminos), key=len)
+        candidatos = set(puntajes_por_termino[0])
+        for puntajes in puntajes_por_termino[1:]:
+            candidatos &= puntajes.keys()
+
+        consulta_exacta = str(consulta).strip().upper()
+        resultados = []
+        for pos in candidatos:
+            if permitido is not None and not permitido(self._etiquetas[pos]):
+                continue
+            puntaje = sum(p[pos] for p in puntajes_por_termino)
+            if self._ids[pos].upper() == consulta_exacta:
+                puntaje *= 2  # el ID exacto va primero
+            resultados.append((puntaje, -pos, pos))
+
+        return [(self._etiquetas[pos], round(puntaje, 3)) for puntaje, _, pos in heapq.nlargest(k, resultados)]
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _claim_search_index(version, _df_reclamos):
+    """Índice de búsqueda de reclamos por versión de snapshot"""
+    return ClaimSearchIndex(_df_reclamos)
+
+def get_claim_search_index(df_reclamos):
+    """Índice de búsqueda de reclamos compartido para el snapshot dado"""
+    return _claim_search_index(version_snapshot(df_reclamos), df_reclamos)
@@ -3,6 +3,7 @@ Módulo centralizado para el manejo de fechas en la aplicación
 Incluye funciones para parsing, formateo y operaciones con zonas horarias
 """
 from datetime import datetime
+import numpy as np
 import pytz
 import pandas as pd
 from typing import Union, Optional
@@ -11,6 +12,25 @@ import streamlit as st
 # Configuración de zona horaria (constante global)
 ARGENTINA_TZ = pytz.timezone("America/Argentina/Buenos_Aires")
 
+# Formatos compatibles (ordenados por probabilidad de uso)
+FORMATOS_FECHA = [
+    '%d/%m/%Y %H:%M:%S',  # 25/12/2023 14:30:45
+    '%d-%m-%Y %H:%M:%S',  # 25-12-2023 14:30:45
+    '%d/%m/%Y %H:%M',     # 25/12/2023 14:30
+    '%d-%m-%Y %H:%M',     # 25-12-2023 14:30
+    '%Y-%m-%d %H:%M:%S',  # 2023-12-25 14:30:45 (ISO)
+    '%Y/%m/%d %H:%M:%S',  # 2023/12/25 14:30:45
+    '%d/%m/%Y',           # 25/12/2023
+    '%d-%m-%Y',           # 25-12-2023
+    '%Y%m%d %H:%M:%S',    # 20231225 14:30:45
+    '%Y%m%d',             # 20231225
+    '%m/%d/%Y %H:%M:%S',  # 12/25/2023 14:30:45 (formato US)
+    '%m-%d-%Y %H:%M:%S',  # 12-25-2023 14:30:45
+]
+
+# Tamaño de la muestra usada para detectar el formato dominante de una columna
+MUESTRA_FORMATO_FECHAS = 200
+
 def ahora_argentina() -> datetime:
     """Devuelve la fecha y hora actual en zona horaria Argentina"""
     return datetime.now(ARGENTINA_TZ)
@@ -53,24 +73,8 @@ def parse_fecha(
     if not fecha_str or fecha_str.lower() in ['nan', 'nat', 'none', '']:
         return None
     
-    # Lista de formatos compatibles (ordenados por probabilidad de uso)
-    formatos = [
-        '%d/%m/%Y %H:%M:%S',  # 25/12/2023 14:30:45
-        '%d-%m-%Y %H:%M:%S',  # 25-12-2023 14:30:45
-        '%d/%m/%Y %H:%M',     # 25/12/2023 14:30
-        '%d-%m-%Y %H:%M',     # 25-12-2023 14:30
-        '%Y-%m-%d %H:%M:%S',  # 2023-12-25 14:30:45 (ISO)
-        '%Y/%m/%d %H:%M:%S',  # 2023/12/25 14:30:45
-        '%d/%m/%Y',           # 25/12/2023
-        '%d-%m-%Y',           # 25-12-2023
-        '%Y%m%d %H:%M:%S',    # 20231225 14:30:45
-        '%Y%m%d',             # 20231225
-        '%m/%d/%Y %H:%M:%S',  # 12/25/2023 14:30:45 (formato US)
-        '%m-%d-%Y %H:%M:%S',  # 12-25-2023 14:30:45
-    ]
-    
     # Intentar con cada formato
-    for fmt in formatos:
+    for fmt in FORMATOS_FECHA:
         try:
             dt = datetime.strptime(fecha_str, fmt)
             # Si el formato no incluye hora, establecer medianoche
@@ -94,6 +98,76 @@ def parse_fecha(
     
     return None
 
+def _a_ns_utc(fechas) -> np.ndarray:
+    """Fechas con zona -> enteros en nanosegundos UTC (NaT queda como NaT)"""
+    fechas = pd.DatetimeIndex(fechas).tz_convert("UTC").tz_localize(None)
+    return np.asarray(fechas, dtype="M8[ns]").view("i8")
+
+def parse_fechas_series(serie, dayfirst: bool = True) -> pd.Series:
+    """
+    Versión vectorizada de parse_fecha para una columna completa.
+    Detecta el formato dominante sobre una muestra, parsea en bloque con
+    formatos explícitos (del más frecuente al menos frecuente) y localiza la
+    columna en Argentina con una sola operación. Lo que no encaja en ningún
+    formato (o no es texto) se resuelve con parse_fecha valor por valor.
+
+    Los formatos día/mes (y los ISO) se prueban siempre antes que los US
+    (%m/%d), igual que en parse_fecha: un 03/04 ambiguo es 3 de abril aunque
+    en la muestra abunden fechas que solo encajan como mes/día.
+    
+    Returns:
+        Serie datetime64[ns, America/Argentina/Buenos_Aires] con el mismo índice
+    """
+    serie = pd.Series(serie)
+
+    # Columnas ya parseadas: solo se ajusta la zona horaria
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        if serie.dt.tz is None:
+            return serie.dt.tz_localize(
+                ARGENTINA_TZ, ambiguous=np.zeros(len(serie), dtype=bool), nonexistent="shift_forward"
+            )
+        return serie.dt.tz_convert(ARGENTINA_TZ)
+
+    valores = serie.astype(object)
+    try:
+        texto = valores.str.strip()  # lo que no es texto queda en NaN
+    except AttributeError:
+        texto = pd.Series(np.nan, index=serie.index, dtype=object)  # columna sin textos
+    es_texto = texto.notna().to_numpy()
+    vacio = es_texto & texto.fillna("").str.lower().isin(["", "nan", "nat", "none"]).to_numpy()
+    otros = ~es_texto & valores.notna().to_numpy()
+
+    locales = np.full(len(serie), np.datetime64("NaT"), dtype="M8[ns]")
+    pendientes = np.flatnonzero(es_texto & ~vacio)
+
+    if len(pendientes):
+        # Orden de prueba: día primero antes que US; dentro de cada grupo, más aciertos en la muestra primero
+        muestra = texto.iloc[pendientes[::max(1, len(pendientes) // MUESTRA_FORMATO_FECHAS)]]
+        aciertos = {
+            fmt: int(pd.to_datetime(muestra, format=fmt, errors="coerce").notna().sum())
+            for fmt in FORMATOS_FECHA
+        }
+        for fmt in sorted(FORMATOS_FECHA, key=lambda f: (f.startswith('%m'), -aciertos[f])):
+            parseadas = pd.to_datetime(texto.iloc[pendientes], format=fmt, errors="coerce")
+            ok = parseadas.notna().to_numpy()
+            locales[pendientes[ok]] = parseadas.to_numpy(dtype="M8[ns]")[ok]
+            pendientes = pendientes[~ok]
+            if not len(pendientes):
+                break
+
+    resultado = _a_ns_utc(pd.DatetimeIndex(locales).tz_localize(
+        ARGENTINA_TZ, ambiguous=np.zeros(len(locales), dtype=bool), nonexistent="shift_forward"
+    ))
+
+    # Segunda pasada: formatos libres, valores con zona y objetos fecha
+    resto = np.concatenate([pendientes, np.flatnonzero(otros)])
+    if len(resto):
+        sueltas = [parse_fecha(v, dayfirst=dayfirst) for v in valores.iloc[resto]]
+        resultado[resto] = _a_ns_utc(pd.to_datetime(sueltas, utc=True))
+
+    fechas = pd.DatetimeIndex(resultado.view("M8[ns]")).tz_localize("UTC").tz_convert(ARGENTINA_TZ)
+    return pd.Series(fechas, index=serie.index, name=serie.name)
+
 def format_fecha(
     fecha: Union[datetime, pd.Timestamp, str, None], 
     formato: str = '%d/%m/%Y %H:%M',
@@ -0,0 +1,107 @@
+"""
+Exportación de vistas filtradas a CSV, Excel y Parquet
+Versión 1.0 - Escritura por bloques con compresión
+"""
+import gzip
+import io
+import pandas as pd
+from utils.helpers import cloud_log
+from config.settings import EXPORT_CHUNK_SIZE
+
+# Formato -> (extensión, tipo MIME)
+FORMATOS_EXPORTACION = {
+    'CSV': ('csv.gz', 'application/gzip'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def _bloques(df, tamano, columnas=None):
+    """Recorre el DataFrame en bloques de `tamano` filas (solo se copia un bloque a la vez)"""
+    for inicio in range(0, len(df), tamano):
+        bloque = df.iloc[inicio:inicio + tamano]
+        yield bloque if columnas is None else bloque[columnas]
+
+def _como_texto(bloque):
+    """Columnas de texto/mixtas a str (sin 'nan'), para un esquema estable entre bloques"""
+    salida = {}
+    for col in bloque.columns:
+        serie = bloque[col]
+        if pd.api.types.is_datetime64_any_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            salida[col] = serie
+        else:
+            salida[col] = serie.where(serie.notna(), "").astype(str)
+    return pd.DataFrame(salida, index=bloque.index)
+
+def _escribir_csv(df, destino, tamano, columnas):
+    """CSV UTF-8 con BOM (para Excel) comprimido con gzip"""
+    with gzip.GzipFile(fileobj=destino, mode='wb') as comprimido:
+        texto = io.TextIOWrapper(comprimido, encoding='utf-8-sig', newline='')
+        for i, bloque in enumerate(_bloques(df, tamano, columnas)):
+            bloque.to_csv(texto, index=False, header=(i == 0))
+        if len(df) == 0:
+            pd.DataFrame(columns=columnas or list(df.columns)).to_csv(texto, index=False)
+        texto.flush()
+        texto.detach()
+
+def _escribir_excel(df, destino, tamano, columnas):
+    """XLSX en modo write_only: las filas se vuelcan al archivo a medida que se agregan"""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Datos")
+    hoja.append([str(c) for c in (columnas or df.columns)])
+    for bloque in _bloques(df, tamano, columnas):
+        bloque = _como_texto(bloque)
+        for col in bloque.columns:
+            # openpyxl no admite fechas con zona horaria
+            if isinstance(bloque[col].dtype, pd.DatetimeTZDtype):
+                bloque[col] = bloque[col].dt.tz_localize(None)
+        for fila in bloque.itertuples(index=False, name=None):
+            hoja.append([None if pd.isna(v) else v for v in fila])
+    libro.save(destino)
+
+def _escribir_parquet(df, destino, tamano, columnas):
+    """Parquet con un row group por bloque y compresión zstd"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloque in _bloques(df, tamano, columnas):
+            tabla = pa.Table.from_pandas(_como_texto(bloque), preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, tabla.schema, compression='zstd')
+            escritor.write_table(tabla.cast(escritor.schema))
+        if escritor is None:
+            vacio = df if columnas is None else df[columnas]
+            tabla = pa.Table.from_pandas(_como_texto(vacio), preserve_index=False)
+            escritor = pq.ParquetWriter(destino, tabla.schema, compression='zstd')
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+_ESCRITORES = {
+    'CSV': _escribir_csv,
+    'Excel': _escribir_excel,
+    'Parquet': _escribir_parquet,
+}
+
+def exportar(df, formato, nombre_base, columnas=None, tamano_bloque=EXPORT_CHUNK_SIZE):
+    """
+    Exporta el DataFrame (o solo `columnas`) en el formato pedido. Devuelve (datos, nombre, mime).
+    El archivo se arma por bloques directamente en su formato final (comprimido en
+    CSV y Parquet), así el pico de memoria es un bloque más una copia del archivo
+    resultante, que st.download_button necesita completa como bytes.
+    """
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+    extension, mime = FORMATOS_EXPORTACION[formato]
+    archivo = io.BytesIO()
+    if columnas is not None:
+        columnas = [c for c in columnas if c in df.columns]
+    _ESCRITORES[formato](df, archivo, tamano_bloque, columnas)
+    datos = archivo.getvalue()
+
+    cloud_log(f"Exportación {formato}: {len(df)} filas, {len(datos)} bytes", "info")
+    return datos, f"{nombre_base}.{extension}", mime
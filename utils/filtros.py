@@ -0,0 +1,123 @@
+"""
+Motor de filtros sobre columnas de baja cardinalidad
+Versión 1.0 - Un bitmap por valor distinto, calculado una vez por snapshot
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.indices import version_snapshot
+
+TODOS = "Todos"
+
+def _normalizar(serie, mayusculas=False):
+    """Valores como texto sin espacios sobrantes (vacío para nulos)"""
+    serie = serie.fillna("").astype(str).str.strip()
+    return serie.str.upper() if mayusculas else serie
+
+class FilterIndex:
+    """
+    Índice de filtros: para cada columna guarda los códigos de cada fila y un
+    bitmap (array booleano) por valor. Combinar filtros es un AND de bitmaps,
+    sin copiar el DataFrame. Las columnas multivalor (p. ej. 'Técnico', con
+    valores separados por coma) tienen un bitmap por cada valor individual.
+    """
+
+    def __init__(self, df, columnas, multivalor=()):
+        self.total = len(df)
+        self._valores = {}
+        self._codigos = {}
+        self._bitmaps = {}
+
+        for col in columnas:
+            if col not in df.columns:
+                self._valores[col] = []
+                self._bitmaps[col] = {}
+                continue
+
+            if col in multivalor:
+                # Índice posicional: cada valor individual apunta a su fila
+                partes = _normalizar(df[col], mayusculas=True).reset_index(drop=True).str.split(",")
+                explotado = partes.explode().str.strip()
+                explotado = explotado[explotado != ""]
+                bitmaps = {}
+                for valor, filas in explotado.groupby(explotado).groups.items():
+                    bitmap = np.zeros(self.total, dtype=bool)
+                    bitmap[np.asarray(filas, dtype=np.intp)] = True
+                    bitmap.flags.writeable = False
+                    bitmaps[valor] = bitmap
+                self._valores[col] = sorted(bitmaps)
+                self._bitmaps[col] = bitmaps
+            else:
+                codigos, valores = pd.factorize(_normalizar(df[col]), sort=True)
+                self._codigos[col] = (codigos, list(valores))
+                self._valores[col] = [v for v in valores if v != ""]
+                self._bitmaps[col] = {v: codigos == i for i, v in enumerate(valores) if v != ""}
+                for bitmap in self._bitmaps[col].values():
+                    bitmap.flags.writeable = False
+
+    def valores(self, columna):
+        """Valores distintos de la columna, ordenados"""
+        return list(self._valores.get(columna, []))
+
+    def bitmap(self, columna, valor):
+        """Filas con ese valor (array booleano de solo lectura compartido)"""
+        bitmap = self._bitmaps.get(columna, {}).get(str(valor).strip())
+        return bitmap if bitmap is not None else np.zeros(self.total, dtype=bool)
+
+    def mascara(self, filtros, base=None):
+        """
+        AND de los filtros {columna: valor | lista de valores}. 'Todos', None o
+        una lista vacía no filtran; una lista es OR entre sus valores.
+        """
+        mascara = np.ones(self.total, dtype=bool) if base is None else base.copy()
+        for columna, valor in filtros.items():
+            if valor is None or valor == TODOS or (isinstance(valor, (list, tuple, set)) and not valor):
+                continue
+            if isinstance(valor, (list, tuple, set)):
+                union = np.zeros(self.total, dtype=bool)
+                for v in valor:
+                    union |= self.bitmap(columna, v)
+                mascara &= union
+            else:
+                mascara &= self.bitmap(columna, valor)
+        return mascara
+
+    def posiciones(self, filtros, base=None):
+        """Posiciones (iloc) de las filas que cumplen los filtros"""
+        return np.flatnonzero(self.mascara(filtros, base))
+
+    def conteos(self, columna, mascara=None):
+        """{valor: cantidad de filas} dentro de la máscara dada"""
+        if columna in self._codigos:
+            # Columna de un solo valor por fila: un bincount cuenta todas las opciones
+            codigos, valores = self._codigos[columna]
+            por_codigo = np.bincount(codigos if mascara is None else codigos[mascara], minlength=len(valores))
+            return {v: int(por_codigo[i]) for i, v in enumerate(valores) if v != ""}
+        return {
+            v: int(np.count_nonzero(bitmap if mascara is None else bitmap & mascara))
+            for v, bitmap in self._bitmaps.get(columna, {}).items()
+        }
+
+    def opciones(self, columna, filtros=None, base=None, incluir=()):
+        """
+        Opciones para un selector con sus conteos, considerando el resto de los
+        filtros (facetas). Devuelve [(valor, cantidad)] ordenado por valor.
+        """
+        otros = {c: v for c, v in (filtros or {}).items() if c != columna}
+        conteos = self.conteos(columna, self.mascara(otros, base))
+        valores = sorted(set(self._valores.get(columna, [])) | set(incluir))
+        return [(v, conteos.get(v, 0)) for v in valores]
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _filter_index(version, columnas, multivalor, _df):
+    """Índice de filtros por versión de snapshot y columnas"""
+    return FilterIndex(_df, columnas, multivalor)
+
+def get_filter_index(df, columnas, multivalor=()):
+    """Índice de filtros compartido para el snapshot dado"""
+    return _filter_index(version_snapshot(df), tuple(columnas), tuple(multivalor), df)
+
+def etiqueta_con_conteo(opciones):
+    """format_func para selectbox/multiselect: 'valor (n)'"""
+    conteos = dict(opciones)
+    return lambda v: f"{v} ({conteos[v]})" if v in conteos else v
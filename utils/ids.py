@@ -0,0 +1,62 @@
+"""
+Generación de IDs de reclamos y clientes
+Versión 1.0 - IDs compactos ordenables por fecha de creación (estilo ULID)
+
+Formato: 16 caracteres en base32 de Crockford. Los primeros 10 codifican los
+milisegundos desde epoch (48 bits) y los últimos 6 son aleatorios (30 bits).
+Dentro del mismo milisegundo la parte aleatoria se incrementa, por lo que los
+IDs de un mismo proceso son estrictamente crecientes.
+
+Los filtros por rango de fecha usan 'Fecha y hora', que ya llega parseada desde
+la carga: los reclamos importados pueden traer una fecha anterior a su ID.
+"""
+import secrets
+import threading
+import time
+
+ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+LARGO_TIEMPO = 10
+LARGO_ALEATORIO = 6
+LARGO_ID = LARGO_TIEMPO + LARGO_ALEATORIO
+_MAX_ALEATORIO = 32 ** LARGO_ALEATORIO - 1
+
+_lock = threading.Lock()
+_ultimo_ms = 0
+_ultimo_aleatorio = 0
+
+def _codificar(numero, largo):
+    """Entero -> base32 de Crockford con ancho fijo"""
+    caracteres = []
+    for _ in range(largo):
+        numero, resto = divmod(numero, 32)
+        caracteres.append(ALFABETO[resto])
+    return "".join(reversed(caracteres))
+
+def _siguiente():
+    """Próximo par (milisegundos, aleatorio), monótono dentro del proceso"""
+    global _ultimo_ms, _ultimo_aleatorio
+    with _lock:
+        ms = int(time.time() * 1000)
+        if ms <= _ultimo_ms:
+            # Mismo milisegundo (o reloj atrasado): se continúa la secuencia
+            ms = _ultimo_ms
+            aleatorio = _ultimo_aleatorio + 1
+            if aleatorio > _MAX_ALEATORIO:
+                ms += 1
+                aleatorio = secrets.randbelow(_MAX_ALEATORIO // 2)
+        else:
+            # Se deja margen para incrementar dentro del milisegundo
+            aleatorio = secrets.randbelow(_MAX_ALEATORIO // 2)
+        _ultimo_ms, _ultimo_aleatorio = ms, aleatorio
+        return ms, aleatorio
+
+def generar_id(existentes=None):
+    """
+    Genera un ID nuevo. Si se pasa `existentes` (cualquier contenedor con `in`,
+    p. ej. un índice), se garantiza que el ID no esté en uso.
+    """
+    while True:
+        ms, aleatorio = _siguiente()
+        nuevo = _codificar(ms, LARGO_TIEMPO) + _codificar(aleatorio, LARGO_ALEATORIO)
+        if existentes is None or nuevo not in existentes:
+            return nuevo
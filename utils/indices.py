@@ -0,0 +1,176 @@
+"""
+Índices en memoria sobre los snapshots de datos
+Versión 1.0 - Se construyen una vez por versión del snapshot y se comparten entre sesiones
+"""
+import threading
+import weakref
+import pandas as pd
+import streamlit as st
+
+def normalizar_nro_cliente(valor):
+    """Normaliza un Nº Cliente para usarlo como clave"""
+    return str(valor).strip() if valor is not None and not pd.isna(valor) else ""
+
+def marcar_version_snapshot(df):
+    """Guarda en df.attrs una huella del contenido para identificar el snapshot"""
+    if df is not None and not df.empty:
+        df.attrs['version'] = int(pd.util.hash_pandas_object(df, index=False).sum())
+    return df
+
+def version_snapshot(df):
+    """Versión del snapshot (huella de carga o, si falta, calculada en el momento)"""
+    version = df.attrs.get('version')
+    if version is None:
+        version = int(pd.util.hash_pandas_object(df, index=False).sum()) if not df.empty else 0
+    return (version, len(df))
+
+class ClientIndex:
+    """Índice Nº Cliente normalizado -> registro del cliente (el primero si hay repetidos)"""
+
+    def __init__(self, df_clientes):
+        self._clientes = {}
+        self._filas = {}  # Nº Cliente -> etiqueta de índice en el DataFrame
+        self._ids = frozenset()
+        if "ID Cliente" in df_clientes.columns:
+            self._ids = frozenset(df_clientes["ID Cliente"].astype(str).str.strip()) - {""}
+        if df_clientes.empty or "Nº Cliente" not in df_clientes.columns:
+            return
+
+        claves = df_clientes["Nº Cliente"].map(normalizar_nro_cliente)
+        unicos = ~claves.duplicated(keep='first')
+        self._clientes = dict(zip(
+            claves[unicos],
+            df_clientes[unicos].to_dict('records')
+        ))
+        self._filas = dict(zip(claves[unicos], df_clientes.index[unicos.to_numpy()]))
+
+    def get(self, nro_cliente):
+        """Registro del cliente (copia) o None si no existe"""
+        registro = self._clientes.get(normalizar_nro_cliente(nro_cliente))
+        return dict(registro) if registro is not None else None
+
+    def fila(self, nro_cliente):
+        """Etiqueta de índice del cliente en el DataFrame del snapshot, o None"""
+        return self._filas.get(normalizar_nro_cliente(nro_cliente))
+
+    def __contains__(self, nro_cliente):
+        return normalizar_nro_cliente(nro_cliente) in self._clientes
+
+    @property
+    def ids(self):
+        """IDs de cliente en uso (para descartar colisiones al generar uno nuevo)"""
+        return self._ids
+
+    def __len__(self):
+        return len(self._clientes)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _client_index(version, _df_clientes):
+    """Índice de clientes por versión de snapshot"""
+    return ClientIndex(_df_clientes)
+
+def get_client_index(df_clientes):
+    """Índice de clientes compartido para el snapshot dado"""
+    return _client_index(version_snapshot(df_clientes), df_clientes)
+
+# --------------------------
+# RECLAMOS POR CLIENTE
+# --------------------------
+ESTADOS_ACTIVOS = {"pendiente", "en curso"}
+TIPO_DESCONEXION = "desconexion a pedido"
+
+# Índices vivos, para propagar cambios de estado a todos los snapshots en cache
+_INDICES_RECLAMOS = weakref.WeakSet()
+
+class ClaimsIndex:
+    """
+    Índice Nº Cliente -> etiquetas de sus reclamos (todos y activos). Un reclamo
+    está activo si está Pendiente o En curso, o si es una desconexión a pedido.
+    """
+
+    def __init__(self, df_reclamos):
+        self._lock = threading.Lock()
+        self._por_cliente = {}
+        self._activos = {}
+        self._cliente_de = {}
+        self._estado = {}
+        self._desconexiones = set()
+        self._por_id = {}
+
+        columnas = {"Nº Cliente", "Estado"}
+        if df_reclamos.empty or not columnas.issubset(df_reclamos.columns):
+            _INDICES_RECLAMOS.add(self)
+            return
+
+        etiquetas = df_reclamos.index
+        clientes = df_reclamos["Nº Cliente"].map(normalizar_nro_cliente).to_numpy()
+        estados = df_reclamos["Estado"].astype(str).str.strip().str.lower()
+        if "Tipo de reclamo" in df_reclamos.columns:
+            desconexion = df_reclamos["Tipo de reclamo"].astype(str).str.strip().str.lower() == TIPO_DESCONEXION
+        else:
+            desconexion = pd.Series(False, index=etiquetas)
+        activos = (estados.isin(ESTADOS_ACTIVOS) | desconexion).to_numpy()
+
+        self._cliente_de = dict(zip(etiquetas, clientes))
+        self._estado = dict(zip(etiquetas, estados))
+        self._desconexiones = set(etiquetas[desconexion.to_numpy()])
+        self._por_cliente = {k: list(v) for k, v in etiquetas.groupby(clientes).items()}
+        self._activos = {k: list(v) for k, v in etiquetas[activos].groupby(clientes[activos]).items()}
+        if "ID Reclamo" in df_reclamos.columns:
+            ids = df_reclamos["ID Reclamo"].astype(str).str.strip()
+            self._por_id = {i: e for i, e in zip(ids, etiquetas) if i}
+
+        _INDICES_RECLAMOS.add(self)
+
+    def reclamos(self, nro_cliente):
+        """Etiquetas de todos los reclamos del cliente"""
+        return list(self._por_cliente.get(normalizar_nro_cliente(nro_cliente), []))
+
+    def activos(self, nro_cliente, incluir_desconexiones=True):
+        """Etiquetas de los reclamos activos del cliente"""
+        etiquetas = self._activos.get(normalizar_nro_cliente(nro_cliente), [])
+        if incluir_desconexiones:
+            return list(etiquetas)
+        return [e for e in etiquetas if self._estado.get(e) in ESTADOS_ACTIVOS]
+
+    @property
+    def ids(self):
+        """IDs de reclamo en uso (para descartar colisiones al generar uno nuevo)"""
+        return self._por_id.keys()
+
+    def tiene_activos(self, nro_cliente):
+        """Indica si el cliente tiene algún reclamo activo"""
+        return bool(self._activos.get(normalizar_nro_cliente(nro_cliente)))
+
+    def actualizar_estado(self, id_reclamo, estado):
+        """Refleja un cambio de estado sin reconstruir el índice"""
+        etiqueta = self._por_id.get(str(id_reclamo).strip())
+        if etiqueta is None:
+            return False
+
+        with self._lock:
+            self._estado[etiqueta] = str(estado).strip().lower()
+            cliente = self._cliente_de[etiqueta]
+            activos = [e for e in self._activos.get(cliente, []) if e != etiqueta]
+            if self._estado[etiqueta] in ESTADOS_ACTIVOS or etiqueta in self._desconexiones:
+                activos.append(etiqueta)
+                activos.sort(key=self._por_cliente[cliente].index)
+            if activos:
+                self._activos[cliente] = activos
+            else:
+                self._activos.pop(cliente, None)
+        return True
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _claims_index(version, _df_reclamos):
+    """Índice de reclamos por versión de snapshot"""
+    return ClaimsIndex(_df_reclamos)
+
+def get_claims_index(df_reclamos):
+    """Índice de reclamos por cliente compartido para el snapshot dado"""
+    return _claims_index(version_snapshot(df_reclamos), df_reclamos)
+
+def actualizar_estado_reclamo(id_reclamo, estado):
+    """Propaga el nuevo estado de un reclamo a los índices en memoria"""
+    for indice in list(_INDICES_RECLAMOS):
+        indice.actualizar_estado(id_reclamo, estado)
@@ -1,44 +1,63 @@
-"""Utilidades de permisos para evitar importación circular - Optimizado para Render"""
+"""Utilidades de permisos para evitar importación circular - Optimizado para Render
+
+La política se compila una sola vez al importar el módulo: cada permiso
+conocido es un bit y cada rol una máscara. Las verificaciones son un AND
+entre enteros, sin reconstruir estructuras en cada llamada.
+"""
+from config.settings import PERMISOS_POR_ROL, OPCIONES_PERMISOS, PERMISOS_PUBLICOS
+
+def _compilar_politica():
+    """Arma el bit de cada permiso y la máscara de cada rol a partir de PERMISOS_POR_ROL"""
+    universo = set(OPCIONES_PERMISOS.values()) | set(PERMISOS_PUBLICOS) | {'admin'}
+    for config in PERMISOS_POR_ROL.values():
+        universo.update(p for p in config.get('permisos', []) if p != '*')
+
+    bits = {permiso: 1 << i for i, permiso in enumerate(sorted(universo))}
+    # Los permisos no declarados comparten un bit que solo tiene el comodín '*'
+    bit_desconocido = 1 << len(bits)
+    mascara_publica = 0
+    for permiso in PERMISOS_PUBLICOS:
+        mascara_publica |= bits[permiso]
+
+    mascaras = {}
+    for rol, config in PERMISOS_POR_ROL.items():
+        permisos = config.get('permisos', [])
+        if '*' in permisos:
+            mascaras[rol] = -1  # todos los bits
+            continue
+        mascara = mascara_publica
+        for permiso in permisos:
+            mascara |= bits[permiso]
+        mascaras[rol] = mascara
+
+    return bits, bit_desconocido, mascara_publica, mascaras
+
+_BITS, _BIT_DESCONOCIDO, MASCARA_PUBLICA, _MASCARAS_POR_ROL = _compilar_politica()
+
+def mascara_de_rol(rol):
+    """Máscara de permisos resuelta para un rol (solo permisos públicos si no existe)"""
+    return _MASCARAS_POR_ROL.get(str(rol or '').lower(), MASCARA_PUBLICA)
+
+def rol_tiene_permiso(rol, permiso):
+    """Verifica un permiso para un rol en O(1)"""
+    return bool(mascara_de_rol(rol) & _BITS.get(permiso, _BIT_DESCONOCIDO))
 
 def has_permission(permiso):
-    """Verifica permisos del usuario con manejo robusto para entornos cloud"""
+    """Verifica permisos del usuario con la máscara resuelta al iniciar sesión"""
     import streamlit as st
     
     try:
-        # Verificar si la sesión está inicializada
-        if 'auth' not in st.session_state:
-            return False
-            
-        user_info = st.session_state.auth.get('user_info', {})
-        user_role = user_info.get('rol', '')
-        
-        # Permisos optimizados para CRM
-        permisos = {
-            'admin': [
-                'inicio', 'reclamos_cargados', 'gestion_clientes', 
-                'imprimir_reclamos', 'seguimiento_tecnico', 'cierre_reclamos',
-                'dashboard', 'reportes', 'configuracion', 'administracion'
-            ],
-            'tecnico': [
-                'inicio', 'reclamos_cargados', 'seguimiento_tecnico', 
-                'cierre_reclamos', 'dashboard'
-            ],
-            'usuario': [
-                'inicio', 'reclamos_cargados', 'imprimir_reclamos', 'dashboard'
-            ],
-            'supervisor': [
-                'inicio', 'reclamos_cargados', 'seguimiento_tecnico', 
-                'cierre_reclamos', 'dashboard', 'reportes'
-            ]
-        }
-        
-        # Permisos públicos (sin necesidad de login)
-        permisos_publicos = ['login', 'logout', 'error']
-        
-        if permiso in permisos_publicos:
-            return True
-            
-        return permiso in permisos.get(user_role, [])
+        auth = st.session_state.get('auth')
+        user_info = auth.get('user_info') if auth and auth.get('logged_in') else None
+        if not user_info:
+            return bool(MASCARA_PUBLICA & _BITS.get(permiso, 0))
+
+        mascara = user_info.get('mascara_permisos')
+        if mascara is None:
+            # Sesiones iniciadas antes de compilar la política
+            mascara = user_info['mascara_permisos'] = mascara_de_rol(user_info.get('rol'))
+
+        return bool(mascara & _BITS.get(permiso, _BIT_DESCONOCIDO))
         
     except Exception as e:
         # Log seguro en entornos cloud
@@ -63,10 +82,3 @@ def get_user_role():
 def has_any_permission(permisos):
     """Verifica si el usuario tiene al menos uno de los permisos especificados"""
     return any(has_permission(perm) for perm in permisos)
-
-# Cache de permisos para mejor rendimiento en Render
-def init_permissions_cache():
-    """Inicializa cache de permisos para mejor rendimiento"""
-    import streamlit as st
-    if 'permissions_cache' not in st.session_state:
-        st.session_state.permissions_cache = {}
\ No newline at end of file
@@ -13,22 +13,9 @@ import pandas as pd
 from PIL import Image, ImageDraw, ImageFont
 import streamlit as st
 
-from utils.date_utils import ahora_argentina, format_fecha
+from utils.date_utils import ahora_argentina, format_fecha, parse_fechas_series
 from utils.helpers import cloud_log
 
-def _to_datetime_clean(series: pd.Series) -> pd.Series:
-    """Limpieza robusta de fechas para entornos cloud"""
-    try:
-        s = series.astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
-        s = s.replace({"": None, "nan": None, "NaN": None, "NONE": None, "None": None})
-        out = pd.to_datetime(s, errors="coerce", dayfirst=True, infer_datetime_format=True)
-        if pd.api.types.is_datetime64tz_dtype(out):
-            out = out.dt.tz_convert(None).dt.tz_localize(None)
-        return out
-    except Exception as e:
-        cloud_log(f"Error en limpieza de fechas: {str(e)}", "error")
-        return pd.Series([pd.NaT] * len(series))
-
 def _prep_df(df_reclamos: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp]:
     """Preparación robusta del DataFrame para reportes"""
     try:
@@ -53,14 +40,14 @@ def _prep_df(df_reclamos: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Timestamp, pd.
                 if col in ["Estado", "Técnico", "Tipo de reclamo"]:
                     df[col] = df[col].astype(str).str.strip()
         
-        # Conversión de fechas
-        df["Fecha y hora"] = _to_datetime_clean(df["Fecha y hora"])
-        df["Fecha_formateada"] = _to_datetime_clean(df["Fecha_formateada"])
+        # Las fechas llegan parseadas desde cargar_datos: solo se asegura la zona horaria
+        df["Fecha y hora"] = parse_fechas_series(df["Fecha y hora"])
+        df["Fecha_formateada"] = parse_fechas_series(df["Fecha_formateada"])
         
         # Normalización de estados
         df["Estado"] = df["Estado"].str.lower().str.strip()
         
-        ahora_ts = pd.Timestamp(ahora_argentina()).tz_localize(None)
+        ahora_ts = pd.Timestamp(ahora_argentina())
         hace_24h = ahora_ts - pd.Timedelta(hours=24)
         
         return df, ahora_ts, hace_24h
@@ -69,7 +56,7 @@ def _prep_df(df_reclamos: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Timestamp, pd.
         cloud_log(f"Error en preparación de DataFrame: {str(e)}", "error")
         # Devolver DataFrame vacío pero estructurado
         empty_df = pd.DataFrame(columns=["Fecha y hora", "Fecha_formateada", "Estado", "Técnico", "Tipo de reclamo"])
-        ahora_ts = pd.Timestamp.now()
+        ahora_ts = pd.Timestamp(ahora_argentina())
         return empty_df, ahora_ts, ahora_ts - pd.Timedelta(hours=24)
 
 def _get_fonts_for_cloud():
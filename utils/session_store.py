@@ -0,0 +1,83 @@
+"""
+Sesiones persistentes con tokens firmados
+Versión 1.0 - Token HMAC en la URL respaldado por un almacén en memoria con expiración
+"""
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import streamlit as st
+from config.settings import SESSION_SECRET, SESSION_TIMEOUT
+
+class SessionStore:
+    """
+    Almacén de sesiones del lado del servidor. El token es 'id.firma' (HMAC
+    SHA-256 del id); la sesión vence tras SESSION_TIMEOUT segundos sin uso y
+    cada acceso renueva el plazo.
+    """
+
+    def __init__(self, secreto=None, timeout=SESSION_TIMEOUT):
+        self._secreto = (secreto or SESSION_SECRET or secrets.token_hex(32)).encode("utf-8")
+        self.timeout = timeout
+        self._sesiones = {}  # id -> {'user_info', 'expira'}
+        self._lock = threading.Lock()
+
+    def _firmar(self, session_id):
+        """Firma del id de sesión"""
+        return hmac.new(self._secreto, session_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def _id_valido(self, token):
+        """Devuelve el id si la firma del token es válida"""
+        try:
+            session_id, firma = str(token).split(".", 1)
+        except ValueError:
+            return None
+        return session_id if hmac.compare_digest(self._firmar(session_id), firma) else None
+
+    def _purgar(self, ahora):
+        """Elimina sesiones vencidas"""
+        vencidas = [sid for sid, s in self._sesiones.items() if s['expira'] <= ahora]
+        for sid in vencidas:
+            del self._sesiones[sid]
+
+    def crear(self, user_info):
+        """Registra una sesión nueva y devuelve su token firmado"""
+        session_id = secrets.token_urlsafe(16).replace(".", "")
+        ahora = time.time()
+        with self._lock:
+            self._purgar(ahora)
+            self._sesiones[session_id] = {
+                'user_info': dict(user_info),
+                'expira': ahora + self.timeout
+            }
+        return f"{session_id}.{self._firmar(session_id)}"
+
+    def reanudar(self, token):
+        """Devuelve el user_info de un token válido y vigente, renovando su expiración"""
+        session_id = self._id_valido(token)
+        if session_id is None:
+            return None
+
+        ahora = time.time()
+        with self._lock:
+            sesion = self._sesiones.get(session_id)
+            if sesion is None:
+                return None
+            if sesion['expira'] <= ahora:
+                del self._sesiones[session_id]
+                return None
+            sesion['expira'] = ahora + self.timeout
+            return dict(sesion['user_info'])
+
+    def revocar(self, token):
+        """Invalida una sesión"""
+        session_id = self._id_valido(token)
+        if session_id is not None:
+            with self._lock:
+                self._sesiones.pop(session_id, None)
+
+@st.cache_resource
+def get_session_store():
+    """Almacén de sesiones compartido por todo el proceso"""
+    return SessionStore()
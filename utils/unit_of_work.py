@@ -0,0 +1,172 @@
+"""
+Unidad de trabajo para escrituras en varias hojas
+Versión 1.0 - Junta los cambios y los envía en un único batchUpdate (todo o nada)
+"""
+from gspread.utils import a1_to_rowcol
+from utils.api_manager import api_manager
+from utils.helpers import cloud_log
+
+def _celda(valor):
+    """Convierte un valor de Python en CellData (equivalente a value_input_option RAW)"""
+    if valor is None or valor == "":
+        return {}
+    if isinstance(valor, bool):
+        return {'userEnteredValue': {'boolValue': valor}}
+    if isinstance(valor, (int, float)):
+        return {'userEnteredValue': {'numberValue': valor}}
+    return {'userEnteredValue': {'stringValue': str(valor)}}
+
+def _filas(valores):
+    """Convierte una matriz de valores en RowData"""
+    return [{'values': [_celda(v) for v in fila]} for fila in valores]
+
+class LoteEscritura:
+    """
+    Acumula appends y updates sobre hojas del mismo spreadsheet y los confirma
+    con un solo spreadsheets.batchUpdate. Google Sheets aplica todos los pedidos
+    del lote o ninguno.
+    """
+
+    def __init__(self, spreadsheet=None):
+        self.spreadsheet = spreadsheet
+        self._requests = []
+        self._al_confirmar = []
+        self._al_fallar = []
+
+    def _registrar_hoja(self, worksheet):
+        """Toma el spreadsheet de la primera hoja usada"""
+        if self.spreadsheet is None:
+            self.spreadsheet = worksheet.spreadsheet
+
+    def append(self, worksheet, filas):
+        """Agrega filas al final de la hoja"""
+        self._registrar_hoja(worksheet)
+        self._requests.append({
+            'appendCells': {
+                'sheetId': worksheet.id,
+                'rows': _filas(filas),
+                'fields': 'userEnteredValue'
+            }
+        })
+        return self
+
+    def update(self, worksheet, rango, valores):
+        """Escribe valores a partir de la celda inicial del rango A1 ('F12' o 'A2:I2')"""
+        self._registrar_hoja(worksheet)
+        fila, columna = a1_to_rowcol(rango.split(":")[0])
+        self._requests.append({
+            'updateCells': {
+                'start': {'sheetId': worksheet.id, 'rowIndex': fila - 1, 'columnIndex': columna - 1},
+                'rows': _filas(valores),
+                'fields': 'userEnteredValue'
+            }
+        })
+        return self
+
+    def update_rangos(self, worksheet, updates):
+        """Agrega updates con el formato de batch_update_sheet: [{'range', 'values'}]"""
+        for update in updates:
+            self.update(worksheet, update['range'], update['values'])
+        return self
+
+    def update_celdas(self, worksheet, celdas):
+        """
+        Agrega updates de celdas sueltas {(fila, columna): valor} (1-based)
+        combinándolas en bloques: columnas contiguas de una fila forman un
+        segmento y filas consecutivas con los mismos segmentos, un rectángulo.
+        """
+        self._registrar_hoja(worksheet)
+        por_fila = {}
+        for (fila, columna), valor in celdas.items():
+            por_fila.setdefault(fila, {})[columna] = valor
+
+        # Segmentos de columnas contiguas por fila: (col_inicio, col_fin) -> valores
+        segmentos_por_fila = {}
+        for fila, columnas in por_fila.items():
+            segmentos = []
+            for columna in sorted(columnas):
+                if segmentos and columna == segmentos[-1][1] + 1:
+                    segmentos[-1][1] = columna
+                else:
+                    segmentos.append([columna, columna])
+            segmentos_por_fila[fila] = [
+                ((inicio, fin), [columnas[c] for c in range(inicio, fin + 1)]) for inicio, fin in segmentos
+            ]
+
+        # Filas consecutivas con el mismo segmento se envían en un solo updateCells
+        bloques = {}
+        for fila in sorted(segmentos_por_fila):
+            for segmento, valores in segmentos_por_fila[fila]:
+                bloque = bloques.get(segmento)
+                if bloque and bloque[-1]['fin'] == fila - 1:
+                    bloque[-1]['fin'] = fila
+                    bloque[-1]['valores'].append(valores)
+                else:
+                    bloques.setdefault(segmento, []).append({'inicio': fila, 'fin': fila, 'valores': [valores]})
+
+        for (col_inicio, _), lista in bloques.items():
+            for bloque in lista:
+                self._requests.append({
+                    'updateCells': {
+                        'start': {'sheetId': worksheet.id, 'rowIndex': bloque['inicio'] - 1,
+                                  'columnIndex': col_inicio - 1},
+                        'rows': _filas(bloque['valores']),
+                        'fields': 'userEnteredValue'
+                    }
+                })
+        return self
+
+    def borrar_filas(self, worksheet, inicio, fin):
+        """Borra las filas [inicio, fin] de la hoja (1-based, inclusivo)"""
+        self._registrar_hoja(worksheet)
+        self._requests.append({
+            'deleteDimension': {
+                'range': {'sheetId': worksheet.id, 'dimension': 'ROWS',
+                          'startIndex': inicio - 1, 'endIndex': fin}
+            }
+        })
+        return self
+
+    def insertar_filas(self, worksheet, fila, cantidad):
+        """Inserta `cantidad` filas vacías a partir de `fila` (1-based); las de abajo se corren"""
+        self._registrar_hoja(worksheet)
+        self._requests.append({
+            'insertDimension': {
+                'range': {'sheetId': worksheet.id, 'dimension': 'ROWS',
+                          'startIndex': fila - 1, 'endIndex': fila - 1 + cantidad},
+                'inheritFromBefore': False
+            }
+        })
+        return self
+
+    def al_confirmar(self, callback):
+        """Registra una acción a ejecutar si el lote se confirma"""
+        self._al_confirmar.append(callback)
+        return self
+
+    def al_fallar(self, callback):
+        """Registra una acción a ejecutar si el lote falla"""
+        self._al_fallar.append(callback)
+        return self
+
+    def __len__(self):
+        return len(self._requests)
+
+    def commit(self):
+        """Envía el lote. Devuelve (éxito, error)"""
+        error = None
+        if self._requests:
+            _, error = api_manager.safe_sheet_operation(
+                self.spreadsheet.batch_update,
+                {'requests': self._requests}
+            )
+
+        callbacks = self._al_fallar if error else self._al_confirmar
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                cloud_log(f"Error en callback del lote de escritura: {str(e)}", "error")
+
+        self._requests, self._al_confirmar, self._al_fallar = [], [], []
+        return error is None, error
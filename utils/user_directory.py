@@ -0,0 +1,168 @@
+"""
+Directorio de usuarios en memoria para el login
+Versión 1.0 - Índice por username normalizado con contraseñas hasheadas (PBKDF2)
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+import streamlit as st
+from utils.api_manager import api_manager
+from utils.helpers import cloud_log
+from config.settings import (
+    COLUMNAS_USUARIOS,
+    DEFAULT_VALUES,
+    PASSWORD_HASH_ITERATIONS,
+    USER_DIRECTORY_REFRESH,
+    USER_DIRECTORY_MISS_REFRESH
+)
+
+PREFIJO_HASH = "pbkdf2_sha256"
+VALORES_ACTIVO = {"SI", "TRUE", "1", "SÍ", "VERDADERO", "YES", "Y", "ACTIVO"}
+
+def normalizar_username(username):
+    """Normaliza el username para usarlo como clave del directorio"""
+    return str(username or "").strip().lower()
+
+def hash_password(password, salt=None, iteraciones=PASSWORD_HASH_ITERATIONS):
+    """Devuelve el hash 'pbkdf2_sha256$iteraciones$salt$hash' de la contraseña"""
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", str(password).encode("utf-8"), salt, iteraciones)
+    return f"{PREFIJO_HASH}${iteraciones}${salt.hex()}${digest.hex()}"
+
+def verificar_password(password, codificado):
+    """Compara la contraseña contra un hash codificado en tiempo constante"""
+    try:
+        prefijo, iteraciones, salt, esperado = codificado.split("$")
+        if prefijo != PREFIJO_HASH:
+            return False
+        digest = hashlib.pbkdf2_hmac(
+            "sha256", str(password).encode("utf-8"), bytes.fromhex(salt), int(iteraciones)
+        )
+        return hmac.compare_digest(digest.hex(), esperado)
+    except (ValueError, AttributeError):
+        return False
+
+class UserDirectory:
+    """
+    Usuarios indexados por username normalizado. Las contraseñas de la hoja se
+    guardan solo como hash con salt; si la hoja ya tiene un hash PBKDF2 se usa
+    tal cual. Se recarga en segundo plano, así el login nunca lee la hoja.
+    """
+
+    def __init__(self, sheet_usuarios, intervalo=USER_DIRECTORY_REFRESH):
+        self.sheet = sheet_usuarios
+        self.intervalo = intervalo
+        self._usuarios = {}
+        self._huellas = {}  # username -> huella de la contraseña de la hoja
+        self._clave_huella = os.urandom(16)
+        self._hash_ficticio = hash_password(os.urandom(8).hex())
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._ultima_recarga_por_fallo = 0.0
+
+    def _huella(self, valor):
+        """Huella con clave de proceso para detectar cambios de contraseña sin re-hashear"""
+        return hmac.new(self._clave_huella, valor.encode("utf-8"), hashlib.sha256).digest()
+
+    def refrescar(self):
+        """Lee la hoja de usuarios y reconstruye el índice"""
+        valores, error = api_manager.safe_sheet_operation(self.sheet.get_all_values)
+        if error or not valores:
+            cloud_log(f"No se pudo cargar el directorio de usuarios: {error or 'hoja vacía'}", "error")
+            return False
+
+        encabezado = [str(c).strip() for c in valores[0]]
+        indices = {col: encabezado.index(col) for col in COLUMNAS_USUARIOS if col in encabezado}
+
+        def valor(fila, col):
+            i = indices.get(col)
+            return str(fila[i]).strip() if i is not None and i < len(fila) else ""
+
+        usuarios, huellas = {}, {}
+        for fila in valores[1:]:
+            username = normalizar_username(valor(fila, "username"))
+            if not username:
+                continue
+
+            password = valor(fila, "password")
+            huella = self._huella(password)
+            anterior = self._usuarios.get(username)
+            if anterior and self._huellas.get(username) == huella:
+                password_hash = anterior["password_hash"]
+            elif password.startswith(PREFIJO_HASH + "$"):
+                password_hash = password
+            else:
+                password_hash = hash_password(password)
+
+            usuarios[username] = {
+                "username": username,
+                "nombre": valor(fila, "nombre") or username,
+                "rol": (valor(fila, "rol") or DEFAULT_VALUES['rol_usuario']).lower(),
+                "email": valor(fila, "email"),
+                "telefono": valor(fila, "telefono"),
+                "activo": valor(fila, "activo").upper() in VALORES_ACTIVO,
+                "password_hash": password_hash
+            }
+            huellas[username] = huella
+
+        with self._lock:
+            self._usuarios = usuarios
+            self._huellas = huellas
+        return True
+
+    def autenticar(self, username, password):
+        """Devuelve el perfil del usuario si las credenciales son válidas y está activo"""
+        usuario = self._usuarios.get(normalizar_username(username))
+        if usuario is None and self._recargar_por_fallo():
+            # Puede ser un usuario recién agregado a la hoja
+            usuario = self._usuarios.get(normalizar_username(username))
+        if usuario is None:
+            # Igualar el costo para no revelar qué usuarios existen
+            verificar_password(password, self._hash_ficticio)
+            return None
+
+        if not verificar_password(str(password).strip(), usuario["password_hash"]):
+            return None
+        if not usuario["activo"]:
+            return None
+
+        return {k: v for k, v in usuario.items() if k not in ("password_hash", "activo")}
+
+    def _recargar_por_fallo(self):
+        """Recarga la hoja ante un username desconocido, a lo sumo una vez cada USER_DIRECTORY_MISS_REFRESH"""
+        with self._lock:
+            ahora = time.time()
+            if ahora - self._ultima_recarga_por_fallo < USER_DIRECTORY_MISS_REFRESH:
+                return False
+            self._ultima_recarga_por_fallo = ahora
+        return self.refrescar()
+
+    def start(self):
+        """Inicia la recarga periódica en segundo plano"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(
+                target=self._ejecutar, name="directorio-usuarios", daemon=True
+            )
+            self._hilo.start()
+        return self
+
+    def stop(self):
+        """Detiene la recarga periódica"""
+        self._detener.set()
+
+    def _ejecutar(self):
+        """Bucle de recarga"""
+        while not self._detener.wait(self.intervalo):
+            self.refrescar()
+
+@st.cache_resource
+def get_user_directory(_sheet_usuarios):
+    """Directorio de usuarios compartido por todas las sesiones del proceso"""
+    directorio = UserDirectory(_sheet_usuarios)
+    if not directorio.refrescar():
+        # Sin carga inicial no se cachea: el próximo login vuelve a intentarlo
+        raise RuntimeError("No se pudo cargar el directorio de usuarios")
+    return directorio.start()
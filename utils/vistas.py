@@ -0,0 +1,58 @@
+"""
+Vistas materializadas sobre los snapshots de datos
+Versión 1.0 - Reclamos con datos del cliente y fechas ya procesadas, una vez por snapshot
+"""
+import pandas as pd
+import streamlit as st
+from utils.indices import version_snapshot
+
+# Datos del cliente que se suman a cada reclamo (con sufijo '_cliente' si ya existen)
+COLUMNAS_CLIENTE_VISTA = ["N° de Precinto", "Teléfono"]
+FORMATO_FECHA_VISTA = '%d/%m/%Y %H:%M'
+
+def construir_reclamos_enriquecidos(df_reclamos, df_clientes):
+    """
+    Reclamos + datos del cliente, con 'Fecha_texto' preformateada a partir de
+    'Fecha y hora' (ya parseada en cargar_datos). Conserva el índice original
+    (fila de la hoja = índice + 2).
+    """
+    df = df_reclamos.copy()
+    df.columns = df.columns.str.strip()
+    for col in ("Nº Cliente", "ID Reclamo"):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+    if "Técnico" in df.columns:
+        df["Técnico"] = df["Técnico"].fillna("").astype(str)
+
+    columnas_cliente = [c for c in COLUMNAS_CLIENTE_VISTA if c in df_clientes.columns]
+    if "Nº Cliente" in df.columns and "Nº Cliente" in df_clientes.columns and columnas_cliente:
+        clientes = df_clientes[["Nº Cliente"] + columnas_cliente].copy()
+        clientes["Nº Cliente"] = clientes["Nº Cliente"].astype(str).str.strip()
+        clientes = clientes.drop_duplicates(subset=["Nº Cliente"])
+        # El merge izquierdo conserva orden y cantidad de filas: se restituye el índice
+        df = pd.merge(df, clientes, on="Nº Cliente", how="left", suffixes=("", "_cliente"))
+        df.index = df_reclamos.index
+
+    if "Fecha y hora" in df.columns:
+        df["Fecha_texto"] = df["Fecha y hora"].dt.strftime(FORMATO_FECHA_VISTA).fillna("Sin fecha")
+
+    return df
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _reclamos_enriquecidos(version_reclamos, version_clientes, recientes_primero, _df_reclamos, _df_clientes):
+    """Vista materializada por versión de los snapshots de reclamos y clientes"""
+    df = construir_reclamos_enriquecidos(_df_reclamos, _df_clientes)
+    if recientes_primero and "Fecha y hora" in df.columns:
+        df = df.sort_values("Fecha y hora", ascending=False)
+    df.attrs['version'] = ("reclamos_enriquecidos", version_reclamos, version_clientes, recientes_primero)
+    return df
+
+def get_reclamos_enriquecidos(df_reclamos, df_clientes, recientes_primero=False):
+    """
+    Vista compartida entre sesiones: tratarla como de solo lectura (filtrar con
+    máscaras/iloc y copiar antes de modificar columnas).
+    """
+    return _reclamos_enriquecidos(
+        version_snapshot(df_reclamos), version_snapshot(df_clientes),
+        recientes_primero, df_reclamos, df_clientes
+    )